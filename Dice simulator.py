@@ -1,6 +1,14 @@
 import tkinter as tk
 import random
 
+import numpy as np
+
+from dice_engine import Simulation, parse_dice, total_distribution
+
+REFRESH_MS = 200  # histogram redraw interval while a simulation runs
+HIST_WIDTH, HIST_HEIGHT = 460, 200
+MAX_BARS = HIST_WIDTH // 2
+
 # Dice face representations using Unicode characters
 DICE_UNICODE = {
     1: "\u2680",  # ⚀
@@ -17,10 +25,76 @@ def roll_dice():
     dice_label.config(text=DICE_UNICODE[dice_number], font=("Helvetica", 100))
     result_label.config(text=f"You rolled: {dice_number}", font=("Helvetica", 18))
 
+# Bulk simulation on a background thread; the view only polls snapshots
+simulation = None
+
+def start_simulation():
+    global simulation
+    stop_simulation()
+    try:
+        dice, sides = parse_dice(dice_entry.get())
+        rolls = int(float(rolls_entry.get()))
+        seed = int(seed_entry.get()) if seed_entry.get().strip() else None
+        if rolls < 1:
+            raise ValueError("Rolls must be at least 1")
+    except ValueError as e:
+        stats_label.config(text=str(e))
+        return
+    simulation = Simulation(rolls, dice, sides, seed)
+    simulation.start()
+    sim_button.config(state="disabled")
+    stop_button.config(state="normal")
+    refresh_simulation()
+
+def stop_simulation():
+    if simulation is not None:
+        simulation.stop()
+
+def refresh_simulation():
+    stats, elapsed = simulation.snapshot()
+    draw_histogram(stats)
+    chi_faces, dof_faces = stats.chi_square_faces()
+    chi_totals, dof_totals = stats.chi_square_totals()
+    rate = stats.count / elapsed if elapsed else 0
+    stats_label.config(text=(
+        f"{stats.count:,} of {simulation.rolls:,} rolls  ({rate:,.0f}/s)\n"
+        f"Mean {stats.mean:.4f} (expected {stats.expected_mean():.4f})   "
+        f"Variance {stats.variance:.4f} (expected {stats.expected_variance():.4f})\n"
+        f"Chi-square faces {chi_faces:.2f} ({dof_faces} df)   totals {chi_totals:.2f} ({dof_totals} df)"))
+    if simulation.error:
+        stats_label.config(text=f"Simulation failed: {simulation.error}")
+    if simulation.running():
+        root.after(REFRESH_MS, refresh_simulation)
+    else:
+        sim_button.config(state="normal")
+        stop_button.config(state="disabled")
+
+def draw_histogram(stats):
+    """Bars of each total's count, with the expected count marked in red."""
+    hist_canvas.delete("all")
+    counts = stats.total_counts
+    if not stats.count:
+        return
+    expected = total_distribution(stats.dice, stats.sides) * stats.count
+    if len(counts) > MAX_BARS:  # merge neighbouring totals so each bar stays a few pixels wide
+        starts = np.arange(0, len(counts), -(-len(counts) // MAX_BARS))
+        counts, expected = np.add.reduceat(counts, starts), np.add.reduceat(expected, starts)
+    scale = (HIST_HEIGHT - 20) / max(counts.max(), expected.max())
+    bar = HIST_WIDTH / len(counts)
+    for i, (count, expect) in enumerate(zip(counts, expected)):
+        x0, x1 = i * bar, (i + 1) * bar
+        hist_canvas.create_rectangle(x0, HIST_HEIGHT - count * scale, x1, HIST_HEIGHT,
+                                     fill="#4CAF50", outline="white" if bar > 3 else "")
+        y = HIST_HEIGHT - expect * scale
+        hist_canvas.create_line(x0, y, x1, y, fill="red")
+    hist_canvas.create_text(2, 2, anchor="nw", text=str(stats.dice), font=("Helvetica", 9))
+    hist_canvas.create_text(HIST_WIDTH - 2, 2, anchor="ne", text=str(stats.dice * stats.sides),
+                            font=("Helvetica", 9))
+
 # GUI window setup
 root = tk.Tk()
 root.title("🎲 Touch Dice Simulator")
-root.geometry("300x300")
+root.geometry("500x720")
 root.configure(bg="white")
 
 # Dice display label
@@ -38,5 +112,33 @@ roll_button = tk.Button(
 )
 roll_button.pack(pady=20)
 
+# Simulation controls: dice in NdM notation, number of rolls, optional seed
+sim_frame = tk.Frame(root, bg="white")
+sim_frame.pack()
+tk.Label(sim_frame, text="Dice", bg="white").grid(row=0, column=0)
+dice_entry = tk.Entry(sim_frame, width=8)
+dice_entry.insert(0, "2d6")
+dice_entry.grid(row=0, column=1, padx=4)
+tk.Label(sim_frame, text="Rolls", bg="white").grid(row=0, column=2)
+rolls_entry = tk.Entry(sim_frame, width=12)
+rolls_entry.insert(0, "100000000")
+rolls_entry.grid(row=0, column=3, padx=4)
+tk.Label(sim_frame, text="Seed", bg="white").grid(row=0, column=4)
+seed_entry = tk.Entry(sim_frame, width=8)
+seed_entry.grid(row=0, column=5, padx=4)
+
+button_frame = tk.Frame(root, bg="white")
+button_frame.pack(pady=6)
+sim_button = tk.Button(button_frame, text="Simulate", command=start_simulation)
+sim_button.pack(side="left", padx=4)
+stop_button = tk.Button(button_frame, text="Stop", state="disabled", command=stop_simulation)
+stop_button.pack(side="left", padx=4)
+
+hist_canvas = tk.Canvas(root, width=HIST_WIDTH, height=HIST_HEIGHT, bg="white", highlightthickness=0)
+hist_canvas.pack()
+stats_label = tk.Label(root, text="", font=("Helvetica", 10), bg="white", justify="left")
+stats_label.pack(pady=6)
+
 # Start the GUI event loop
 root.mainloop()
+stop_simulation()
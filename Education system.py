@@ -1,93 +1,462 @@
-import json
-import os
 import tkinter as tk
-from tkinter import messagebox, simpledialog
+from tkinter import filedialog, messagebox, simpledialog, ttk
+
+import education_bulk
+from education_search import INDEX_SUFFIX, NameIndex, data_fingerprint
+from education_service import EducationService
+from education_storage import CATEGORIES, KEY_FIELDS, DuplicateIdError, UnknownIdError, open_backend
 
 class EducationSystem:
-    def __init__(self, filename='education_data.json'):
+    def __init__(self, filename='education_data.json', backend=None):
         self.filename = filename
-        self.data = {'students': [], 'teachers': [], 'courses': []}
-        self.load_data()
-
-    def load_data(self):
-        if os.path.exists(self.filename):
-            with open(self.filename, 'r') as file:
-                self.data = json.load(file)
+        # The name index is saved next to our own data files; a backend passed in gets one in memory
+        self.index_path = None if backend else filename + INDEX_SUFFIX
+        fingerprint = data_fingerprint(filename)  # before opening: SQLite may add a -wal file
+        self.backend = backend or open_backend(filename)
+        self.names = self.load_names(fingerprint)
 
-    def save_data(self):
-        with open(self.filename, 'w') as file:
-            json.dump(self.data, file, indent=4)
+    def load_names(self, fingerprint):
+        """The saved name index if it matches the data, else one rebuilt from every record."""
+        names = NameIndex.load(self.index_path, fingerprint, CATEGORIES) if self.index_path else None
+        if names is None or names.counts() != {category: self.count(category) for category in CATEGORIES}:
+            names = NameIndex.build(CATEGORIES, ((category, record[KEY_FIELDS[category]], record["name"])
+                                                 for category in CATEGORIES for record in self.iter_records(category)))
+        return names
 
     def add_student(self, name, student_id):
-        self.data['students'].append({"name": name, "student_id": student_id})
-        self.save_data()
+        self.backend.insert('students', {"name": name, "student_id": student_id})
+        self.names.add('students', student_id, name)
 
     def add_teacher(self, name, teacher_id):
-        self.data['teachers'].append({"name": name, "teacher_id": teacher_id})
-        self.save_data()
+        self.backend.insert('teachers', {"name": name, "teacher_id": teacher_id})
+        self.names.add('teachers', teacher_id, name)
 
     def add_course(self, name, course_code):
-        self.data['courses'].append({"name": name, "course_code": course_code})
-        self.save_data()
+        self.backend.insert('courses', {"name": name, "course_code": course_code})
+        self.names.add('courses', course_code, name)
+
+    def add_many(self, category, records):
+        """Insert a batch of records in one transaction / journal write."""
+        records = list(records)
+        self.backend.insert_many(category, records)
+        self.names.add_many(category, ((record[KEY_FIELDS[category]], record["name"]) for record in records))
+
+    def get(self, category, key):
+        return self.backend.get(category, key)
+
+    def search(self, category, prefix, limit=50):
+        return self.backend.search_prefix(category, prefix, limit)
+
+    def fuzzy_search(self, query, limit=20, category=None):
+        """Names closest to `query`, misspellings included, as (category, record, score), best first."""
+        return [(found, {"name": name, KEY_FIELDS[found]: key}, score)
+                for found, key, name, score in self.names.search(query, limit, category)]
+
+    def count(self, category, prefix=''):
+        return self.backend.count(category, prefix)
+
+    def page(self, category, offset, limit, prefix=''):
+        """One window of records ordered by name, optionally filtered by name prefix."""
+        return self.backend.page(category, offset, limit, prefix)
+
+    def iter_records(self, category):
+        return self.backend.iter_records(category)
 
     def get_all(self, category):
-        return self.data.get(category, [])
+        return list(self.iter_records(category))
+
+    def remove_student(self, student_id):
+        """Delete a student along with their enrollments; False if there was no such student."""
+        return self.remove('students', student_id)
+
+    def remove_teacher(self, teacher_id):
+        return self.remove('teachers', teacher_id)
+
+    def remove_course(self, course_code):
+        return self.remove('courses', course_code)
+
+    def remove(self, category, key):
+        removed = self.backend.delete(category, key)
+        if removed:
+            self.names.remove(category, key)
+        return removed
+
+    # ---------- relationships ----------
+    def enroll(self, student_id, course_code):
+        self.backend.link('enrollments', student_id, course_code)
+
+    def enroll_many(self, pairs):
+        """Enroll (student_id, course_code) pairs in one transaction / journal write."""
+        self.backend.link_many('enrollments', list(pairs))
+
+    def unenroll(self, student_id, course_code):
+        return self.backend.unlink('enrollments', student_id, course_code)
+
+    def assign_teacher(self, teacher_id, course_code):
+        self.backend.link('assignments', teacher_id, course_code)
+
+    def unassign_teacher(self, teacher_id, course_code):
+        return self.backend.unlink('assignments', teacher_id, course_code)
+
+    def courses_of(self, student_id):
+        return self.backend.related('enrollments', student_id)
+
+    def students_in(self, course_code):
+        return self.backend.related('enrollments', course_code, reverse=True)
+
+    def courses_taught_by(self, teacher_id):
+        return self.backend.related('assignments', teacher_id)
+
+    def teachers_of(self, course_code):
+        return self.backend.related('assignments', course_code, reverse=True)
+
+    def course_size(self, course_code):
+        return self.backend.link_count('enrollments', course_code, reverse=True)
+
+    def course_sizes(self):
+        """(course_code, enrolled students) for every course with at least one student."""
+        return self.backend.link_counts('enrollments', reverse=True)
+
+    def close(self):
+        self.backend.close()
+        if self.index_path:
+            try:
+                self.names.save(self.index_path, data_fingerprint(self.filename))
+            except OSError as e:
+                print(f"Could not save the name index: {e}")  # rebuilt on the next start
+
+class RecordView:
+    """Scrollable list of one category that only ever holds the visible rows.
+
+    Rows are fetched through the service by offset as the user scrolls, and
+    typing in the search box narrows them to names starting with the text.
+    Answers to outdated requests (the user scrolled or typed on) are dropped.
+    """
+    ROWS = 25
+    SEARCH_DELAY_MS = 150
+
+    def __init__(self, root, service, category, title):
+        self.service = service
+        self.category = category
+        self.key_field = KEY_FIELDS[category]
+        self.offset = 0
+        self.total = 0
+        self.prefix = ''
+        self._search_job = None
+        self._request = 0        # id of the latest refresh; older pages are ignored
+        self._count_request = 0  # id of the latest recount; scrolling doesn't make a count stale
+
+        self.window = tk.Toplevel(root)
+        self.window.title(title)
+
+        self.search_var = tk.StringVar()
+        search = tk.Entry(self.window, textvariable=self.search_var)
+        search.pack(fill="x", padx=5, pady=5)
+        search.focus_set()
+        self.search_var.trace_add("write", self.on_search)
+
+        frame = tk.Frame(self.window)
+        frame.pack(fill="both", expand=True, padx=5)
+        self.tree = ttk.Treeview(frame, columns=("name", "id"), show="headings", height=self.ROWS)
+        self.tree.heading("name", text="Name")
+        self.tree.heading("id", text=self.key_field.replace("_", " ").title())
+        self.tree.pack(side="left", fill="both", expand=True)
+        self.scrollbar = tk.Scrollbar(frame, orient="vertical", command=self.on_scroll)
+        self.scrollbar.pack(side="right", fill="y")
+
+        self.tree.bind("<MouseWheel>", lambda e: self.scroll_to(self.offset - 3 if e.delta > 0 else self.offset + 3))
+        self.tree.bind("<Button-4>", lambda e: self.scroll_to(self.offset - 3))
+        self.tree.bind("<Button-5>", lambda e: self.scroll_to(self.offset + 3))
+        self.tree.bind("<Prior>", lambda e: self.scroll_to(self.offset - self.ROWS))
+        self.tree.bind("<Next>", lambda e: self.scroll_to(self.offset + self.ROWS))
+
+        self.status = tk.Label(self.window, anchor="w")
+        self.status.pack(fill="x", padx=5, pady=5)
+        self.refresh()
+
+    def on_search(self, *args):
+        # Wait for a pause in typing instead of querying on every key
+        if self._search_job:
+            self.window.after_cancel(self._search_job)
+        self._search_job = self.window.after(self.SEARCH_DELAY_MS, self.apply_search)
+
+    def apply_search(self):
+        self._search_job = None
+        self.prefix = self.search_var.get().strip()
+        self.offset = 0
+        self.refresh()
+
+    def on_scroll(self, action, amount, unit=None):
+        if action == "moveto":
+            self.scroll_to(int(float(amount) * self.total))
+        elif unit == "pages":
+            self.scroll_to(self.offset + int(amount) * self.ROWS)
+        else:
+            self.scroll_to(self.offset + int(amount))
+
+    def scroll_to(self, offset):
+        offset = max(0, min(offset, self.total - self.ROWS))
+        if offset != self.offset:
+            self.offset = offset
+            self.refresh(recount=False)
+
+    def refresh(self, recount=True):
+        self._request += 1
+        request = self._request
+        if recount:
+            self._count_request = request
+            self.status.config(text="Loading...")
+            self.service.call('count', self.category, self.prefix,
+                              on_done=lambda total: self.on_count(request, total))
+        self.service.call('page', self.category, self.offset, self.ROWS, self.prefix,
+                          on_done=lambda rows: self.on_page(request, rows))
+
+    def is_current(self, request):
+        return request == self._request and self.window.winfo_exists()
+
+    def on_count(self, request, total):
+        if request != self._count_request or not self.window.winfo_exists():
+            return
+        self.total = total
+        last = max(0, total - self.ROWS)
+        if self.offset > last:  # scrolled against the previous total while counting
+            self.offset = last
+            self.refresh(recount=False)
+
+    def on_page(self, request, rows):
+        # The latest count was queued before this page, so it has arrived already
+        if not self.is_current(request):
+            return
+        self.tree.delete(*self.tree.get_children())
+        for record in rows:
+            self.tree.insert("", "end", values=(record["name"], record[self.key_field]))
+
+        if self.total:
+            self.scrollbar.set(self.offset / self.total, (self.offset + len(rows)) / self.total)
+            self.status.config(text=f"{self.offset + 1}-{self.offset + len(rows)} of {self.total}")
+        else:
+            self.scrollbar.set(0, 1)
+            self.status.config(text="No records found.")
+
+class FindView:
+    """Fuzzy name search across students, teachers and courses.
+
+    Matches come from the system's trigram index, so misspelled names are
+    found and each query is answered in milliseconds even with 100k+ names.
+    """
+    LIMIT = 25
+    SEARCH_DELAY_MS = 150
+    ALL = "all"
+
+    def __init__(self, root, service):
+        self.service = service
+        self._search_job = None
+        self._request = 0  # id of the latest search; older answers are ignored
+
+        self.window = tk.Toplevel(root)
+        self.window.title("Find")
+
+        bar = tk.Frame(self.window)
+        bar.pack(fill="x", padx=5, pady=5)
+        self.search_var = tk.StringVar()
+        search = tk.Entry(bar, textvariable=self.search_var)
+        search.pack(side="left", fill="x", expand=True)
+        search.focus_set()
+        self.category_var = tk.StringVar(value=self.ALL)
+        ttk.Combobox(bar, textvariable=self.category_var, values=(self.ALL,) + CATEGORIES,
+                     state="readonly", width=10).pack(side="right", padx=(5, 0))
+        self.search_var.trace_add("write", self.on_search)
+        self.category_var.trace_add("write", self.on_search)
+
+        self.tree = ttk.Treeview(self.window, columns=("name", "category", "id", "match"),
+                                 show="headings", height=self.LIMIT)
+        for column, text in (("name", "Name"), ("category", "Category"), ("id", "ID"), ("match", "Match")):
+            self.tree.heading(column, text=text)
+        self.tree.column("match", width=60, anchor="e")
+        self.tree.pack(fill="both", expand=True, padx=5)
+
+        self.status = tk.Label(self.window, anchor="w", text="Type a name; spelling doesn't have to be exact.")
+        self.status.pack(fill="x", padx=5, pady=5)
+
+    def on_search(self, *args):
+        if self._search_job:
+            self.window.after_cancel(self._search_job)
+        self._search_job = self.window.after(self.SEARCH_DELAY_MS, self.apply_search)
+
+    def apply_search(self):
+        self._search_job = None
+        self._request += 1
+        request = self._request
+        query = self.search_var.get().strip()
+        category = self.category_var.get()
+        if not query:
+            self.on_results(request, [])
+            return
+        self.service.call('fuzzy_search', query, self.LIMIT, None if category == self.ALL else category,
+                          on_done=lambda results: self.on_results(request, results))
+
+    def on_results(self, request, results):
+        if request != self._request or not self.window.winfo_exists():
+            return
+        self.tree.delete(*self.tree.get_children())
+        for category, record, score in results:
+            self.tree.insert("", "end", values=(record["name"], category[:-1], record[KEY_FIELDS[category]],
+                                                f"{score:.0%}"))
+        self.status.config(text=f"{len(results)} matches" if results else "No matches.")
 
 class EducationApp:
-    def __init__(self, root, system):
-        self.system = system
+    def __init__(self, root, service):
+        self.service = service
         self.root = root
         self.root.title("Education System")
 
+        tk.Button(root, text="Find by Name", width=20, command=self.find).pack(pady=5)
         tk.Button(root, text="Add Student", width=20, command=self.add_student).pack(pady=5)
         tk.Button(root, text="View All Students", width=20, command=self.view_students).pack(pady=5)
         tk.Button(root, text="Add Teacher", width=20, command=self.add_teacher).pack(pady=5)
         tk.Button(root, text="View All Teachers", width=20, command=self.view_teachers).pack(pady=5)
         tk.Button(root, text="Add Course", width=20, command=self.add_course).pack(pady=5)
         tk.Button(root, text="View All Courses", width=20, command=self.view_courses).pack(pady=5)
+        tk.Button(root, text="Enroll Student", width=20, command=self.enroll_student).pack(pady=5)
+        tk.Button(root, text="Assign Teacher", width=20, command=self.assign_teacher).pack(pady=5)
+        tk.Button(root, text="Course Roster", width=20, command=self.course_roster).pack(pady=5)
+        tk.Button(root, text="Import Records", width=20, command=self.import_records).pack(pady=5)
+        tk.Button(root, text="Export Records", width=20, command=self.export_records).pack(pady=5)
         tk.Button(root, text="Exit", width=20, command=root.quit).pack(pady=5)
 
+        self.status = tk.Label(root, text="", anchor="w")
+        self.status.pack(fill="x", padx=5, pady=5)
+
+    def find(self):
+        FindView(self.root, self.service)
+
     def add_student(self):
         name = simpledialog.askstring("Input", "Enter Student Name:")
         student_id = simpledialog.askstring("Input", "Enter Student ID:")
         if name and student_id:
-            self.system.add_student(name, student_id)
-            messagebox.showinfo("Success", "Student added successfully!")
+            self.save('students', {"name": name, "student_id": student_id}, "Student added successfully!")
 
     def view_students(self):
-        students = self.system.get_all('students')
-        self.show_list("Students", students)
+        RecordView(self.root, self.service, 'students', "Students")
 
     def add_teacher(self):
         name = simpledialog.askstring("Input", "Enter Teacher Name:")
         teacher_id = simpledialog.askstring("Input", "Enter Teacher ID:")
         if name and teacher_id:
-            self.system.add_teacher(name, teacher_id)
-            messagebox.showinfo("Success", "Teacher added successfully!")
+            self.save('teachers', {"name": name, "teacher_id": teacher_id}, "Teacher added successfully!")
 
     def view_teachers(self):
-        teachers = self.system.get_all('teachers')
-        self.show_list("Teachers", teachers)
+        RecordView(self.root, self.service, 'teachers', "Teachers")
 
     def add_course(self):
         name = simpledialog.askstring("Input", "Enter Course Name:")
         course_code = simpledialog.askstring("Input", "Enter Course Code:")
         if name and course_code:
-            self.system.add_course(name, course_code)
-            messagebox.showinfo("Success", "Course added successfully!")
+            self.save('courses', {"name": name, "course_code": course_code}, "Course added successfully!")
 
     def view_courses(self):
-        courses = self.system.get_all('courses')
-        self.show_list("Courses", courses)
+        RecordView(self.root, self.service, 'courses', "Courses")
+
+    def save(self, category, record, message):
+        self.set_status("Saving...")
+        self.service.add(category, record, on_done=lambda _: self.done(message), on_error=self.failed)
 
-    def show_list(self, title, items):
-        if not items:
-            messagebox.showinfo(title, "No records found.")
+    def done(self, message):
+        self.set_status(message)
+        messagebox.showinfo("Success", message)
+
+    def failed(self, error):
+        self.set_status("")
+        if isinstance(error, (DuplicateIdError, UnknownIdError)):
+            messagebox.showerror("Error", str(error))
+        else:
+            messagebox.showerror("Error", f"Could not save: {error}")
+
+    def enroll_student(self):
+        student_id = simpledialog.askstring("Input", "Enter Student ID:")
+        course_code = simpledialog.askstring("Input", "Enter Course Code:")
+        if student_id and course_code:
+            self.service.call('enroll', student_id, course_code,
+                              on_done=lambda _: self.done("Student enrolled successfully!"), on_error=self.failed)
+
+    def assign_teacher(self):
+        teacher_id = simpledialog.askstring("Input", "Enter Teacher ID:")
+        course_code = simpledialog.askstring("Input", "Enter Course Code:")
+        if teacher_id and course_code:
+            self.service.call('assign_teacher', teacher_id, course_code,
+                              on_done=lambda _: self.done("Teacher assigned successfully!"), on_error=self.failed)
+
+    def course_roster(self):
+        course_code = simpledialog.askstring("Input", "Enter Course Code:")
+        if course_code:
+            self.service.submit(self.roster_text, self.service.system, course_code,
+                                on_done=lambda text: messagebox.showinfo("Course Roster", text), on_error=self.failed)
+
+    @staticmethod
+    def roster_text(system, course_code):
+        """Runs on the service worker."""
+        course = system.get('courses', course_code)
+        if course is None:
+            raise UnknownIdError('courses', course_code)
+        teachers = ", ".join(t["name"] for t in system.teachers_of(course_code)) or "none"
+        students = [f"{s['name']} ({s['student_id']})" for _, s in zip(range(20), system.students_in(course_code))]
+        size = system.course_size(course_code)
+        more = f"\n... and {size - len(students)} more" if size > len(students) else ""
+        return (f"{course['name']} ({course_code})\nTeachers: {teachers}\n"
+                f"{size} students:\n" + "\n".join(students) + more)
+
+    def ask_category(self):
+        category = simpledialog.askstring("Input", "Category (students, teachers or courses):")
+        if category is None:
+            return None
+        category = category.strip().lower()
+        if category not in CATEGORIES:
+            messagebox.showerror("Error", f"Unknown category: {category}")
+            return None
+        return category
+
+    def set_status(self, text):
+        self.status.config(text=text)
+
+    def import_records(self):
+        category = self.ask_category()
+        if not category:
             return
-        result = "\n".join([str(item) for item in items])
-        messagebox.showinfo(title, result)
+        path = filedialog.askopenfilename(title=f"Import {category}",
+                                          filetypes=[("CSV", "*.csv"), ("JSON lines", "*.jsonl"), ("JSON", "*.json"),
+                                                     ("All files", "*")])
+        if not path:
+            return
+        self.set_status("Importing...")
+        progress = lambda r: self.service.post(self.set_status, f"Importing... {r}")
+        self.service.submit(lambda system: education_bulk.import_file(system, category, path, progress=progress),
+                            self.service.system, on_done=self.import_done, on_error=self.failed)
+
+    def import_done(self, report):
+        self.set_status(f"Import done: {report}")
+        details = "\n".join(f"Line {line}: {message}" for line, message in report.errors[:10])
+        messagebox.showinfo("Import", f"{report}\n{details}".strip())
+
+    def export_records(self):
+        category = self.ask_category()
+        if not category:
+            return
+        path = filedialog.asksaveasfilename(title=f"Export {category}", defaultextension=".csv",
+                                            filetypes=[("CSV", "*.csv"), ("JSON lines", "*.jsonl"), ("JSON", "*.json")])
+        if not path:
+            return
+        self.set_status("Exporting...")
+        progress = lambda n: self.service.post(self.set_status, f"Exporting... {n} records")
+        self.service.submit(lambda system: education_bulk.export_file(system, category, path, progress=progress),
+                            self.service.system, on_done=lambda count: self.export_done(category, path, count), on_error=self.failed)
+
+    def export_done(self, category, path, count):
+        self.set_status(f"Exported {count} {category}")
+        messagebox.showinfo("Export", f"Exported {count} {category} to {path}")
 
 if __name__ == "__main__":
     root = tk.Tk()
-    app = EducationApp(root, EducationSystem())
+    service = EducationService(EducationSystem('education_data.db'), root)
+    app = EducationApp(root, service)
     root.mainloop()
+    service.close()
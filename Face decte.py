@@ -1,11 +1,22 @@
+import time
+
 import cv2
 
+from face_log import EventLog, IouTracker, ThumbnailStore
+
 # Load the Haar cascade file for face detection
 face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
 
 # Start video capture from the webcam
 cap = cv2.VideoCapture(0)  # 0 is the default camera
 
+# Detections are logged to face_events.jsonl and face crops kept in face_thumbs/;
+# both are written on background threads so detection never waits on the disk
+tracker = IouTracker()
+events = EventLog('face_events.jsonl')
+thumbnails = ThumbnailStore('face_thumbs')
+frame_number = 0
+
 while True:
     # Read each frame from the camera
     ret, frame = cap.read()
@@ -17,10 +28,19 @@ while True:
 
     # Detect faces in the frame
     faces = face_cascade.detectMultiScale(gray, scaleFactor=1.1, minNeighbors=5)
-
-    # Draw rectangle around the faces
-    for (x, y, w, h) in faces:
+    now = time.time()
+    frame_number += 1
+    track_ids = tracker.update(faces)
+
+    # Record each face, then draw its rectangle (after cropping, so the crop stays clean)
+    for (x, y, w, h), track in zip(faces, track_ids):
+        thumb = None
+        if tracker.thumbnail_due(track, now):
+            thumb = thumbnails.submit(f"{int(now * 1000)}-{track}", frame[y:y+h, x:x+w].copy())
+        events.log({'t': round(now, 3), 'frame': frame_number, 'track': track,
+                    'box': [int(x), int(y), int(w), int(h)], 'thumb': thumb})
         cv2.rectangle(frame, (x, y), (x+w, y+h), (255, 0, 0), 2)
+        cv2.putText(frame, f"#{track}", (x, y - 6), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 0, 0), 2)
 
     # Display the output
     cv2.imshow('Face Detection', frame)
@@ -31,4 +51,6 @@ while True:
 
 # Release resources
 cap.release()
+events.close()
+thumbnails.close()
 cv2.destroyAllWindows()
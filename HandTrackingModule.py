@@ -3,22 +3,39 @@ import mediapipe as mp
 
 
 class HandDetector:
-    def __init__(self, mode=False, maxHands=2, detectionCon=0.5, trackCon=0.5):
+    def __init__(self, mode=False, maxHands=2, detectionCon=0.5, trackCon=0.5, complexity=1, governor=None):
         self.mode = mode
         self.maxHands = maxHands
         self.detectionCon = detectionCon
         self.trackCon = trackCon
+        self.complexity = complexity
+        self.governor = governor  # QualityGovernor trading quality for frame rate, or None
 
         self.mpHands = mp.solutions.hands
-        self.hands = self.mpHands.Hands(static_image_mode=self.mode,
-                                        max_num_hands=self.maxHands,
-                                        min_detection_confidence=self.detectionCon,
-                                        min_tracking_confidence=self.trackCon)
+        self.hands = None  # built on first local use; broker results don't need it
+        self.handsComplexity = None
         self.mpDraw = mp.solutions.drawing_utils
+        self.results = None
 
-    def find_hands(self, img, draw=True):
-        imgRGB = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-        self.results = self.hands.process(imgRGB)
+    def find_hands(self, img, draw=True, results=None):
+        """Find hands in img, or take `results` already computed by the vision broker."""
+        if results is None:
+            complexity = self.governor.settings.complexity if self.governor else self.complexity
+            if self.hands is None or complexity != self.handsComplexity:
+                if self.hands is not None:
+                    self.hands.close()
+                self.hands = self.mpHands.Hands(static_image_mode=self.mode,
+                                                max_num_hands=self.maxHands,
+                                                model_complexity=complexity,
+                                                min_detection_confidence=self.detectionCon,
+                                                min_tracking_confidence=self.trackCon)
+                self.handsComplexity = complexity
+            if self.governor:
+                results = self.governor.process(self.hands, img, self.results, 'multi_hand_landmarks')
+            else:
+                imgRGB = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+                results = self.hands.process(imgRGB)
+        self.results = results
 
         if self.results.multi_hand_landmarks:
             for handLms in self.results.multi_hand_landmarks:
@@ -37,4 +54,4 @@ class HandDetector:
                 if draw:
                     cv2.circle(img, (cx, cy), 5, (255, 0, 255), cv2.FILLED)
 
-        return lmList
\ No newline at end of file
+        return lmList
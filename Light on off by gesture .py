@@ -1,12 +1,21 @@
 import cv2
 import mediapipe as mp
 
+from quality_governor import QualityGovernor
+from vision_broker import open_capture
+
 mp_face = mp.solutions.face_detection
 mp_hands = mp.solutions.hands
 mp_drawing = mp.solutions.drawing_utils
 
-face_detection = mp_face.FaceDetection(min_detection_confidence=0.5)
-hands = mp_hands.Hands(max_num_hands=1, min_detection_confidence=0.7)
+# Frames come mirrored; with vision_broker.py running the broker's results are mirrored to match
+cap = open_capture(['face_detection', 'hands'], mirror=True)
+if not cap.brokered:
+    face_detection = mp_face.FaceDetection(min_detection_confidence=0.5)
+    hands = None  # rebuilt whenever the governor changes model complexity
+    hands_complexity = None
+governor = QualityGovernor(target_fps=30, name="light control", max_level=0 if cap.brokered else None)
+face_result = hand_result = None
 
 lights = [0, 0, 0, 0, 0]
 
@@ -31,26 +40,34 @@ def draw_lights(frame, lights):
         cv2.circle(frame, (50 + i * 100, 50), 30, color, -1)
         cv2.putText(frame, f"L{i+1}", (35 + i * 100, 100), cv2.FONT_HERSHEY_SIMPLEX, 0.7, color, 2)
 
-cap = cv2.VideoCapture(0)
-
 while True:
     success, frame = cap.read()
     if not success:
         break
 
-    frame = cv2.flip(frame, 1)
-    rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-
-    face_result = face_detection.process(rgb_frame)
+    governor.start_frame()
+    if cap.brokered:
+        face_result = cap.results['face_detection']
+    else:
+        face_result = governor.process(face_detection, frame, face_result)
     face_detected = face_result.detections is not None
 
     if face_detected:
         for detection in face_result.detections:
             mp_drawing.draw_detection(frame, detection)
 
-        hand_result = hands.process(rgb_frame)
+        if cap.brokered:
+            hand_result = cap.results['hands']
+        else:
+            if hands_complexity != governor.settings.complexity:
+                if hands:
+                    hands.close()
+                hands_complexity = governor.settings.complexity
+                hands = mp_hands.Hands(max_num_hands=1, model_complexity=hands_complexity,
+                                       min_detection_confidence=0.7)
+            hand_result = governor.process(hands, frame, hand_result, 'multi_hand_landmarks')
         if hand_result.multi_hand_landmarks:
-            for hand_landmarks in hand_result.multi_hand_landmarks:
+            for hand_landmarks in hand_result.multi_hand_landmarks[:1]:  # the broker may report two
                 mp_drawing.draw_landmarks(frame, hand_landmarks, mp_hands.HAND_CONNECTIONS)
                 finger_count = count_fingers(hand_landmarks)
 
@@ -61,6 +78,7 @@ while True:
 
     draw_lights(frame, lights)
     cv2.imshow("Virtual Light Control", frame)
+    governor.end_frame()
 
     if cv2.waitKey(1) & 0xFF == 27:  # ESC to exit
         break
@@ -8,15 +8,18 @@ from ctypes import cast, POINTER
 from comtypes import CLSCTX_ALL
 from pycaw.pycaw import AudioUtilities, IAudioEndpointVolume
 from HandTrackingModule import HandDetector
+from quality_governor import QualityGovernor
+from vision_broker import open_capture
 
 # ====================== Camera Setup ======================
+# Shares the camera and hand model through vision_broker.py when it is running
 wCam, hCam = 640, 480
-cap = cv2.VideoCapture(0)
-cap.set(3, wCam)
-cap.set(4, hCam)
+cap = open_capture(['hands'], 0, wCam, hCam)
 
 # ====================== Hand Detector ======================
-detector = HandDetector(maxHands=1, detectionCon=0.85, trackCon=0.8)
+# The governor lowers model quality on slow machines to hold 30 FPS (nothing to lower when brokered)
+governor = QualityGovernor(target_fps=30, name="hand mouse", max_level=0 if cap.brokered else None)
+detector = HandDetector(maxHands=1, detectionCon=0.85, trackCon=0.8, governor=governor)
 
 # ====================== Misc Setup ======================
 tipIds = [4, 8, 12, 16, 20]
@@ -37,9 +40,10 @@ while True:
     if not success:
         print("Failed to capture frame from camera.")
         break
+    governor.start_frame()
 
     # Detect hand landmarks
-    img = detector.find_hands(img)
+    img = detector.find_hands(img, results=cap.results.get('hands'))
     lmList = detector.find_position(img, draw=False)
     fingers = []
 
@@ -115,9 +119,11 @@ while True:
     fps = 100 / ((cTime + 1) - pTime)
     pTime = cTime
     cv2.putText(img, f'FPS:{int(fps)}', (480, 50), cv2.FONT_ITALIC, 1, (255, 0, 0), 2)
+    cv2.putText(img, f'Q{governor.level}', (480, 80), cv2.FONT_ITALIC, 0.7, (255, 0, 0), 2)
 
     # ====================== Show Frame ======================
     cv2.imshow('Hand LiveFeed', img)
+    governor.end_frame()
     if cv2.waitKey(1) & 0xFF == ord('q'):
         break
 
@@ -160,4 +166,4 @@ class HandDetector:
                 if draw:
                     cv2.circle(img, (cx, cy), 5, (255, 0, 255), cv2.FILLED)
 
-        return lmList
\ No newline at end of file
+        return lmList
@@ -1,14 +1,24 @@
+import time
 import tkinter as tk
-import math
+from tkinter import ttk
+
+import numpy as np
+
+import expr_engine
 
 # Create main window
 root = tk.Tk()
 root.title("Professional Calculator")
-root.geometry("400x600")
+root.geometry("400x750")
 
 # Entry field
 entry = tk.Entry(root, font=("Arial", 20), borderwidth=5, relief="sunken", justify='right')
-entry.pack(pady=20, padx=10, fill='x')
+entry.pack(pady=(20, 0), padx=10, fill='x')
+entry.bind("<Return>", lambda e: calculate())
+
+# Error details
+status = tk.Label(root, text="", font=("Arial", 10), fg="red", anchor='w')
+status.pack(padx=10, fill='x')
 
 # Function Definitions
 def insert_value(value):
@@ -16,55 +26,110 @@ def insert_value(value):
 
 def clear():
     entry.delete(0, tk.END)
+    status.config(text="")
 
-def calculate():
-    try:
-        result = eval(entry.get())
-        entry.delete(0, tk.END)
-        entry.insert(0, result)
-    except:
-        entry.delete(0, tk.END)
-        entry.insert(0, "Error")
-
-def sqrt():
-    try:
-        value = float(entry.get())
-        entry.delete(0, tk.END)
-        entry.insert(0, math.sqrt(value))
-    except:
-        entry.insert(0, "Error")
+def format_result(value):
+    if isinstance(value, float) and value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value)
 
-def log():
-    try:
-        value = float(entry.get())
-        entry.delete(0, tk.END)
-        entry.insert(0, math.log10(value))
-    except:
-        entry.insert(0, "Error")
-
-def sin():
-    try:
-        value = math.radians(float(entry.get()))
-        entry.delete(0, tk.END)
-        entry.insert(0, math.sin(value))
-    except:
-        entry.insert(0, "Error")
-
-def cos():
-    try:
-        value = math.radians(float(entry.get()))
-        entry.delete(0, tk.END)
-        entry.insert(0, math.cos(value))
-    except:
-        entry.insert(0, "Error")
-
-def tan():
+def calculate():
     try:
-        value = math.radians(float(entry.get()))
+        result = expr_engine.evaluate(entry.get())
+    except (ArithmeticError, ValueError) as e:  # includes ExpressionError
+        status.config(text=str(e))
         entry.delete(0, tk.END)
-        entry.insert(0, math.tan(value))
-    except:
         entry.insert(0, "Error")
+        return
+    status.config(text="")
+    entry.delete(0, tk.END)
+    entry.insert(0, format_result(result))
+
+def insert_function(name):
+    # Functions are part of the expression now, e.g. 2*sin(30)+sqrt(16)
+    if entry.get() == "Error":
+        clear()
+    entry.insert(tk.END, name + "(")
+
+# Function table / plot mode
+TABLE_ROWS = 15
+PLOT_WIDTH, PLOT_HEIGHT = 460, 220
+MAX_POINTS = 5_000_000
+
+def open_table():
+    window = tk.Toplevel(root)
+    window.title("Function Table")
+
+    form = tk.Frame(window)
+    form.pack(padx=10, pady=5, fill='x')
+    fields = {}
+    text = entry.get()
+    defaults = [("f(x) =", text if text != "Error" else "", 24), ("from", "-10", 7), ("to", "10", 7), ("points", "1000000", 9)]
+    for label, default, width in defaults:
+        tk.Label(form, text=label).pack(side='left')
+        field = tk.Entry(form, width=width)
+        field.insert(0, default)
+        field.pack(side='left', padx=(2, 8))
+        fields[label] = field
+
+    message = tk.Label(window, text="", anchor='w')
+    canvas = tk.Canvas(window, width=PLOT_WIDTH, height=PLOT_HEIGHT, bg="white")
+    table = ttk.Treeview(window, columns=("x", "y"), show="headings", height=TABLE_ROWS)
+    table.heading("x", text="x")
+    table.heading("y", text="f(x)")
+
+    def run():
+        try:
+            start = float(fields["from"].get())
+            stop = float(fields["to"].get())
+            points = int(fields["points"].get())
+            if not 2 <= points <= MAX_POINTS:
+                raise ValueError(f"points must be between 2 and {MAX_POINTS:,}")
+            t0 = time.perf_counter()
+            xs, ys = expr_engine.evaluate_range(fields["f(x) ="].get(), start, stop, points)
+            elapsed = time.perf_counter() - t0
+        except (ArithmeticError, ValueError) as e:
+            message.config(text=str(e), fg="red")
+            return
+        invalid = int(np.isnan(ys).sum())
+        message.config(fg="black", text=f"{points:,} points in {elapsed * 1000:.0f} ms"
+                                        + (f", {invalid:,} undefined" if invalid else ""))
+        show_table(xs, ys)
+        draw_plot(ys)
+
+    def show_table(xs, ys):
+        table.delete(*table.get_children())
+        for i in np.linspace(0, len(xs) - 1, min(TABLE_ROWS, len(xs))).astype(int):
+            y = "undefined" if np.isnan(ys[i]) else f"{ys[i]:.6g}"
+            table.insert("", "end", values=(f"{xs[i]:.6g}", y))
+
+    def draw_plot(ys):
+        # One vertical line per pixel column from the min to the max it covers
+        canvas.delete("all")
+        low, high = expr_engine.downsample_minmax(ys, PLOT_WIDTH)
+        finite = ~np.isnan(low)
+        if not finite.any():
+            return
+        y_min, y_max = low[finite].min(), high[finite].max()
+        if y_max == y_min:
+            y_min, y_max = y_min - 1, y_max + 1
+        scale = (PLOT_HEIGHT - 10) / (y_max - y_min)
+        to_pixel = lambda v: PLOT_HEIGHT - 5 - (v - y_min) * scale
+        if y_min < 0 < y_max:
+            canvas.create_line(0, to_pixel(0), PLOT_WIDTH, to_pixel(0), fill="gray")
+        step = PLOT_WIDTH / len(low)
+        for i in np.flatnonzero(finite):
+            x = i * step
+            canvas.create_line(x, to_pixel(low[i]), x, to_pixel(high[i]) - 1, fill="blue")
+        canvas.create_text(4, 4, anchor='nw', text=f"{y_max:.4g}", fill="gray")
+        canvas.create_text(4, PLOT_HEIGHT - 4, anchor='sw', text=f"{y_min:.4g}", fill="gray")
+
+    tk.Button(form, text="Evaluate", command=run).pack(side='left')
+    for field in fields.values():
+        field.bind("<Return>", lambda e: run())
+    message.pack(padx=10, fill='x')
+    canvas.pack(padx=10, pady=5)
+    table.pack(padx=10, pady=(0, 10), fill='x')
 
 # Button Layout
 buttons = [
@@ -72,6 +137,8 @@ buttons = [
     ('4', '5', '6', '*'),
     ('1', '2', '3', '-'),
     ('0', '.', '=', '+'),
+    ('(', ')', '^', '%'),
+    ('x', ',', 'f(x)'),
 ]
 
 # Create button widgets for numbers and operators
@@ -81,22 +148,18 @@ for row in buttons:
     for btn in row:
         if btn == '=':
             tk.Button(frame, text=btn, font=("Arial", 18), command=calculate, width=5, height=2).pack(side='left', padx=5)
+        elif btn == 'f(x)':
+            tk.Button(frame, text=btn, font=("Arial", 18), command=open_table, width=12, height=2).pack(side='left', padx=5)
         else:
             tk.Button(frame, text=btn, font=("Arial", 18), command=lambda b=btn: insert_value(b), width=5, height=2).pack(side='left', padx=5)
 
 # Scientific function buttons
-sci_buttons = [
-    ('sqrt', sqrt),
-    ('log', log),
-    ('sin', sin),
-    ('cos', cos),
-    ('tan', tan),
-]
+sci_buttons = ['sqrt', 'log', 'sin', 'cos', 'tan']
 
 frame = tk.Frame(root)
 frame.pack(pady=10)
-for (label, func) in sci_buttons:
-    tk.Button(frame, text=label, font=("Arial", 14), command=func, width=6, height=2).pack(side='left', padx=5)
+for label in sci_buttons:
+    tk.Button(frame, text=label, font=("Arial", 14), command=lambda f=label: insert_function(f), width=6, height=2).pack(side='left', padx=5)
 
 # Clear button
 tk.Button(root, text="Clear", font=("Arial", 14), command=clear, bg="red", fg="white", width=20).pack(pady=10)
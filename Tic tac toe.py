@@ -1,69 +1,122 @@
+import argparse
+import threading
 import tkinter as tk
 from tkinter import messagebox
 
+from kinarow_engine import EMPTY, O, SYMBOLS, X, Board, SearchAI
+from tictactoe_engine import Solver
+
+BOARD_PIXELS = 600
+MAX_CELL = 160
+
 # Main Game Class
 class TicTacToe:
-    def __init__(self, root):
+    def __init__(self, root, size=3, k=3, time_budget=1.0):
         self.root = root
-        self.root.title("Touch Interactive Tic Tac Toe")
-        self.player = "X"
-        self.buttons = [[None for _ in range(3)] for _ in range(3)]
-        self.create_buttons()
+        self.root.title("Touch Interactive Tic Tac Toe" if size == 3 else f"{k} in a Row ({size}x{size})")
+        self.board = Board(size, k)
+        # 3x3 is solved ahead of time; larger boards are searched within the time budget
+        self.solver = Solver() if (size, k) == (3, 3) else None
+        self.ai = SearchAI(time_budget)
+        self.thinking = False
+        self.vs_computer = tk.BooleanVar(value=True)
+
+        self.cell = min(MAX_CELL, BOARD_PIXELS // size)
+        self.canvas = tk.Canvas(root, width=self.cell * size, height=self.cell * size, bg="white",
+                                highlightthickness=0)
+        self.canvas.pack()
+        self.canvas.bind("<Button-1>", self.on_click)
+        self.status = tk.Label(root, text="", font=('Helvetica', 12))
+        self.status.pack(fill="x")
+        tk.Checkbutton(root, text="Computer plays O", variable=self.vs_computer,
+                       command=self.computer_turn).pack()
+        self.draw_grid()
+
+    # One canvas: grid lines drawn once, pieces added move by move
+    def draw_grid(self):
+        end = self.cell * self.board.size
+        for i in range(1, self.board.size):
+            self.canvas.create_line(i * self.cell, 0, i * self.cell, end, fill="gray")
+            self.canvas.create_line(0, i * self.cell, end, i * self.cell, fill="gray")
 
-    # Create the 3x3 grid of buttons
-    def create_buttons(self):
-        for row in range(3):
-            for col in range(3):
-                button = tk.Button(self.root, text=" ", font=('Helvetica', 40), height=2, width=5,
-                                   command=lambda r=row, c=col: self.on_click(r, c))
-                button.grid(row=row, column=col)
-                self.buttons[row][col] = button
+    def draw_piece(self, row, col, player):
+        pad = self.cell * 0.18
+        x0, y0 = col * self.cell + pad, row * self.cell + pad
+        x1, y1 = (col + 1) * self.cell - pad, (row + 1) * self.cell - pad
+        width = max(2, self.cell // 12)
+        if player == X:
+            self.canvas.create_line(x0, y0, x1, y1, width=width, fill="blue", tags="piece")
+            self.canvas.create_line(x0, y1, x1, y0, width=width, fill="blue", tags="piece")
+        else:
+            self.canvas.create_oval(x0, y0, x1, y1, width=width, outline="red", tags="piece")
 
-    # Handle button clicks (touch/mouse)
-    def on_click(self, row, col):
-        button = self.buttons[row][col]
-        if button["text"] == " ":
-            button["text"] = self.player
-            if self.check_winner():
-                messagebox.showinfo("Game Over", f"Player {self.player} wins!")
-                self.reset_board()
-            elif self.check_draw():
-                messagebox.showinfo("Game Over", "It's a Draw!")
-                self.reset_board()
-            else:
-                self.player = "O" if self.player == "X" else "X"
+    def draw_win_line(self):
+        (r0, c0), (r1, c1) = self.board.win_line
+        center = lambda i: (i + 0.5) * self.cell
+        self.canvas.create_line(center(c0), center(r0), center(c1), center(r1), width=4, fill="green", tags="piece")
 
-    # Check for a winner
-    def check_winner(self):
-        for row in range(3):
-            if self.buttons[row][0]["text"] == self.buttons[row][1]["text"] == self.buttons[row][2]["text"] != " ":
-                return True
-        for col in range(3):
-            if self.buttons[0][col]["text"] == self.buttons[1][col]["text"] == self.buttons[2][col]["text"] != " ":
-                return True
-        if self.buttons[0][0]["text"] == self.buttons[1][1]["text"] == self.buttons[2][2]["text"] != " ":
-            return True
-        if self.buttons[0][2]["text"] == self.buttons[1][1]["text"] == self.buttons[2][0]["text"] != " ":
-            return True
-        return False
+    # Handle clicks/touches on the canvas
+    def on_click(self, event):
+        if self.thinking or (self.vs_computer.get() and self.board.player == O):
+            return  # the computer's turn
+        row, col = event.y // self.cell, event.x // self.cell
+        if 0 <= row < self.board.size and 0 <= col < self.board.size and self.move(row, col):
+            self.computer_turn()
 
-    # Check for a draw
-    def check_draw(self):
-        for row in range(3):
-            for col in range(3):
-                if self.buttons[row][col]["text"] == " ":
-                    return False
+    def computer_turn(self):
+        if not self.vs_computer.get() or self.board.player != O or self.board.over() or self.thinking:
+            return
+        if self.solver:
+            x, o = self.board.bitboards()
+            self.move(*divmod(self.solver.best_move(x, o), 3))
+            return
+        # Search on a worker thread so the window stays responsive
+        self.thinking = True
+        self.status.config(text="Computer is thinking...")
+        result = []
+        threading.Thread(target=lambda: result.append(self.ai.choose_move(self.board)), daemon=True).start()
+        self.root.after(20, self.wait_for_ai, result)
+
+    def wait_for_ai(self, result):
+        if not result:
+            self.root.after(20, self.wait_for_ai, result)
+            return
+        self.thinking = False
+        self.status.config(text=f"Searched {self.ai.last_depth} moves ahead")
+        self.move(*result[0])
+
+    # Play a cell for the side to move; True if the game goes on
+    def move(self, row, col):
+        player = self.board.player
+        if not self.board.play(row, col):
+            return False
+        self.draw_piece(row, col, player)
+        if self.board.winner != EMPTY:
+            self.draw_win_line()
+            messagebox.showinfo("Game Over", f"Player {SYMBOLS[player]} wins!")
+            self.reset_board()
+            return False
+        if self.board.is_full():
+            messagebox.showinfo("Game Over", "It's a Draw!")
+            self.reset_board()
+            return False
         return True
 
     # Reset the board for a new game
     def reset_board(self):
-        for row in range(3):
-            for col in range(3):
-                self.buttons[row][col]["text"] = " "
-        self.player = "X"
+        self.board = Board(self.board.size, self.board.k)
+        self.canvas.delete("piece")
+        self.status.config(text="")
 
 # Run the Game
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tic tac toe and larger K-in-a-row games")
+    parser.add_argument('--size', type=int, default=3, help="board is size x size")
+    parser.add_argument('--k', type=int, default=None, help="stones in a row to win (default: 3, or 5 on big boards)")
+    parser.add_argument('--time', type=float, default=1.0, help="computer's thinking time per move in seconds")
+    args = parser.parse_args()
+    k = args.k or (3 if args.size == 3 else min(5, args.size))
+
     root = tk.Tk()
-    game = TicTacToe(root)
+    game = TicTacToe(root, args.size, k, args.time)
     root.mainloop()
@@ -0,0 +1,261 @@
+"""
+card_tournament.py
+Headless tournament runner for the playing cards.py game.
+
+N players (cards.Player) play M rounds: every round a fresh deck is shuffled,
+each player draws a hand and the best hand wins (a shared best hand is a
+tie). Rounds are played in vectorized chunks spread over a process pool;
+every chunk gets its own RNG stream spawned from one SeedSequence, so a seed
+reproduces the tournament whatever the number of workers.
+
+Results are streamed, as chunks complete, into a columnar results directory:
+meta.json plus one raw little-endian file per column (see COLUMNS), loaded
+back with load_results(). The leaderboard is updated from each chunk as it
+arrives, so nothing holds all rounds in memory.
+
+Usage:
+    python card_tournament.py --players 6 --rounds 10000000 --out results
+    python card_tournament.py --benchmark --rounds 2000000
+    python card_tournament.py --check --rounds 20000    # vectorized vs Deck/Player rounds
+"""
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+import card_sim
+import hand_eval
+from cards import DECK_SIZE, Deck, Player
+
+CHUNK = 100_000
+COLUMNS = {
+    'round': '<u8',    # round number
+    'winner': '<i2',   # winning player index, -1 on a tie
+    'value': '<i4',    # best score of the round (hand_eval value for poker)
+    'tied': '<u1',     # players sharing the best score
+}
+
+
+def play_round(deck, players, hand_size=5, game='poker', shuffle=True):
+    """One round with Deck and Player objects; returns (winner index or -1, best score).
+
+    With shuffle=False the deck is dealt in its current order. check()
+    replays decks through this to verify what _play_chunk does for many
+    rounds at once.
+    """
+    if shuffle:
+        deck.reset()
+        deck.shuffle()
+    for player in players:
+        player.draw_cards(deck, hand_size)
+    hands = np.stack([player.hand for player in players])
+    scores = card_sim.GAMES[game](hands[None])[0]
+    best = scores.max()
+    winners = np.flatnonzero(scores == best)
+    return (int(winners[0]) if len(winners) == 1 else -1), int(best)
+
+
+def _play_chunk(task):
+    first_round, count, seed, players, hand_size, game = task
+    rng = np.random.default_rng(seed)
+    hands = card_sim.deal(card_sim.shuffle_decks(rng, count), players, hand_size)
+    scores = card_sim.GAMES[game](hands)
+    best = scores.max(axis=1)
+    is_best = scores == best[:, None]
+    tied = is_best.sum(axis=1)
+    winner = np.where(tied == 1, is_best.argmax(axis=1), -1)
+    return {
+        'round': np.arange(first_round, first_round + count, dtype=COLUMNS['round']),
+        'winner': winner.astype(COLUMNS['winner']),
+        'value': best.astype(COLUMNS['value']),
+        'tied': tied.astype(COLUMNS['tied']),
+    }
+
+
+class Leaderboard:
+    """Running totals, updated one chunk of rounds at a time."""
+
+    def __init__(self, players, game):
+        self.players = players
+        self.game = game
+        self.rounds = 0
+        self.wins = np.zeros(len(players), dtype=np.int64)
+        self.ties = 0
+        self.winning_hands = np.zeros(len(hand_eval.HAND_NAMES), dtype=np.int64)
+
+    def add(self, chunk):
+        winner = chunk['winner']
+        self.rounds += len(winner)
+        self.wins += np.bincount(winner[winner >= 0], minlength=len(self.players))
+        self.ties += int((winner < 0).sum())
+        if self.game == 'poker':
+            self.winning_hands += np.bincount(hand_eval.category(chunk['value']), minlength=len(hand_eval.HAND_NAMES))
+
+    def standings(self):
+        """(player, wins, win share) best first."""
+        order = np.argsort(-self.wins, kind='stable')
+        return [(self.players[i], int(self.wins[i]), self.wins[i] / max(self.rounds, 1)) for i in order]
+
+    def report(self):
+        print(f"{'#':>3} {'player':<14} {'wins':>12} {'share':>8}")
+        for place, (player, wins, share) in enumerate(self.standings(), 1):
+            print(f"{place:>3} {player.name:<14} {wins:>12} {share:>8.3%}")
+        print(f"    {'ties':<14} {self.ties:>12} {self.ties / max(self.rounds, 1):>8.3%}")
+        if self.game == 'poker' and self.rounds:
+            print("Winning hands: " + ", ".join(f"{name} {n / self.rounds:.2%}"
+                                                for name, n in zip(hand_eval.HAND_NAMES, self.winning_hands) if n))
+
+
+class ResultWriter:
+    """Appends chunks of rounds to one raw file per column."""
+
+    def __init__(self, path, meta):
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.meta = dict(meta, columns=COLUMNS, rows=0)
+        self.files = {name: open(os.path.join(path, f"{name}.bin"), 'wb') for name in COLUMNS}
+
+    def write(self, chunk):
+        for name, file in self.files.items():
+            chunk[name].astype(COLUMNS[name], copy=False).tofile(file)
+        self.meta['rows'] += len(chunk['round'])
+
+    def close(self):
+        for file in self.files.values():
+            file.close()
+        with open(os.path.join(self.path, 'meta.json'), 'w') as file:
+            json.dump(self.meta, file, indent=2)
+
+
+def load_results(path):
+    """(meta, {column: memory-mapped array}) of a results directory."""
+    with open(os.path.join(path, 'meta.json')) as file:
+        meta = json.load(file)
+    columns = {name: np.memmap(os.path.join(path, f"{name}.bin"), dtype=dtype, mode='r', shape=(meta['rows'],))
+               for name, dtype in meta['columns'].items()}
+    return meta, columns
+
+
+def run_tournament(players, rounds, hand_size=5, game='poker', seed=0, workers=None, chunk=CHUNK,
+                   out=None, progress=None):
+    """Play `rounds` rounds across a process pool; returns the Leaderboard.
+
+    progress(leaderboard) is called as every chunk arrives.
+    """
+    if len(players) * hand_size > DECK_SIZE:
+        raise ValueError(f"{len(players)} hands of {hand_size} need more than {DECK_SIZE} cards")
+    starts = range(0, rounds, chunk)
+    # Independent, reproducible RNG stream per chunk
+    children = np.random.SeedSequence(seed).spawn(len(starts))
+    tasks = [(start, min(chunk, rounds - start), child, len(players), hand_size, game)
+             for start, child in zip(starts, children)]
+
+    board = Leaderboard(players, game)
+    writer = None
+    if out:
+        writer = ResultWriter(out, {'players': [p.name for p in players], 'rounds': rounds,
+                                    'hand_size': hand_size, 'game': game, 'seed': seed})
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for future in as_completed([pool.submit(_play_chunk, task) for task in tasks]):
+                result = future.result()
+                board.add(result)
+                if writer:
+                    writer.write(result)
+                if progress:
+                    progress(board)
+    finally:
+        if writer:
+            writer.close()
+    return board
+
+
+def check(players, rounds, hand_size=5, game='poker', seed=0):
+    """Replay the first chunk's decks one round at a time with Deck and Player.
+
+    Every deck _play_chunk shuffles is dealt again through play_round in
+    the same order; returns the number of rounds whose winner or best score
+    differ (0 when the vectorized runner is right).
+    """
+    rounds = min(rounds, CHUNK)
+    child = np.random.SeedSequence(seed).spawn(1)[0]  # the stream run_tournament gives chunk 0
+    result = _play_chunk((0, rounds, child, len(players), hand_size, game))
+    decks = card_sim.shuffle_decks(np.random.default_rng(child), rounds)
+    deck = Deck()
+    mismatches = 0
+    for i, order in enumerate(decks):
+        deck.codes = order[::-1].copy()  # Deck draws from the end, deal() from the front
+        deck.top = DECK_SIZE
+        winner, best = play_round(deck, players, hand_size, game, shuffle=False)
+        if winner != result['winner'][i] or best != result['value'][i]:
+            mismatches += 1
+    return mismatches
+
+
+def benchmark(players, rounds, hand_size, game, seed):
+    """Rounds per second for 1, 2, 4, ... workers up to the core count."""
+    cores = os.cpu_count() or 1
+    counts = sorted({1, cores} | {2 ** i for i in range(1, cores.bit_length()) if 2 ** i < cores})
+    print(f"{rounds} rounds, {len(players)} players, {game}, {cores} cores")
+    print(f"{'workers':>7} {'seconds':>8} {'rounds/s':>12} {'speedup':>8}")
+    base = None
+    for workers in counts:
+        t0 = time.perf_counter()
+        run_tournament(players, rounds, hand_size, game, seed, workers)
+        elapsed = time.perf_counter() - t0
+        rate = rounds / elapsed
+        base = base or rate
+        print(f"{workers:>7} {elapsed:>8.2f} {rate:>12,.0f} {rate / base:>7.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Multi-player card tournaments across a process pool")
+    parser.add_argument('--players', type=int, default=2)
+    parser.add_argument('--rounds', type=int, default=1_000_000)
+    parser.add_argument('--hand-size', type=int, default=5)
+    parser.add_argument('--game', default='poker', choices=list(card_sim.GAMES))
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--chunk', type=int, default=CHUNK, help="rounds per task")
+    parser.add_argument('--out', default=None, help="directory for the per-round results")
+    parser.add_argument('--benchmark', action='store_true', help="measure scaling with the worker count")
+    parser.add_argument('--check', action='store_true',
+                        help=f"compare up to {CHUNK:,} vectorized rounds with Deck/Player rounds")
+    args = parser.parse_args()
+
+    players = [Player(f"Computer {i + 1}") for i in range(args.players)]
+    if args.benchmark:
+        benchmark(players, args.rounds, args.hand_size, args.game, args.seed)
+        return
+    if args.check:
+        rounds = min(args.rounds, CHUNK)
+        mismatches = check(players, rounds, args.hand_size, args.game, args.seed)
+        print(f"{rounds:,} rounds replayed with Deck/Player: {mismatches} mismatches")
+        if mismatches:
+            raise SystemExit(1)
+        return
+
+    t0 = time.perf_counter()
+    last = [t0]
+
+    def progress(board):
+        now = time.perf_counter()
+        if now - last[0] >= 1:
+            last[0] = now
+            print(f"  {board.rounds:,} / {args.rounds:,} rounds")
+
+    board = run_tournament(players, args.rounds, args.hand_size, args.game, args.seed,
+                           args.workers, args.chunk, args.out, progress)
+    elapsed = time.perf_counter() - t0
+    board.report()
+    print(f"{board.rounds:,} rounds in {elapsed:.1f}s ({board.rounds / elapsed:,.0f} rounds/s)")
+    if args.out:
+        print(f"Per-round results in {args.out}/")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+cards.py
+Compact card representation shared by playing cards.py and the simulators.
+
+A card is a uint8 code 0-51: suit index * 13 + rank index, where rank index
+0 is '2' and 12 is 'Ace' (value = rank index + 2). Decks and hands are
+arrays of codes; Card objects are only created as thin views for display.
+"""
+
+import numpy as np
+
+import hand_eval
+
+SUITS = ['Hearts', 'Diamonds', 'Clubs', 'Spades']
+RANKS = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'Jack', 'Queen', 'King', 'Ace']
+DECK_SIZE = 52
+FULL_DECK = np.arange(DECK_SIZE, dtype=np.uint8)
+
+
+def rank_of(codes):
+    """Rank index 0-12 of each code (works on scalars and arrays)."""
+    return codes % 13
+
+
+def suit_of(codes):
+    return codes // 13
+
+
+def value_of(codes):
+    return codes % 13 + 2
+
+
+class Card:
+    __slots__ = ('code',)
+    suits = SUITS
+    ranks = RANKS
+
+    def __init__(self, code):
+        self.code = int(code)
+
+    @classmethod
+    def from_name(cls, rank, suit):
+        return cls(SUITS.index(suit) * 13 + RANKS.index(rank))
+
+    @property
+    def rank(self):
+        return RANKS[self.code % 13]
+
+    @property
+    def suit(self):
+        return SUITS[self.code // 13]
+
+    @property
+    def value(self):
+        return self.code % 13 + 2
+
+    def __eq__(self, other):
+        return isinstance(other, Card) and other.code == self.code
+
+    def __hash__(self):
+        return self.code
+
+    def __str__(self):
+        return f"{self.rank} of {self.suit}"
+
+    def __repr__(self):
+        return f"Card({self.code})"
+
+
+class Deck:
+    """52 codes in one array; dealing moves a cursor instead of building objects."""
+
+    def __init__(self, seed=None):
+        self.rng = np.random.default_rng(seed)
+        self.reset()
+
+    def reset(self):
+        self.codes = FULL_DECK.copy()
+        self.top = DECK_SIZE  # cards are drawn from the end, codes[:top] are left
+
+    def shuffle(self):
+        self.rng.shuffle(self.codes[:self.top])
+
+    def draw_codes(self, num):
+        """Draw up to num cards as an array of codes."""
+        num = min(num, self.top)
+        drawn = self.codes[self.top - num:self.top][::-1].copy()
+        self.top -= num
+        return drawn
+
+    def draw_card(self):
+        drawn = self.draw_codes(1)
+        return Card(drawn[0]) if len(drawn) else None
+
+    def __len__(self):
+        return self.top
+
+
+class Player:
+    def __init__(self, name):
+        self.name = name
+        self.hand = np.empty(0, dtype=np.uint8)  # card codes
+
+    def draw_cards(self, deck, num=5):
+        self.hand = deck.draw_codes(num)
+
+    def cards(self):
+        return [Card(code) for code in self.hand]
+
+    def show_hand(self):
+        return [str(card) for card in self.cards()]
+
+    def highest_card(self):
+        if not len(self.hand):
+            return None
+        return Card(self.hand[np.argmax(rank_of(self.hand))])
+
+    def hand_value(self):
+        """Poker value of a 5-7 card hand (see hand_eval); larger is better."""
+        return hand_eval.evaluate_hand(self.hand)
+
+    def hand_name(self):
+        return hand_eval.hand_name(self.hand_value())
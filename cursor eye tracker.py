@@ -3,12 +3,15 @@ eye_cursor.py
 Eye-tracking -> cursor control (simple, webcam-based)
 Uses MediaPipe Face Mesh to find eye region, finds pupil center by image processing,
 calibrates with 4 screen points, maps pupil position to screen coords, moves cursor with smoothing.
+With --layout, the cursor snaps to the nearest target of a JSON layout and dwelling on it clicks.
 
 Notes:
 - Give camera a few seconds to auto-expose at start.
 - Calibrate in a well-lit environment (no strong glare on glasses).
 """
 
+import argparse
+
 import cv2
 import mediapipe as mp
 import numpy as np
@@ -16,6 +19,10 @@ import pyautogui
 import time
 from collections import deque
 
+from gaze_targets import DwellClicker, GazeSnapper, GridIndex, load_layout
+from quality_governor import QualityGovernor
+from vision_broker import open_capture
+
 # ---------- Config / tuning params ----------
 CAMERA_ID = 0
 FRAME_WIDTH = 640
@@ -44,11 +51,12 @@ CALIB_SECONDS = 1.0  # seconds to look at each point while recording
 
 # ---------- MediaPipe setup ----------
 mp_face_mesh = mp.solutions.face_mesh
-face_mesh = mp_face_mesh.FaceMesh(static_image_mode=False,
-                                  max_num_faces=1,
-                                  refine_landmarks=True,  # gives iris landmarks if available
-                                  min_detection_confidence=0.5,
-                                  min_tracking_confidence=0.5)
+face_mesh = None  # built on first local use; not needed when vision_broker.py runs the model
+face_mesh_refined = None
+mesh_results = None  # last local results, reused on frames the governor skips
+
+# lowers face mesh quality on slow machines to hold the frame rate
+governor = QualityGovernor(target_fps=30, name="eye tracker")
 
 # landmark indices (MediaPipe FaceMesh)
 # we will use four landmarks per eye to create a tight bounding box
@@ -66,6 +74,25 @@ RIGHT_EYE_LANDMARKS = {
 }
 
 
+def process_face_mesh(camera, frame):
+    """Face mesh results for the frame just read: the broker's when it runs, else the local model's."""
+    global face_mesh, face_mesh_refined, mesh_results
+    if camera.brokered:
+        return camera.results['face_mesh']
+    refine = governor.settings.complexity > 0  # iris landmarks are the costly extra; the eye box doesn't need them
+    if face_mesh is None or refine != face_mesh_refined:
+        if face_mesh is not None:
+            face_mesh.close()
+        face_mesh = mp_face_mesh.FaceMesh(static_image_mode=False,
+                                          max_num_faces=1,
+                                          refine_landmarks=refine,  # gives iris landmarks if available
+                                          min_detection_confidence=0.5,
+                                          min_tracking_confidence=0.5)
+        face_mesh_refined = refine
+    mesh_results = governor.process(face_mesh, frame, mesh_results, 'multi_face_landmarks')
+    return mesh_results
+
+
 def landmarks_to_point(landmark, frame_w, frame_h):
     return np.array([int(landmark.x * frame_w), int(landmark.y * frame_h)], dtype=np.int32)
 
@@ -134,8 +161,7 @@ def calibrate(camera):
             if not ret:
                 continue
             frame = cv2.resize(frame, (FRAME_WIDTH, FRAME_HEIGHT))
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            results = face_mesh.process(frame_rgb)
+            results = process_face_mesh(camera, frame)
             if not results.multi_face_landmarks:
                 cv2.putText(frame, "Face not found", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 255), 2)
                 cv2.imshow("Calibration", frame)
@@ -193,9 +219,22 @@ def map_pupil_to_screen(pupil_pt, M):
 
 
 def main():
-    cap = cv2.VideoCapture(CAMERA_ID)
-    cap.set(cv2.CAP_PROP_FRAME_WIDTH, FRAME_WIDTH)
-    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, FRAME_HEIGHT)
+    parser = argparse.ArgumentParser(description="Eye-tracking cursor control")
+    parser.add_argument('--layout', metavar='FILE',
+                        help="JSON of clickable targets: the cursor snaps to them and clicks after a dwell")
+    args = parser.parse_args()
+
+    # Target mode: webcam gaze is too coarse for pixels, so snap it to the nearest target instead
+    snapper = clicker = None
+    if args.layout:
+        targets, options = load_layout(args.layout)
+        snapper = GazeSnapper(GridIndex(targets), options['snap_radius'])
+        clicker = DwellClicker(options['dwell'])
+        print(f"Loaded {len(targets)} targets from {args.layout}")
+
+    cap = open_capture(['face_mesh'], CAMERA_ID, FRAME_WIDTH, FRAME_HEIGHT)  # shared via vision_broker.py if running
+    if cap.brokered:
+        governor.max_level = 0  # the broker runs the model; nothing to lower here
     if not cap.isOpened():
         print("Cannot open camera. Exiting.")
         return
@@ -216,8 +255,8 @@ def main():
         if not ret:
             continue
         frame = cv2.resize(frame, (FRAME_WIDTH, FRAME_HEIGHT))
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = face_mesh.process(frame_rgb)
+        governor.start_frame()
+        results = process_face_mesh(cap, frame)
 
         display = frame.copy()
         pupil_center_full = None
@@ -253,13 +292,23 @@ def main():
                 smoothed[:] = (1.0 - SMOOTHING_ALPHA) * smoothed + SMOOTHING_ALPHA * target
 
                 # move mouse (pyautogui uses ints)
-                pyautogui.moveTo(int(smoothed[0]), int(smoothed[1]), _pause=False)
+                if snapper:
+                    snapped, (cursor_x, cursor_y) = snapper.snap(float(smoothed[0]), float(smoothed[1]))
+                    pyautogui.moveTo(int(cursor_x), int(cursor_y), _pause=False)
+                    if clicker.update(snapped):
+                        pyautogui.click(_pause=False)
+                    label = f"{snapped.name} {clicker.progress():.0%}" if snapped else "-"
+                    cv2.putText(display, f"Target: {label}", (10, 55),
+                                cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 0, 0), 2)
+                else:
+                    pyautogui.moveTo(int(smoothed[0]), int(smoothed[1]), _pause=False)
 
                 # For debug text
                 cv2.putText(display, f"Screen: {int(smoothed[0])},{int(smoothed[1])}", (10, 30),
                             cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 0, 0), 2)
 
         cv2.imshow("Eye Cursor (press ESC to quit)", display)
+        governor.end_frame()
         key = cv2.waitKey(1) & 0xFF
         if key == 27:  # ESC
             break
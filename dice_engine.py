@@ -0,0 +1,188 @@
+"""
+dice_engine.py
+Bulk dice rolling and streaming statistics for Dice simulator.py.
+
+Rolls of N dice with M sides (NdM) are generated in NumPy batches from one
+seeded Generator, so a seed always reproduces the same sequence. RollStats
+folds every batch into running totals (face counts, a histogram of totals,
+and mean / variance merged batch by batch), so memory stays constant no
+matter how many rolls are made. Simulation runs the batches on a background
+thread; readers take consistent snapshots while it runs.
+"""
+
+import argparse
+import re
+import threading
+import time
+from functools import lru_cache
+
+import numpy as np
+
+BATCH = 1_000_000      # rolls per batch
+BATCH_FACES = 4_000_000  # dice per batch, so many-dice rolls use smaller batches
+MAX_DICE = 100
+MAX_SIDES = 100
+
+DICE_RE = re.compile(r"\s*(\d*)\s*[dD]\s*(\d+)\s*")
+
+
+def parse_dice(text):
+    """(dice, sides) from 'NdM' notation, e.g. '3d6'; 'd20' means one die."""
+    match = DICE_RE.fullmatch(text)
+    if not match:
+        raise ValueError(f"Expected dice like 2d6, got {text!r}")
+    dice, sides = int(match.group(1) or 1), int(match.group(2))
+    if not (1 <= dice <= MAX_DICE and 2 <= sides <= MAX_SIDES):
+        raise ValueError(f"Need 1-{MAX_DICE} dice with 2-{MAX_SIDES} sides, got {text!r}")
+    return dice, sides
+
+
+def roll(rng, count, dice=1, sides=6):
+    """(faces, totals): faces shaped (count, dice), totals the sum of each roll."""
+    faces = rng.integers(1, sides + 1, size=(count, dice), dtype=np.uint8)  # sides <= MAX_SIDES
+    return faces, faces.sum(axis=1, dtype=np.int64)
+
+
+@lru_cache(maxsize=16)
+def total_distribution(dice, sides):
+    """Exact probability of each total dice..dice * sides."""
+    p = np.ones(1)
+    face = np.full(sides, 1 / sides)
+    for _ in range(dice):
+        p = np.convolve(p, face)
+    return p
+
+
+class RollStats:
+    """Running statistics of NdM rolls, updated one batch at a time."""
+
+    def __init__(self, dice=1, sides=6):
+        self.dice = dice
+        self.sides = sides
+        self.count = 0                                               # rolls
+        self.face_counts = np.zeros(sides, dtype=np.int64)           # index 0 is face 1
+        self.total_counts = np.zeros(dice * (sides - 1) + 1, dtype=np.int64)  # index 0 is total `dice`
+        self.mean = 0.0                                              # of totals
+        self._m2 = 0.0                                               # sum of squared deviations
+
+    def add(self, faces, totals):
+        n = len(totals)
+        if not n:
+            return
+        self.face_counts += np.bincount(faces.ravel(), minlength=self.sides + 1)[1:]
+        self.total_counts += np.bincount(totals - self.dice, minlength=len(self.total_counts))
+
+        # Merge the batch's mean / M2 into the running ones (Chan et al.)
+        batch_mean = totals.mean()
+        batch_m2 = ((totals - batch_mean) ** 2).sum()
+        combined = self.count + n
+        delta = batch_mean - self.mean
+        self.mean += delta * n / combined
+        self._m2 += batch_m2 + delta * delta * self.count * n / combined
+        self.count = combined
+
+    @property
+    def variance(self):
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    def expected_mean(self):
+        return self.dice * (self.sides + 1) / 2
+
+    def expected_variance(self):
+        return self.dice * (self.sides ** 2 - 1) / 12
+
+    def chi_square_faces(self):
+        """(statistic, degrees of freedom) of the face counts against a fair die."""
+        faces = self.face_counts.sum()
+        if not faces:
+            return 0.0, self.sides - 1
+        expected = faces / self.sides
+        return float(((self.face_counts - expected) ** 2 / expected).sum()), self.sides - 1
+
+    def chi_square_totals(self):
+        """(statistic, degrees of freedom) of the totals against their exact distribution."""
+        if not self.count:
+            return 0.0, len(self.total_counts) - 1
+        expected = total_distribution(self.dice, self.sides) * self.count
+        return float(((self.total_counts - expected) ** 2 / expected).sum()), len(self.total_counts) - 1
+
+    def copy(self):
+        stats = RollStats(self.dice, self.sides)
+        stats.count, stats.mean, stats._m2 = self.count, self.mean, self._m2
+        stats.face_counts = self.face_counts.copy()
+        stats.total_counts = self.total_counts.copy()
+        return stats
+
+
+class Simulation:
+    """Roll `rolls` NdM rolls on a background thread."""
+
+    def __init__(self, rolls, dice=1, sides=6, seed=None, batch=BATCH):
+        self.rolls = rolls
+        self.batch = max(1, min(batch, BATCH_FACES // dice))
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+        self.stats = RollStats(dice, sides)
+        self.elapsed = 0.0
+        self.error = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="dice-sim", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        start = time.perf_counter()
+        try:
+            remaining = self.rolls
+            while remaining > 0 and not self._stop.is_set():
+                n = min(self.batch, remaining)
+                faces, totals = roll(self.rng, n, self.stats.dice, self.stats.sides)
+                with self._lock:
+                    self.stats.add(faces, totals)
+                    self.elapsed = time.perf_counter() - start
+                remaining -= n
+        except Exception as e:  # surfaced to the UI through .error
+            self.error = e
+
+    def stop(self):
+        self._stop.set()
+
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def snapshot(self):
+        """(stats copy, seconds elapsed), consistent even while rolling."""
+        with self._lock:
+            return self.stats.copy(), self.elapsed
+
+    def join(self):
+        if self._thread:
+            self._thread.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Roll NdM dice in bulk and test them for fairness")
+    parser.add_argument('dice', nargs='?', default='1d6', help="dice to roll, e.g. 2d6")
+    parser.add_argument('--rolls', type=int, default=10_000_000)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--batch', type=int, default=BATCH, help="rolls per batch")
+    args = parser.parse_args()
+
+    dice, sides = parse_dice(args.dice)
+    sim = Simulation(args.rolls, dice, sides, args.seed, args.batch)
+    sim.start()
+    sim.join()
+    stats, elapsed = sim.snapshot()
+
+    print(f"{stats.count} rolls of {dice}d{sides} in {elapsed:.2f}s ({stats.count / elapsed:,.0f} rolls/s)")
+    print(f"Mean:     {stats.mean:.5f} (expected {stats.expected_mean():.5f})")
+    print(f"Variance: {stats.variance:.5f} (expected {stats.expected_variance():.5f})")
+    print("Chi-square faces:  {:.2f} with {} degrees of freedom".format(*stats.chi_square_faces()))
+    print("Chi-square totals: {:.2f} with {} degrees of freedom".format(*stats.chi_square_totals()))
+
+
+if __name__ == "__main__":
+    main()
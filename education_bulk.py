@@ -0,0 +1,154 @@
+"""
+education_bulk.py
+Streaming bulk import / export of EducationSystem records (CSV, JSON lines or JSON).
+
+Rows are read lazily, validated, checked against an in-memory set of the IDs
+already stored, and committed in batches with one add_many call each (one
+SQLite transaction / one journal entry). Exports stream records straight to
+the file without building the full list.
+
+CSV files need a header row with 'name' and the category's ID column
+(student_id, teacher_id or course_code); JSON lines (.jsonl / .ndjson) hold
+one object per line with the same fields, and a .json file is one array of
+such objects (read whole, so row numbers are positions in the array).
+"""
+
+import csv
+import json
+import os
+
+from education_storage import KEY_FIELDS
+
+MAX_REPORTED_ERRORS = 100
+
+
+class ImportReport:
+    def __init__(self):
+        self.rows = 0
+        self.imported = 0
+        self.duplicates = 0
+        self.invalid = 0
+        self.errors = []  # (line number, message), first MAX_REPORTED_ERRORS only
+
+    def error(self, line, message):
+        self.invalid += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((line, message))
+
+    def __str__(self):
+        return (f"{self.imported} imported, {self.duplicates} duplicate IDs skipped, "
+                f"{self.invalid} invalid rows out of {self.rows}")
+
+
+def _format(path):
+    extension = os.path.splitext(path)[1].lower()
+    if extension in ('.jsonl', '.ndjson'):
+        return 'jsonl'
+    return 'json' if extension == '.json' else 'csv'
+
+
+def read_rows(path):
+    """Yield (line number, row dict) from a CSV, JSON-lines or JSON array file."""
+    kind = _format(path)
+    if kind == 'json':
+        with open(path, 'r', encoding='utf-8-sig') as file:
+            rows = json.load(file)
+        if not isinstance(rows, list):
+            raise ValueError(f"{path}: expected a JSON array of records")
+        yield from enumerate(rows, 1)
+    elif kind == 'jsonl':
+        with open(path, 'r', encoding='utf-8') as file:
+            for line_no, line in enumerate(file, 1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    row = None
+                yield line_no, row
+    else:
+        with open(path, 'r', encoding='utf-8-sig', newline='') as file:
+            reader = csv.DictReader(file)
+            for row in reader:
+                yield reader.line_num, row
+
+
+def _field(row, field):
+    """A row's value as stripped text; only a missing or null value is empty (0 is a valid ID)."""
+    value = row.get(field)
+    return '' if value is None else str(value).strip()
+
+
+def import_rows(system, category, rows, batch_size=1000, progress=None):
+    """Validate, deduplicate and insert (line number, row) pairs in batches.
+
+    progress(report) is called after every committed batch.
+    """
+    key_field = KEY_FIELDS[category]
+    known = {record[key_field] for record in system.iter_records(category)}
+    report = ImportReport()
+    batch = []
+
+    for line_no, row in rows:
+        report.rows += 1
+        if not isinstance(row, dict):
+            report.error(line_no, "not a record")
+            continue
+        name = _field(row, 'name')
+        key = _field(row, key_field)
+        if not name or not key:
+            report.error(line_no, f"missing name or {key_field}")
+            continue
+        if key in known:
+            report.duplicates += 1
+            continue
+        known.add(key)
+        batch.append({'name': name, key_field: key})
+
+        if len(batch) >= batch_size:
+            system.add_many(category, batch)
+            report.imported += len(batch)
+            batch = []
+            if progress:
+                progress(report)
+
+    if batch:
+        system.add_many(category, batch)
+        report.imported += len(batch)
+    if progress:
+        progress(report)
+    return report
+
+
+def import_file(system, category, path, batch_size=1000, progress=None):
+    return import_rows(system, category, read_rows(path), batch_size, progress)
+
+
+def export_file(system, category, path, progress=None, progress_every=10000):
+    """Stream every record of a category to a CSV, JSON-lines or JSON array file; returns the count."""
+    key_field = KEY_FIELDS[category]
+    kind = _format(path)
+    count = 0
+    with open(path, 'w', encoding='utf-8', newline='') as file:
+        if kind == 'jsonl':
+            def write(record):
+                file.write(json.dumps(record) + '\n')
+        elif kind == 'json':
+            file.write('[')
+
+            def write(record):
+                file.write((',\n' if count else '\n') + json.dumps(record))
+        else:
+            writer = csv.DictWriter(file, fieldnames=['name', key_field], extrasaction='ignore')
+            writer.writeheader()
+            write = writer.writerow
+        for record in system.iter_records(category):
+            write(record)
+            count += 1
+            if progress and count % progress_every == 0:
+                progress(count)
+        if kind == 'json':
+            file.write('\n]\n')
+    if progress:
+        progress(count)
+    return count
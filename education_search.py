@@ -0,0 +1,279 @@
+"""
+education_search.py
+Fuzzy name search for EducationSystem.
+
+NameIndex is an in-memory trigram inverted index over the names of
+students, teachers and courses. Every word of a name is casefolded and
+padded ("  ann ") and cut into three-letter grams; each gram maps to the
+ids of the names containing it. A query is cut the same way, the posting
+lists of its grams are counted together with np.bincount, and names are
+ranked by how many grams they share with the query, so "Jon Smyth" still
+finds "John Smith" without comparing against every name.
+
+Postings live in two layers: `base`, one sorted NumPy array per gram, and
+`delta`, growable arrays holding names added since the base was built.
+Adding a name only appends to the delta, and removing one only marks it
+dead, so both are cheap while the application runs; save() folds the
+delta in, drops dead names and writes the whole index to a sidecar .npz
+file. load() reads that back without re-tokenizing anything, as long as
+the data files are unchanged since it was written.
+
+    python education_search.py education_data.db "jon smyth"
+"""
+
+import argparse
+import json
+import math
+import os
+import re
+import time
+from array import array
+
+import numpy as np
+
+INDEX_SUFFIX = '.names.npz'
+INDEX_VERSION = 1
+THRESHOLD = 0.3   # minimum score of a match, 0..1
+WORD = re.compile(r'\w+')
+
+
+def trigrams(text):
+    """Distinct trigrams of the casefolded words of `text`."""
+    grams = set()
+    for word in WORD.findall(text.casefold()):
+        padded = '  ' + word + ' '
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def data_fingerprint(filename):
+    """Sizes and modification times of the data files behind `filename`.
+
+    An index saved with one fingerprint is only valid while the files still
+    have it; the SQLite WAL and the JSON journal count as data files too.
+    """
+    result = []
+    for path in (filename, filename + '-wal', filename + '.journal'):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        result.append([os.path.basename(path), stat.st_size, stat.st_mtime_ns])
+    return result
+
+
+class NameIndex:
+    def __init__(self, categories):
+        self.categories = list(categories)
+        self.docs = {}                 # (category, key) -> name id
+        self.keys = []                 # name id -> key (None once removed)
+        self.names = []                # name id -> name
+        self.category_of = bytearray()  # name id -> index into categories
+        self.alive = bytearray()        # name id -> 1 while the name is indexed
+        self.sizes = array('I')         # name id -> number of distinct grams
+        self.base = {}                  # gram -> sorted int32 array of name ids
+        self.delta = {}                 # gram -> array('i') of name ids added since
+        self.dead = 0
+
+    def __len__(self):
+        return len(self.docs)
+
+    def counts(self):
+        """{category: names indexed}."""
+        counts = dict.fromkeys(self.categories, 0)
+        for category, _ in self.docs:
+            counts[category] += 1
+        return counts
+
+    # ---------- updates ----------
+    def add(self, category, key, name):
+        """Index one name; a key already indexed in the category is replaced."""
+        if (category, key) in self.docs:
+            self.remove(category, key)
+        doc = len(self.keys)
+        grams = trigrams(name)
+        self.docs[category, key] = doc
+        self.keys.append(key)
+        self.names.append(name)
+        self.category_of.append(self.categories.index(category))
+        self.alive.append(1)
+        self.sizes.append(len(grams))
+        for gram in grams:
+            postings = self.delta.get(gram)
+            if postings is None:
+                postings = self.delta[gram] = array('i')
+            postings.append(doc)
+
+    def add_many(self, category, items):
+        """Index (key, name) pairs."""
+        for key, name in items:
+            self.add(category, key, name)
+
+    def remove(self, category, key):
+        """Drop a name from results; False if it wasn't indexed. Its postings go at the next save()."""
+        doc = self.docs.pop((category, key), None)
+        if doc is None:
+            return False
+        self.alive[doc] = 0
+        self.keys[doc] = None
+        self.dead += 1
+        return True
+
+    # ---------- queries ----------
+    def search(self, query, limit=20, category=None, threshold=THRESHOLD):
+        """Best matches for `query` as (category, key, name, score), best first.
+
+        The score averages the fraction of the query's grams found in the
+        name with the Jaccard similarity of the two gram sets, so a name
+        containing all of a short query ranks high and, among those, the
+        closest in length comes first. Both halves are at most the found
+        fraction, which lets names sharing too few grams be skipped before
+        scoring.
+        """
+        grams = trigrams(query)
+        if not grams or not self.docs:
+            return []
+        parts = [self.base[gram] for gram in grams if gram in self.base]
+        parts += [np.frombuffer(self.delta[gram], dtype=np.int32) for gram in grams if gram in self.delta]
+        if not parts:
+            return []
+        shared = np.bincount(np.concatenate(parts))
+        candidates = np.flatnonzero(shared >= max(1, math.ceil(threshold * len(grams))))
+        keep = np.frombuffer(self.alive, dtype=np.bool_)[candidates]
+        if category is not None:
+            keep &= np.frombuffer(self.category_of, dtype=np.uint8)[candidates] == self.categories.index(category)
+        candidates = candidates[keep]
+        shared = shared[candidates]
+        sizes = np.frombuffer(self.sizes, dtype=np.uint32)[candidates]
+        scores = (shared / len(grams) + shared / (len(grams) + sizes - shared)) / 2
+        good = scores >= threshold
+        candidates, scores = candidates[good], scores[good]
+
+        if len(candidates) > limit:
+            top = np.argpartition(-scores, limit - 1)[:limit]
+            candidates, scores = candidates[top], scores[top]
+        ranked = sorted(zip(scores.tolist(), candidates.tolist()), key=lambda item: (-item[0], self.names[item[1]]))
+        return [(self.categories[self.category_of[doc]], self.keys[doc], self.names[doc], score)
+                for score, doc in ranked]
+
+    # ---------- building and persistence ----------
+    @classmethod
+    def build(cls, categories, records):
+        """Index (category, key, name) records in one pass."""
+        index = cls(categories)
+        for category, key, name in records:
+            index.add(category, key, name)
+        index.compact()
+        return index
+
+    def compact(self):
+        """Fold the delta into the base arrays and renumber names to drop removed ones."""
+        alive = np.frombuffer(self.alive, dtype=np.bool_)
+        new_ids = np.cumsum(alive, dtype=np.int32) - 1
+        base = {}
+        for gram in set(self.base) | set(self.delta):
+            parts = []
+            if gram in self.base:
+                parts.append(self.base[gram])
+            if gram in self.delta:
+                parts.append(np.frombuffer(self.delta[gram], dtype=np.int32))
+            ids = np.concatenate(parts) if len(parts) > 1 else parts[0]
+            if self.dead:
+                ids = new_ids[ids[alive[ids]]]
+            if len(ids):
+                base[gram] = ids  # base ids precede delta ids, so this stays sorted
+        if self.dead:
+            keep = alive.nonzero()[0].tolist()
+            self.keys = [self.keys[doc] for doc in keep]
+            self.names = [self.names[doc] for doc in keep]
+            self.category_of = bytearray(self.category_of[doc] for doc in keep)
+            self.sizes = array('I', (self.sizes[doc] for doc in keep))
+            self.alive = bytearray(b'\x01' * len(keep))
+            self.docs = {(self.categories[c], key): doc
+                         for doc, (c, key) in enumerate(zip(self.category_of, self.keys))}
+            self.dead = 0
+        self.base = base
+        self.delta = {}
+
+    def save(self, path, fingerprint):
+        """Compact and write the index to `path` (swapped in by atomic rename)."""
+        self.compact()
+        grams = sorted(self.base)
+        lengths = np.array([len(self.base[gram]) for gram in grams], dtype=np.int64)
+        offsets = np.zeros(len(grams) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        postings = np.concatenate([self.base[gram] for gram in grams]) if grams else np.zeros(0, dtype=np.int32)
+        meta = {'version': INDEX_VERSION, 'categories': self.categories, 'fingerprint': fingerprint}
+        records = json.dumps([self.keys, self.names], ensure_ascii=False)
+
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as file:
+            np.savez(file, meta=np.frombuffer(json.dumps(meta).encode('utf-8'), dtype=np.uint8),
+                     records=np.frombuffer(records.encode('utf-8'), dtype=np.uint8),
+                     grams=np.array(grams, dtype='<U3'), offsets=offsets, postings=postings,
+                     category_of=np.frombuffer(bytes(self.category_of), dtype=np.uint8),
+                     sizes=np.array(self.sizes, dtype=np.uint32))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path, fingerprint, categories):
+        """The index saved at `path`, or None if it is missing, unreadable or out of date."""
+        try:
+            with np.load(path) as data:
+                meta = json.loads(data['meta'].tobytes().decode('utf-8'))
+                if (meta.get('version') != INDEX_VERSION or meta.get('fingerprint') != fingerprint or
+                        meta.get('categories') != list(categories)):
+                    return None
+                keys, names = json.loads(data['records'].tobytes().decode('utf-8'))
+                grams = data['grams'].tolist()
+                offsets = data['offsets'].tolist()
+                postings = data['postings']
+                category_of = data['category_of'].tobytes()
+                sizes = data['sizes']
+        except (OSError, ValueError, KeyError) as e:
+            if os.path.exists(path):
+                print(f"Ignoring name index {path}: {e}")
+            return None
+
+        index = cls(categories)
+        index.keys, index.names = keys, names
+        index.category_of = bytearray(category_of)
+        index.alive = bytearray(b'\x01' * len(keys))
+        index.sizes = array('I', sizes.astype(np.uint32).tobytes())
+        index.base = {gram: postings[start:end] for gram, start, end in zip(grams, offsets, offsets[1:])}
+        index.docs = {(index.categories[c], key): doc for doc, (c, key) in enumerate(zip(index.category_of, keys))}
+        return index
+
+
+def main():
+    from education_storage import CATEGORIES, KEY_FIELDS, open_backend
+
+    parser = argparse.ArgumentParser(description="Fuzzy name search over an education data file")
+    parser.add_argument('filename', nargs='?', default='education_data.db')
+    parser.add_argument('query', nargs='*')
+    parser.add_argument('--limit', type=int, default=10)
+    args = parser.parse_args()
+
+    fingerprint = data_fingerprint(args.filename)
+    t0 = time.perf_counter()
+    index = NameIndex.load(args.filename + INDEX_SUFFIX, fingerprint, CATEGORIES)
+    how = "loaded"
+    if index is None:
+        backend = open_backend(args.filename)
+        index = NameIndex.build(CATEGORIES, ((category, record[KEY_FIELDS[category]], record['name'])
+                                             for category in CATEGORIES for record in backend.iter_records(category)))
+        backend.close()
+        how = "built"
+    print(f"{len(index)} names {how} in {(time.perf_counter() - t0) * 1000:.0f} ms, {len(index.base)} trigrams")
+
+    query = ' '.join(args.query)
+    if query:
+        t0 = time.perf_counter()
+        results = index.search(query, args.limit)
+        print(f"{len(results)} matches in {(time.perf_counter() - t0) * 1000:.2f} ms")
+        for category, key, name, score in results:
+            print(f"  {score:.2f}  {name}  ({category[:-1]} {key})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+education_service.py
+Runs EducationSystem calls on a background worker so the Tk main loop never
+waits for the disk.
+
+Calls are queued and executed in order on a single worker thread, so a read
+submitted after a write always sees it (read-your-writes) no matter how slow
+the disk is. Adds are write-behind: add() returns at once, and consecutive
+adds to the same category that pile up while the worker is busy are
+coalesced into one add_many call (one transaction / journal entry).
+
+Results come back on the Tk thread: the worker puts them on a queue that is
+drained with root.after, so callbacks may touch widgets freely.
+"""
+
+import queue
+import threading
+import traceback
+
+from education_storage import KEY_FIELDS, DuplicateIdError
+
+_STOP = object()
+
+
+class _Call:
+    __slots__ = ('func', 'args', 'on_done', 'on_error', 'category')
+
+    def __init__(self, func, args, on_done, on_error, category=None):
+        self.func = func
+        self.args = args
+        self.on_done = on_done
+        self.on_error = on_error
+        self.category = category  # set for add() calls, which may be coalesced
+
+
+class EducationService:
+    POLL_MS = 15
+    MAX_BATCH = 1000  # most adds merged into one add_many
+
+    def __init__(self, system, root, on_error=None):
+        self.system = system
+        self.root = root
+        self.on_error = on_error or (lambda e: traceback.print_exception(type(e), e, e.__traceback__))
+        self._calls = queue.Queue()
+        self._results = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name="education-io", daemon=True)
+        self._worker.start()
+        self._poll_job = root.after(self.POLL_MS, self._poll)
+
+    # ---------- Tk thread ----------
+    def submit(self, func, *args, on_done=None, on_error=None):
+        """Run func(*args) on the worker; on_done(result) or on_error(exception) runs on the Tk thread."""
+        self._calls.put(_Call(func, args, on_done, on_error))
+
+    def call(self, method, *args, on_done=None, on_error=None):
+        """Like submit, for an EducationSystem method given by name."""
+        self.submit(getattr(self.system, method), *args, on_done=on_done, on_error=on_error)
+
+    def add(self, category, record, on_done=None, on_error=None):
+        """Queue one record for insertion; on_done(None) runs once it is stored."""
+        self._calls.put(_Call(self.system.add_many, (category, [record]), on_done, on_error, category))
+
+    def post(self, func, *args):
+        """Run func(*args) on the Tk thread; safe to call from the worker (e.g. progress updates)."""
+        self._results.put((func, args))
+
+    def _poll(self):
+        while True:
+            try:
+                func, args = self._results.get_nowait()
+            except queue.Empty:
+                break
+            func(*args)
+        self._poll_job = self.root.after(self.POLL_MS, self._poll)
+
+    def close(self):
+        """Finish every queued call, then close the system. Pending callbacks are dropped."""
+        self.root.after_cancel(self._poll_job)
+        self._calls.put(_STOP)
+        self._worker.join()
+        self.system.close()
+
+    # ---------- worker thread ----------
+    def _run(self):
+        carry = None
+        while True:
+            call = carry if carry is not None else self._calls.get()
+            carry = None
+            if call is _STOP:
+                break
+            if call.category is None:
+                self._execute(call)
+                continue
+
+            # Merge the adds to this category queued right behind this one
+            batch = [call]
+            while len(batch) < self.MAX_BATCH:
+                try:
+                    call = self._calls.get_nowait()
+                except queue.Empty:
+                    break
+                if call is not _STOP and call.category == batch[0].category:
+                    batch.append(call)
+                else:
+                    carry = call
+                    break
+            self._store(batch)
+
+    def _store(self, batch):
+        if len(batch) == 1:
+            self._execute(batch[0])
+            return
+        category = batch[0].category
+        try:
+            self.system.add_many(category, [call.args[1][0] for call in batch])
+        except DuplicateIdError as e:
+            # Store the rest together, then the clashing adds one by one so only they fail
+            key_field = KEY_FIELDS[category]
+            clashing = set(e.keys)
+            suspects = [call for call in batch if call.args[1][0][key_field] in clashing]
+            rest = [call for call in batch if call.args[1][0][key_field] not in clashing]
+            if rest:
+                self._store(rest)
+            for call in suspects:
+                self._execute(call)
+        except Exception as e:
+            for call in batch:
+                self._finish(call, error=e)
+        else:
+            for call in batch:
+                self._finish(call)
+
+    def _execute(self, call):
+        try:
+            result = call.func(*call.args)
+        except Exception as e:
+            self._finish(call, error=e)
+        else:
+            self._finish(call, result)
+
+    def _finish(self, call, result=None, error=None):
+        if error is not None:
+            self.post(call.on_error or self.on_error, error)
+        elif call.on_done:
+            self.post(call.on_done, result)
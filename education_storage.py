@@ -0,0 +1,703 @@
+"""
+education_storage.py
+Storage backends for EducationSystem.
+
+EducationSystem talks to a StorageBackend; two implementations exist:
+
+JsonJournalBackend  keeps everything in memory, indexed by ID and name, and
+                    persists through JournalStorage: changes are appended to
+                    a JSON-lines journal, fsyncs are batched, and a large
+                    journal is folded into a snapshot swapped in by atomic
+                    rename.
+SQLiteBackend       keeps records on disk in WAL mode with primary-key and
+                    name indexes, so lookups, uniqueness checks and prefix
+                    searches stay fast at 100k+ records without loading
+                    everything into memory.
+
+Besides records, both store RELATIONS (students enrolled in courses,
+teachers assigned to courses) indexed in both directions, with per-key
+link counts kept up to date on every insert and delete.
+
+open_backend() picks one from the file name and migrates an existing
+education_data.json into a new SQLite database once.
+"""
+
+import bisect
+import json
+import os
+import queue
+import sqlite3
+import time
+from contextlib import contextmanager
+
+CATEGORIES = ('students', 'teachers', 'courses')
+KEY_FIELDS = {'students': 'student_id', 'teachers': 'teacher_id', 'courses': 'course_code'}
+# relation -> (left category, right category)
+RELATIONS = {'enrollments': ('students', 'courses'), 'assignments': ('teachers', 'courses')}
+
+# Sorts after any character, so [prefix, prefix + PREFIX_END) is a prefix range
+PREFIX_END = '\U0010ffff'
+
+
+class DuplicateIdError(ValueError):
+    def __init__(self, category, keys):
+        self.category = category
+        self.keys = list(keys)
+        super().__init__(f"Duplicate {KEY_FIELDS[category]}: {', '.join(self.keys[:5])}")
+
+
+class UnknownIdError(KeyError):
+    def __init__(self, category, key):
+        self.category = category
+        self.key = key
+        super().__init__(f"No {category[:-1]} with {KEY_FIELDS[category]} {key}")
+
+    def __str__(self):
+        return self.args[0]
+
+
+def _fsync_dir(path):
+    """Make a rename in `path` durable (no-op where directories can't be opened)."""
+    if not hasattr(os, 'O_DIRECTORY'):
+        return
+    fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class JournalStorage:
+    """A snapshot file plus an append-only journal of change entries.
+
+    It only stores entries; the owner replays them on load() and provides
+    the full data through snapshot() when the journal is compacted.
+    """
+
+    def __init__(self, filename, snapshot=None, sync_every=256, sync_interval=1.0, compact_every=20000):
+        self.filename = filename
+        self.journal_path = filename + '.journal'
+        self.snapshot = snapshot            # callable returning the data to write on compaction
+        self.sync_every = sync_every        # fsync once this many records are unsynced...
+        self.sync_interval = sync_interval  # ...or the oldest of them is this many seconds old
+        self.compact_every = compact_every  # journal records before folding into a snapshot
+
+        self.seq = 0                # sequence number of the last change applied
+        self.journal_records = 0
+        self._journal = None
+        self._unsynced = 0
+        self._first_unsynced = 0.0
+
+    def load(self):
+        """Return the snapshot data and the journal entries newer than it."""
+        data = {}
+        snapshot_seq = 0
+        if os.path.exists(self.filename):
+            with open(self.filename, 'r') as file:
+                data = json.load(file)
+            snapshot_seq = data.pop('seq', 0)  # plain data files have no seq
+        self.seq = snapshot_seq
+        self.journal_records = 0
+
+        entries = []
+        valid_bytes = 0
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, 'rb') as file:
+                for line in file:
+                    if not line.endswith(b'\n'):
+                        break  # torn write from a crash; drop it
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        break
+                    valid_bytes += len(line)
+                    if entry['seq'] <= snapshot_seq:
+                        continue  # already folded into the snapshot
+                    entries.append(entry)
+                    self.seq = entry['seq']
+                    self.journal_records += entry.get('size', 1)
+
+        self._open_journal(valid_bytes)
+        return data, entries
+
+    def _open_journal(self, valid_bytes):
+        if self._journal:
+            self._journal.close()
+        self._journal = open(self.journal_path, 'ab')
+        if self._journal.tell() != valid_bytes:
+            self._journal.truncate(valid_bytes)
+        self._unsynced = 0
+
+    def append(self, entry, size=1):
+        """Journal one change entry touching `size` records."""
+        self.seq += 1
+        line = json.dumps(dict(entry, seq=self.seq, size=size)) + '\n'
+        self._journal.write(line.encode('utf-8'))
+        self._journal.flush()  # survives a process crash; fsync below covers power loss
+        self.journal_records += size
+
+        if self._unsynced == 0:
+            self._first_unsynced = time.monotonic()
+        self._unsynced += size
+        if (self._unsynced >= self.sync_every or
+                time.monotonic() - self._first_unsynced >= self.sync_interval):
+            self.sync()
+
+    def needs_compaction(self):
+        return self.journal_records >= self.compact_every
+
+    def sync(self):
+        if self._journal and self._unsynced:
+            self._journal.flush()
+            os.fsync(self._journal.fileno())
+            self._unsynced = 0
+
+    def compact(self):
+        """Write everything to a new snapshot, swap it in atomically and reset the journal."""
+        self.sync()
+        tmp_path = self.filename + '.tmp'
+        with open(tmp_path, 'w') as file:
+            json.dump(dict(self.snapshot(), seq=self.seq), file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, self.filename)
+        _fsync_dir(os.path.dirname(os.path.abspath(self.filename)))
+
+        # Entries are now covered by the snapshot's seq, so a crash before
+        # this truncate only leaves entries that replay will skip
+        self._journal.truncate(0)
+        os.fsync(self._journal.fileno())
+        self.journal_records = 0
+
+    def close(self):
+        if self._journal:
+            self.sync()
+            self._journal.close()
+            self._journal = None
+
+
+class StorageBackend:
+    """What EducationSystem needs from storage.
+
+    Records are dicts holding 'name' and the category's KEY_FIELDS entry.
+    """
+
+    def insert(self, category, record):
+        self.insert_many(category, [record])
+
+    def insert_many(self, category, records):
+        """Insert all records or none; raises DuplicateIdError on a taken ID."""
+        raise NotImplementedError
+
+    def get(self, category, key):
+        """The record with this ID, or None."""
+        raise NotImplementedError
+
+    def iter_records(self, category):
+        """Every record of a category in insertion order, streamed."""
+        raise NotImplementedError
+
+    def count(self, category, prefix=''):
+        """Number of records, or of those whose name starts with prefix."""
+        raise NotImplementedError
+
+    def page(self, category, offset, limit, prefix=''):
+        """Records ordered by name (optionally filtered by a case-insensitive
+        name prefix), skipping the first offset of them."""
+        raise NotImplementedError
+
+    def search_prefix(self, category, prefix, limit=50):
+        return self.page(category, 0, limit, prefix)
+
+    def delete(self, category, key):
+        """Remove a record and every relation it takes part in; False if it didn't exist."""
+        raise NotImplementedError
+
+    def link(self, relation, left, right):
+        self.link_many(relation, [(left, right)])
+
+    def link_many(self, relation, pairs):
+        """Add (left key, right key) pairs; existing pairs are ignored and
+        UnknownIdError is raised (adding nothing) if a key doesn't exist."""
+        raise NotImplementedError
+
+    def unlink(self, relation, left, right):
+        """Remove one pair; False if it wasn't there."""
+        raise NotImplementedError
+
+    def related(self, relation, key, reverse=False):
+        """Records linked to key: the right side of `relation` for a left key,
+        or the left side for a right key when reverse is True. Streamed."""
+        raise NotImplementedError
+
+    def link_count(self, relation, key, reverse=False):
+        """How many records are linked to key (kept as a counter, not counted)."""
+        raise NotImplementedError
+
+    def link_counts(self, relation, reverse=False):
+        """(key, count) for every key with at least one link."""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+def _check_unique(category, records, taken):
+    """Raise DuplicateIdError if a record's ID is taken or repeated within the batch."""
+    key_field = KEY_FIELDS[category]
+    seen = set()
+    duplicates = []
+    for record in records:
+        key = record[key_field]
+        if key in seen or taken(key):
+            duplicates.append(key)
+        seen.add(key)
+    if duplicates:
+        raise DuplicateIdError(category, duplicates)
+
+
+class JsonJournalBackend(StorageBackend):
+    def __init__(self, filename, **journal_options):
+        self.storage = JournalStorage(filename, snapshot=self._snapshot, **journal_options)
+        self.by_key = {category: {} for category in CATEGORIES}  # category -> {id: record}
+        self.names = {category: [] for category in CATEGORIES}   # category -> sorted [(casefolded name, id)]
+        # relation -> ({left id: set of right ids}, {right id: set of left ids})
+        self.links = {relation: ({}, {}) for relation in RELATIONS}
+
+        data, entries = self.storage.load()
+        for category in CATEGORIES:
+            self._add_records(category, data.get(category, []))
+        for relation in RELATIONS:
+            self._add_links(relation, data.get(relation, []))
+        for entry in entries:
+            self._apply(entry)
+
+    # ---------- in-memory state ----------
+    def _apply(self, entry):
+        op = entry.get('op', 'add')
+        if op == 'add':
+            self._add_records(entry['category'], entry['records'])
+        elif op == 'delete':
+            for key in entry['keys']:
+                self._delete_record(entry['category'], key)
+        elif op == 'link':
+            self._add_links(entry['relation'], entry['pairs'])
+        elif op == 'unlink':
+            for left, right in entry['pairs']:
+                self._remove_link(entry['relation'], left, right)
+
+    def _add_records(self, category, records):
+        key_field = KEY_FIELDS[category]
+        by_key = self.by_key[category]
+        names = self.names[category]
+        entries = []
+        for record in records:
+            key = record[key_field]
+            if key not in by_key:  # old data files may repeat IDs; the first one wins
+                by_key[key] = record
+                entries.append((record['name'].casefold(), key))
+        if len(entries) < 32:
+            for entry in entries:
+                bisect.insort(names, entry)
+        else:
+            names.extend(entries)
+            names.sort()
+
+    def _delete_record(self, category, key):
+        record = self.by_key[category].pop(key, None)
+        if record is None:
+            return False
+        names = self.names[category]
+        del names[bisect.bisect_left(names, (record['name'].casefold(), key))]
+        for relation, (left_category, right_category) in RELATIONS.items():
+            forward, backward = self.links[relation]
+            if category == left_category:
+                for right in list(forward.get(key, ())):
+                    self._remove_link(relation, key, right)
+            if category == right_category:
+                for left in list(backward.get(key, ())):
+                    self._remove_link(relation, left, key)
+        return True
+
+    def _add_links(self, relation, pairs):
+        forward, backward = self.links[relation]
+        for left, right in pairs:
+            forward.setdefault(left, set()).add(right)
+            backward.setdefault(right, set()).add(left)
+
+    def _remove_link(self, relation, left, right):
+        forward, backward = self.links[relation]
+        rights = forward.get(left)
+        if not rights or right not in rights:
+            return False
+        rights.discard(right)
+        if not rights:
+            del forward[left]
+        lefts = backward[right]
+        lefts.discard(left)
+        if not lefts:
+            del backward[right]
+        return True
+
+    def _snapshot(self):
+        data = {category: list(self.by_key[category].values()) for category in CATEGORIES}
+        for relation, (forward, _) in self.links.items():
+            data[relation] = [[left, right] for left, rights in forward.items() for right in rights]
+        return data
+
+    def _log(self, entry, size=1):
+        self.storage.append(entry, size)
+        self._apply(entry)
+        if self.storage.needs_compaction():
+            self.storage.compact()
+
+    # ---------- StorageBackend ----------
+    def insert_many(self, category, records):
+        _check_unique(category, records, self.by_key[category].__contains__)
+        if records:
+            self._log({'op': 'add', 'category': category, 'records': records}, len(records))
+
+    def get(self, category, key):
+        return self.by_key[category].get(key)
+
+    def iter_records(self, category):
+        return iter(list(self.by_key[category].values()))
+
+    def _name_range(self, category, prefix):
+        """Slice bounds of the names starting with prefix."""
+        names = self.names[category]
+        if not prefix:
+            return 0, len(names)
+        prefix = prefix.casefold()
+        return (bisect.bisect_left(names, (prefix,)),
+                bisect.bisect_left(names, (prefix + PREFIX_END,)))
+
+    def count(self, category, prefix=''):
+        if not prefix:
+            return len(self.by_key[category])
+        start, end = self._name_range(category, prefix)
+        return end - start
+
+    def page(self, category, offset, limit, prefix=''):
+        start, end = self._name_range(category, prefix)
+        start = min(start + offset, end)
+        by_key = self.by_key[category]
+        return [by_key[key] for _, key in self.names[category][start:min(start + limit, end)]]
+
+    def delete(self, category, key):
+        if key not in self.by_key[category]:
+            return False
+        self._log({'op': 'delete', 'category': category, 'keys': [key]})
+        return True
+
+    def link_many(self, relation, pairs):
+        left_category, right_category = RELATIONS[relation]
+        forward, _ = self.links[relation]
+        new = []
+        for left, right in pairs:
+            if left not in self.by_key[left_category]:
+                raise UnknownIdError(left_category, left)
+            if right not in self.by_key[right_category]:
+                raise UnknownIdError(right_category, right)
+            if right not in forward.get(left, ()):
+                new.append([left, right])
+        if new:
+            self._log({'op': 'link', 'relation': relation, 'pairs': new}, len(new))
+
+    def unlink(self, relation, left, right):
+        if right not in self.links[relation][0].get(left, ()):
+            return False
+        self._log({'op': 'unlink', 'relation': relation, 'pairs': [[left, right]]})
+        return True
+
+    def related(self, relation, key, reverse=False):
+        left_category, right_category = RELATIONS[relation]
+        side, category = (1, left_category) if reverse else (0, right_category)
+        keys = tuple(self.links[relation][side].get(key, ()))
+        by_key = self.by_key[category]
+        return (by_key[k] for k in keys)
+
+    def link_count(self, relation, key, reverse=False):
+        return len(self.links[relation][1 if reverse else 0].get(key, ()))
+
+    def link_counts(self, relation, reverse=False):
+        side = self.links[relation][1 if reverse else 0]
+        return ((key, len(keys)) for key, keys in list(side.items()))
+
+    def close(self):
+        self.storage.close()
+
+
+class ConnectionPool:
+    """Reuses a few SQLite connections across calls and threads."""
+
+    def __init__(self, path, size=4):
+        self.path = path
+        self._idle = queue.LifoQueue(maxsize=size)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA foreign_keys=ON')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @contextmanager
+    def connection(self):
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+        try:
+            yield conn
+        finally:
+            try:
+                self._idle.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS students (student_id TEXT PRIMARY KEY, name TEXT NOT NULL COLLATE NOCASE);
+CREATE TABLE IF NOT EXISTS teachers (teacher_id TEXT PRIMARY KEY, name TEXT NOT NULL COLLATE NOCASE);
+CREATE TABLE IF NOT EXISTS courses (course_code TEXT PRIMARY KEY, name TEXT NOT NULL COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS students_name ON students (name);
+CREATE INDEX IF NOT EXISTS teachers_name ON teachers (name);
+CREATE INDEX IF NOT EXISTS courses_name ON courses (name);
+CREATE TABLE IF NOT EXISTS link_counts (
+    relation TEXT NOT NULL, side INTEGER NOT NULL, key TEXT NOT NULL, n INTEGER NOT NULL,
+    PRIMARY KEY (relation, side, key)) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS migrations (source TEXT PRIMARY KEY, finished REAL NOT NULL);
+"""
+
+# One table per relation, indexed both ways, with triggers keeping link_counts
+# (side 0 = per left key, side 1 = per right key) in step, cascades included
+SQLITE_RELATION_SCHEMA = """
+CREATE TABLE IF NOT EXISTS {relation} (
+    {left} TEXT NOT NULL REFERENCES {left_table} ON DELETE CASCADE,
+    {right} TEXT NOT NULL REFERENCES {right_table} ON DELETE CASCADE,
+    PRIMARY KEY ({left}, {right})) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS {relation}_reverse ON {relation} ({right}, {left});
+CREATE TRIGGER IF NOT EXISTS {relation}_count_add AFTER INSERT ON {relation} BEGIN
+    INSERT INTO link_counts VALUES ('{relation}', 0, NEW.{left}, 1)
+        ON CONFLICT (relation, side, key) DO UPDATE SET n = n + 1;
+    INSERT INTO link_counts VALUES ('{relation}', 1, NEW.{right}, 1)
+        ON CONFLICT (relation, side, key) DO UPDATE SET n = n + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS {relation}_count_remove AFTER DELETE ON {relation} BEGIN
+    UPDATE link_counts SET n = n - 1 WHERE relation = '{relation}' AND side = 0 AND key = OLD.{left};
+    UPDATE link_counts SET n = n - 1 WHERE relation = '{relation}' AND side = 1 AND key = OLD.{right};
+    DELETE FROM link_counts WHERE relation = '{relation}' AND side IN (0, 1)
+        AND key IN (OLD.{left}, OLD.{right}) AND n <= 0;
+END;
+"""
+
+
+class SQLiteBackend(StorageBackend):
+    def __init__(self, path, pool_size=4):
+        self.path = path
+        self.pool = ConnectionPool(path, pool_size)
+        with self.pool.connection() as conn:
+            conn.executescript(SQLITE_SCHEMA)
+            for relation, (left_table, right_table) in RELATIONS.items():
+                conn.executescript(SQLITE_RELATION_SCHEMA.format(
+                    relation=relation, left_table=left_table, right_table=right_table,
+                    left=KEY_FIELDS[left_table], right=KEY_FIELDS[right_table]))
+
+    @staticmethod
+    def _table(category):
+        if category not in KEY_FIELDS:
+            raise KeyError(category)
+        return category, KEY_FIELDS[category]
+
+    @staticmethod
+    def _record(row, key_field):
+        return {'name': row['name'], key_field: row[key_field]}
+
+    def insert_many(self, category, records):
+        table, key_field = self._table(category)
+        rows = [(record[key_field], record['name']) for record in records]
+        with self.pool.connection() as conn:
+            try:
+                with conn:  # one transaction for the whole batch
+                    conn.executemany(f"INSERT INTO {table} ({key_field}, name) VALUES (?, ?)", rows)
+            except sqlite3.IntegrityError:
+                _check_unique(category, records, lambda key: self.get(category, key) is not None)
+                raise
+
+    def get(self, category, key):
+        table, key_field = self._table(category)
+        with self.pool.connection() as conn:
+            row = conn.execute(f"SELECT {key_field}, name FROM {table} WHERE {key_field} = ?",
+                               (key,)).fetchone()
+        return self._record(row, key_field) if row else None
+
+    def iter_records(self, category):
+        table, key_field = self._table(category)
+        with self.pool.connection() as conn:
+            for row in conn.execute(f"SELECT {key_field}, name FROM {table} ORDER BY rowid"):
+                yield self._record(row, key_field)
+
+    def count(self, category, prefix=''):
+        table, _ = self._table(category)
+        with self.pool.connection() as conn:
+            if not prefix:
+                return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            return conn.execute(f"SELECT COUNT(*) FROM {table} WHERE name >= ? AND name < ?",
+                                (prefix, prefix + PREFIX_END)).fetchone()[0]
+
+    def page(self, category, offset, limit, prefix=''):
+        table, key_field = self._table(category)
+        with self.pool.connection() as conn:
+            if prefix:
+                rows = conn.execute(f"SELECT {key_field}, name FROM {table} WHERE name >= ? AND name < ? "
+                                    f"ORDER BY name LIMIT ? OFFSET ?",
+                                    (prefix, prefix + PREFIX_END, limit, offset)).fetchall()
+            else:
+                rows = conn.execute(f"SELECT {key_field}, name FROM {table} ORDER BY name LIMIT ? OFFSET ?",
+                                    (limit, offset)).fetchall()
+        return [self._record(row, key_field) for row in rows]
+
+    def delete(self, category, key):
+        table, key_field = self._table(category)
+        with self.pool.connection() as conn:
+            with conn:  # relation rows and their counts go with it (ON DELETE CASCADE)
+                return conn.execute(f"DELETE FROM {table} WHERE {key_field} = ?", (key,)).rowcount > 0
+
+    @staticmethod
+    def _relation(relation):
+        left_category, right_category = RELATIONS[relation]
+        return left_category, right_category, KEY_FIELDS[left_category], KEY_FIELDS[right_category]
+
+    def link_many(self, relation, pairs):
+        left_category, right_category, left, right = self._relation(relation)
+        pairs = list(pairs)
+        with self.pool.connection() as conn:
+            try:
+                with conn:
+                    conn.executemany(f"INSERT OR IGNORE INTO {relation} ({left}, {right}) VALUES (?, ?)", pairs)
+            except sqlite3.IntegrityError:
+                # A foreign key failed; report which ID is missing
+                for left_key, right_key in pairs:
+                    if self.get(left_category, left_key) is None:
+                        raise UnknownIdError(left_category, left_key)
+                    if self.get(right_category, right_key) is None:
+                        raise UnknownIdError(right_category, right_key)
+                raise
+
+    def unlink(self, relation, left_key, right_key):
+        _, _, left, right = self._relation(relation)
+        with self.pool.connection() as conn:
+            with conn:
+                return conn.execute(f"DELETE FROM {relation} WHERE {left} = ? AND {right} = ?",
+                                    (left_key, right_key)).rowcount > 0
+
+    def related(self, relation, key, reverse=False):
+        left_category, right_category, left, right = self._relation(relation)
+        if reverse:
+            table, key_field, match = left_category, left, right
+        else:
+            table, key_field, match = right_category, right, left
+        with self.pool.connection() as conn:
+            for row in conn.execute(f"SELECT t.{key_field}, t.name FROM {relation} r "
+                                    f"JOIN {table} t ON t.{key_field} = r.{key_field} WHERE r.{match} = ?", (key,)):
+                yield self._record(row, key_field)
+
+    def link_count(self, relation, key, reverse=False):
+        with self.pool.connection() as conn:
+            row = conn.execute("SELECT n FROM link_counts WHERE relation = ? AND side = ? AND key = ?",
+                               (relation, int(reverse), key)).fetchone()
+        return row[0] if row else 0
+
+    def link_counts(self, relation, reverse=False):
+        with self.pool.connection() as conn:
+            for key, n in conn.execute("SELECT key, n FROM link_counts WHERE relation = ? AND side = ? AND n > 0",
+                                       (relation, int(reverse))):
+                yield key, n
+
+    def migrated(self, source):
+        """True if the data of `source` was copied in by import_all()."""
+        with self.pool.connection() as conn:
+            return conn.execute("SELECT 1 FROM migrations WHERE source = ?", (source,)).fetchone() is not None
+
+    def import_all(self, data, source):
+        """Insert {category or relation: rows} and mark `source` as migrated, all in one transaction.
+
+        IDs already present keep their record. Returns {category or relation: rows inserted}.
+        """
+        summary = {}
+        with self.pool.connection() as conn:
+            with conn:
+                for category in CATEGORIES:
+                    table, key_field = self._table(category)
+                    rows = [(record[key_field], record['name']) for record in data.get(category, [])]
+                    summary[category] = conn.executemany(
+                        f"INSERT OR IGNORE INTO {table} ({key_field}, name) VALUES (?, ?)", rows).rowcount
+                for relation in RELATIONS:
+                    _, _, left, right = self._relation(relation)
+                    summary[relation] = conn.executemany(
+                        f"INSERT OR IGNORE INTO {relation} ({left}, {right}) VALUES (?, ?)",
+                        data.get(relation, [])).rowcount
+                conn.execute("INSERT INTO migrations (source, finished) VALUES (?, ?)", (source, time.time()))
+        return summary
+
+    def close(self):
+        self.pool.close()
+
+
+def migrate_json(json_path, backend):
+    """Copy an education_data.json (and its journal) into a SQLiteBackend, then retire the files.
+
+    The copy is one transaction that also records the migration in the
+    database, so a failure part way leaves nothing behind and the next start
+    tries again; a crash after the commit only leaves the renames to redo.
+    Repeated IDs keep their first record. Returns {category or relation: rows
+    copied}, or None if the files had been copied already.
+    """
+    marker = os.path.basename(json_path)
+    summary = None
+    if not backend.migrated(marker):
+        source = JsonJournalBackend(json_path)
+        try:
+            data = {category: list(source.iter_records(category)) for category in CATEGORIES}
+            for relation, (forward, _) in source.links.items():
+                data[relation] = [(left, right) for left, rights in forward.items() for right in rights]
+        finally:
+            source.close()
+        summary = backend.import_all(data, marker)
+
+    # Keep the old files around, but make sure the migration never runs twice
+    for path in (json_path, json_path + '.journal'):
+        if os.path.exists(path):
+            os.replace(path, path + '.migrated')
+    return summary
+
+
+def open_backend(filename):
+    """SQLite for *.db / *.sqlite files (migrating a sibling .json once), else the JSON journal.
+
+    Whether to migrate is decided by the legacy files still being in place
+    and the database not recording them as copied, so an interrupted
+    migration is retried on the next start.
+    """
+    if os.path.splitext(filename)[1] in ('.db', '.sqlite', '.sqlite3'):
+        backend = SQLiteBackend(filename)
+        legacy = os.path.splitext(filename)[0] + '.json'
+        if os.path.exists(legacy) or os.path.exists(legacy + '.journal'):
+            try:
+                summary = migrate_json(legacy, backend)
+            except Exception:
+                backend.close()
+                raise
+            if summary is not None:
+                print(f"Migrated {legacy} into {filename}: {summary}")
+        return backend
+    return JsonJournalBackend(filename)
@@ -0,0 +1,392 @@
+"""
+expr_engine.py
+Safe arithmetic expressions for Pro calclutor.py.
+
+Source text goes through a tokenizer and a Pratt parser into a small AST of
+tuples, which is compiled once into nested closures; constant subtrees are
+folded at compile time. Only numbers, the operators + - * / // % ** ^ (^ is
+a power too), parentheses, the whitelisted FUNCTIONS / CONSTANTS and free
+variables (passed when calling) are accepted, so nothing reaches eval().
+// and % are floored like Python's, so -7 % 3 is 2 as it was under eval().
+Compiled expressions are kept in an LRU cache keyed by the source text.
+
+    expr = compile_expression("2 * sin(30) + sqrt(x)")
+    expr(x=16)   # 5.0
+
+The same tree can be compiled against NumPy instead (compile_vectorized),
+so one call evaluates an expression over a whole array. Domain errors then
+become NaN for the affected elements instead of an exception, which is
+what evaluate_range() uses to tabulate a function of x over up to millions
+of points.
+
+    python expr_engine.py "x * sin(x)" --points 1000000    # timing and plot check
+    python expr_engine.py --check    # scalar and NumPy evaluation agree
+"""
+
+import argparse
+import functools
+import math
+import re
+import time
+from functools import lru_cache
+
+import numpy as np
+
+MAX_LENGTH = 1000  # characters
+MAX_DEPTH = 100    # parser nesting
+
+# name -> (function, number of arguments or None for any). Trig works in degrees like the buttons
+FUNCTIONS = {
+    'sqrt': (math.sqrt, 1),
+    'log': (math.log10, 1),
+    'ln': (math.log, 1),
+    'exp': (math.exp, 1),
+    'sin': (lambda x: math.sin(math.radians(x)), 1),
+    'cos': (lambda x: math.cos(math.radians(x)), 1),
+    'tan': (lambda x: math.tan(math.radians(x)), 1),
+    'asin': (lambda x: math.degrees(math.asin(x)), 1),
+    'acos': (lambda x: math.degrees(math.acos(x)), 1),
+    'atan': (lambda x: math.degrees(math.atan(x)), 1),
+    'abs': (abs, 1),
+    'floor': (math.floor, 1),
+    'ceil': (math.ceil, 1),
+    'round': (round, 1),
+    'min': (lambda *args: min(args), None),  # builtin min(3) would try to iterate 3
+    'max': (lambda *args: max(args), None),
+}
+CONSTANTS = {'pi': math.pi, 'e': math.e}
+
+# Same names, elementwise over arrays
+NUMPY_FUNCTIONS = {
+    'sqrt': (np.sqrt, 1),
+    'log': (np.log10, 1),
+    'ln': (np.log, 1),
+    'exp': (np.exp, 1),
+    'sin': (lambda x: np.sin(np.radians(x)), 1),
+    'cos': (lambda x: np.cos(np.radians(x)), 1),
+    'tan': (lambda x: np.tan(np.radians(x)), 1),
+    'asin': (lambda x: np.degrees(np.arcsin(x)), 1),
+    'acos': (lambda x: np.degrees(np.arccos(x)), 1),
+    'atan': (lambda x: np.degrees(np.arctan(x)), 1),
+    'abs': (np.abs, 1),
+    'floor': (np.floor, 1),
+    'ceil': (np.ceil, 1),
+    'round': (np.round, 1),
+    'min': (lambda *args: functools.reduce(np.minimum, args), None),
+    'max': (lambda *args: functools.reduce(np.maximum, args), None),
+}
+
+BINARY_OPERATORS = {
+    '+': lambda a, b: a + b,
+    '-': lambda a, b: a - b,
+    '*': lambda a, b: a * b,
+    '/': lambda a, b: a / b,
+    '//': lambda a, b: a // b,
+    '%': lambda a, b: a % b,  # floored: the result takes the sign of b
+    '**': math.pow,  # floats only: raises instead of going complex or building huge ints
+}
+NUMPY_OPERATORS = {
+    '+': np.add,
+    '-': np.subtract,
+    '*': np.multiply,
+    '/': np.true_divide,
+    '//': np.floor_divide,
+    '%': np.mod,
+    '**': np.power,
+}
+# operator -> (left binding power, right binding power); right < left makes it right-associative
+INFIX = {'+': (10, 11), '-': (10, 11), '*': (20, 21), '/': (20, 21), '//': (20, 21), '%': (20, 21), '**': (40, 39)}
+PREFIX_POWER = 30  # unary minus binds looser than **, so -2**2 == -4
+
+TOKEN_RE = re.compile(r"""
+    (?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)
+  | (?P<name>[A-Za-z_]\w*)
+  | (?P<op>\*\*|//|[-+*/%^(),])
+    """, re.VERBOSE)
+
+
+class ExpressionError(ValueError):
+    def __init__(self, message, position=None):
+        self.position = position
+        super().__init__(message if position is None else f"{message} at position {position + 1}")
+
+
+def tokenize(source):
+    """List of (kind, text, position) ending with ('end', '', len)."""
+    tokens = []
+    pos = 0
+    while True:
+        while pos < len(source) and source[pos].isspace():
+            pos += 1
+        if pos == len(source):
+            break
+        match = TOKEN_RE.match(source, pos)
+        if not match:
+            raise ExpressionError(f"Unexpected character {source[pos]!r}", pos)
+        kind = match.lastgroup
+        text = match.group()
+        tokens.append((kind, '**' if text == '^' else text, pos))
+        pos = match.end()
+    tokens.append(('end', '', len(source)))
+    return tokens
+
+
+class _Parser:
+    """Pratt parser producing ('num', value) / ('var', name) / ('neg', node) /
+    ('op', symbol, left, right) / ('call', name, [args]) tuples."""
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.index = 0
+
+    def peek(self):
+        return self.tokens[self.index]
+
+    def next(self):
+        token = self.tokens[self.index]
+        self.index += 1
+        return token
+
+    def expect(self, text):
+        kind, found, pos = self.next()
+        if found != text:
+            raise ExpressionError(f"Expected {text!r} but found {found or 'end of input'!r}", pos)
+
+    def parse(self):
+        node = self.expression(0, 0)
+        kind, text, pos = self.peek()
+        if kind != 'end':
+            raise ExpressionError(f"Unexpected {text!r}", pos)
+        return node
+
+    def expression(self, min_power, depth):
+        if depth > MAX_DEPTH:
+            raise ExpressionError("Expression is nested too deeply")
+        left = self.prefix(depth)
+        while True:
+            kind, text, pos = self.peek()
+            if kind != 'op' or text not in INFIX:
+                return left
+            left_power, right_power = INFIX[text]
+            if left_power < min_power:
+                return left
+            self.next()
+            left = ('op', text, left, self.expression(right_power, depth + 1))
+
+    def prefix(self, depth):
+        kind, text, pos = self.next()
+        if kind == 'number':
+            return ('num', float(text))
+        if kind == 'name':
+            if self.peek()[1] == '(':
+                return self.call(text, pos, depth)
+            return ('var', text)
+        if text == '(':
+            node = self.expression(0, depth + 1)
+            self.expect(')')
+            return node
+        if text in ('-', '+'):
+            operand = self.expression(PREFIX_POWER, depth + 1)
+            return ('neg', operand) if text == '-' else operand
+        raise ExpressionError(f"Unexpected {text or 'end of input'!r}", pos)
+
+    def call(self, name, pos, depth):
+        if name not in FUNCTIONS:
+            raise ExpressionError(f"Unknown function {name!r}", pos)
+        self.expect('(')
+        args = []
+        if self.peek()[1] != ')':
+            args.append(self.expression(0, depth + 1))
+            while self.peek()[1] == ',':
+                self.next()
+                args.append(self.expression(0, depth + 1))
+        self.expect(')')
+        arity = FUNCTIONS[name][1]
+        if (arity is not None and len(args) != arity) or not args:
+            raise ExpressionError(f"{name}() takes {arity or 'at least 1'} argument(s), got {len(args)}", pos)
+        return ('call', name, args)
+
+
+def parse(source):
+    if len(source) > MAX_LENGTH:
+        raise ExpressionError(f"Expression longer than {MAX_LENGTH} characters")
+    return _Parser(tokenize(source)).parse()
+
+
+def _compile(node, functions, operators, variables):
+    """Closure env -> value for node, plus whether it is a constant."""
+    kind = node[0]
+    if kind == 'num':
+        value = node[1]
+        return (lambda env: value), True
+    if kind == 'var':
+        name = node[1]
+        if name in CONSTANTS:
+            value = CONSTANTS[name]
+            return (lambda env: value), True
+        variables.add(name)
+        return (lambda env: env[name]), False
+
+    if kind == 'neg':
+        operand, constant = _compile(node[1], functions, operators, variables)
+        func = lambda env: -operand(env)
+    elif kind == 'op':
+        op = operators[node[1]]
+        left, left_constant = _compile(node[2], functions, operators, variables)
+        right, right_constant = _compile(node[3], functions, operators, variables)
+        constant = left_constant and right_constant
+        func = lambda env: op(left(env), right(env))
+    else:
+        impl = functions[node[1]][0]
+        compiled = [_compile(arg, functions, operators, variables) for arg in node[2]]
+        constant = all(c for _, c in compiled)
+        if len(compiled) == 1:
+            arg = compiled[0][0]
+            func = lambda env: impl(arg(env))
+        else:
+            args = [f for f, _ in compiled]
+            func = lambda env: impl(*[a(env) for a in args])
+
+    if constant:
+        try:
+            value = func(None)
+        except (ArithmeticError, ValueError):
+            return func, False  # leave the error for evaluation time
+        return (lambda env: value), True
+    return func, False
+
+
+class CompiledExpression:
+    def __init__(self, source, tree, functions=FUNCTIONS, operators=BINARY_OPERATORS):
+        self.source = source
+        self.tree = tree
+        variables = set()
+        self._func, self.constant = _compile(tree, functions, operators, variables)
+        self.variables = frozenset(variables)
+
+    def __call__(self, **env):
+        missing = self.variables.difference(env)
+        if missing:
+            raise ExpressionError(f"Unknown variable(s): {', '.join(sorted(missing))}")
+        return self._func(env)
+
+    def __repr__(self):
+        return f"CompiledExpression({self.source!r})"
+
+
+@lru_cache(maxsize=256)
+def compile_expression(source):
+    """Parse and compile source, reusing the result for repeated text."""
+    return CompiledExpression(source, parse(source))
+
+
+@lru_cache(maxsize=64)
+def compile_vectorized(source):
+    """Like compile_expression, but evaluating elementwise over NumPy arrays."""
+    with np.errstate(all='ignore'):  # constant folding may hit a domain error too
+        return CompiledExpression(source, parse(source), NUMPY_FUNCTIONS, NUMPY_OPERATORS)
+
+
+def evaluate(source, **env):
+    return compile_expression(source)(**env)
+
+
+def evaluate_array(source, **arrays):
+    """Evaluate over arrays in one pass; elements outside the domain come back as NaN."""
+    expr = compile_vectorized(source)
+    with np.errstate(all='ignore'):
+        values = np.asarray(expr(**{name: np.asarray(a, dtype=np.float64) for name, a in arrays.items()}),
+                            dtype=np.float64)
+    shape = np.broadcast_shapes(*(np.shape(a) for a in arrays.values())) if arrays else ()
+    values = np.array(np.broadcast_to(values, shape))  # constant expressions still fill the range
+    values[~np.isfinite(values)] = np.nan
+    return values
+
+
+def evaluate_range(source, start, stop, points, variable='x'):
+    """(xs, ys) for source as a function of `variable` at `points` evenly spaced values."""
+    expr = compile_vectorized(source)
+    unknown = expr.variables - {variable}
+    if unknown:
+        raise ExpressionError(f"Only {variable} may vary, found: {', '.join(sorted(unknown))}")
+    xs = np.linspace(start, stop, points)
+    return xs, evaluate_array(source, **{variable: xs})
+
+
+def downsample_minmax(ys, buckets):
+    """(low, high) of the finite values in each of `buckets` consecutive slices of ys.
+
+    Keeps spikes visible when millions of points are drawn a pixel column
+    each; a slice without finite values gives NaN. Slice lengths differ by
+    at most one and none is empty, so finite input fills every bucket.
+    """
+    ys = np.asarray(ys, dtype=np.float64)
+    buckets = max(1, min(buckets, len(ys)))
+    starts = np.linspace(0, len(ys), buckets + 1).astype(np.intp)[:-1]
+    return np.fmin.reduceat(ys, starts), np.fmax.reduceat(ys, starts)
+
+
+# Scalar and NumPy evaluation must agree on each of these; see check()
+CHECK_EXPRESSIONS = [
+    'min(3)', 'max(2)', 'min(x)', 'max(x, 1)', 'min(x, 2, -1)', 'max(-x, abs(-2))',
+    '-7 % 3', '7 % -3', 'x % 2', '-x // 2', '7 // -2',
+    '2 ** 3 ** 2', '-2 ** 2', '2 ^ x', 'sqrt(x) + ln(e) - log(100)',
+    'sin(30) + cos(60) + tan(45)', 'asin(0.5) + acos(0.5) + atan(1)',
+    'floor(-x / 2) + ceil(x / 2) + round(x / 2)', 'exp(1) - e', 'pi * x ** 2',
+]
+
+
+def check(x=3.0):
+    """(source, scalar, array) for CHECK_EXPRESSIONS the two paths disagree on at x.
+
+    An exception from the scalar path counts as disagreeing; its repr
+    stands in for the value.
+    """
+    failures = []
+    for source in CHECK_EXPRESSIONS:
+        try:
+            scalar = float(evaluate(source, x=x))
+        except Exception as e:  # a crash is what this is looking for
+            scalar = repr(e)
+        array = float(evaluate_array(source, x=np.array([x]))[0])
+        if isinstance(scalar, str) or not math.isclose(scalar, array, rel_tol=1e-12, abs_tol=1e-12):
+            failures.append((source, scalar, array))
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tabulate f(x) over a range and check the plot downsampling")
+    parser.add_argument('expression', nargs='?', default='x * sin(x)')
+    parser.add_argument('--start', type=float, default=-100.0)
+    parser.add_argument('--stop', type=float, default=100.0)
+    parser.add_argument('--points', type=int, default=1_000_000)
+    parser.add_argument('--width', type=int, default=460, help="plot columns")
+    parser.add_argument('--check', action='store_true', help="compare scalar and NumPy evaluation instead")
+    args = parser.parse_args()
+
+    if args.check:
+        failures = check()
+        print(f"{len(CHECK_EXPRESSIONS) - len(failures)} of {len(CHECK_EXPRESSIONS)} expressions agree")
+        for source, scalar, array in failures:
+            print(f"  {source}: {scalar} vs {array}")
+        if failures:
+            raise SystemExit(1)
+        return
+
+    t0 = time.perf_counter()
+    xs, ys = evaluate_range(args.expression, args.start, args.stop, args.points)
+    evaluated = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    low, high = downsample_minmax(ys, args.width)
+    downsampled = time.perf_counter() - t0
+
+    undefined = int(np.isnan(ys).sum())
+    empty = int(np.isnan(low).sum())
+    print(f"{len(ys):,} points in {evaluated * 1000:.1f} ms, {undefined:,} undefined")
+    print(f"{len(low)} plot columns in {downsampled * 1000:.2f} ms, {empty} empty")
+    if not undefined and empty:
+        raise SystemExit("Empty plot columns for a function defined everywhere")
+
+
+if __name__ == "__main__":
+    main()
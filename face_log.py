@@ -0,0 +1,283 @@
+"""
+face_log.py
+Detection event log and face thumbnail store for Face decte.py.
+
+IouTracker gives each face a track id by matching boxes frame to frame.
+EventLog appends one JSON line per detection (time, frame, track, box,
+thumbnail) to a log file; events are queued and written in batches by a
+background thread. Track ids restart with every run, so each event is also
+stamped with the run's session id and a person is (session, track).
+ThumbnailStore JPEG-encodes downscaled face crops on its own thread and
+keeps them in a directory capped at max_bytes, evicting the least recently
+used first.
+
+The capture loop only ever does non-blocking queue puts: if a writer falls
+behind, events or thumbnails are dropped (and counted) rather than slowing
+detection down.
+
+    python face_log.py face_events.jsonl    # summary of a recorded log
+"""
+
+import argparse
+import json
+import os
+import queue
+import threading
+import time
+from collections import Counter, OrderedDict
+
+import cv2
+
+EVENT_BATCH = 256        # events per write
+FLUSH_INTERVAL = 1.0     # seconds an event may wait for a full batch
+THUMB_SIZE = 96          # pixels, longest side
+THUMB_QUALITY = 80       # JPEG quality
+THUMB_INTERVAL = 2.0     # seconds between thumbnails of one track
+STORE_BYTES = 50 * 1024 * 1024
+QUEUE_SIZE = 1024
+
+
+def new_session_id():
+    """Id of this run: start time and process id, e.g. '20261019-114502-4242'."""
+    return f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+
+
+def iou(a, b):
+    """Intersection over union of two (x, y, w, h) boxes."""
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    iw = min(ax + aw, bx + bw) - max(ax, bx)
+    ih = min(ay + ah, by + bh) - max(ay, by)
+    if iw <= 0 or ih <= 0:
+        return 0.0
+    inter = iw * ih
+    return inter / (aw * ah + bw * bh - inter)
+
+
+class IouTracker:
+    """Track ids for boxes: each box takes the id of the best-overlapping live track."""
+
+    def __init__(self, threshold=0.3, max_missing=15):
+        self.threshold = threshold
+        self.max_missing = max_missing  # frames a track survives without a match
+        self.tracks = {}                # id -> [box, frames missing, last thumbnail time]
+        self.next_id = 1
+
+    def update(self, boxes):
+        """Track id for each box of this frame, in order."""
+        pairs = sorted(((iou(track[0], box), track_id, i)
+                        for track_id, track in self.tracks.items()
+                        for i, box in enumerate(boxes)), reverse=True)
+        ids = [None] * len(boxes)
+        used = set()
+        for overlap, track_id, i in pairs:  # greedy, best overlap first
+            if overlap < self.threshold:
+                break
+            if ids[i] is None and track_id not in used:
+                ids[i] = track_id
+                used.add(track_id)
+
+        for track_id in list(self.tracks):
+            if track_id not in used:
+                self.tracks[track_id][1] += 1
+                if self.tracks[track_id][1] > self.max_missing:
+                    del self.tracks[track_id]
+        for i, box in enumerate(boxes):
+            if ids[i] is None:
+                ids[i] = self.next_id
+                self.next_id += 1
+                self.tracks[ids[i]] = [None, 0, None]
+            track = self.tracks[ids[i]]
+            track[0], track[1] = tuple(int(v) for v in box), 0
+        return ids
+
+    def thumbnail_due(self, track_id, now, interval=THUMB_INTERVAL):
+        """True (and restarts the clock) if the track hasn't had a thumbnail for `interval` seconds."""
+        track = self.tracks[track_id]
+        if track[2] is not None and now - track[2] < interval:
+            return False
+        track[2] = now
+        return True
+
+
+def _stop_worker(work, thread, poll=0.1):
+    """Queue the stop sentinel for a worker thread and wait for it to finish.
+
+    A worker that died (say its file couldn't be opened) never drains the
+    queue, so the sentinel is only offered while the thread is alive.
+    """
+    while thread.is_alive():
+        try:
+            work.put(None, timeout=poll)
+            break
+        except queue.Full:
+            continue
+    thread.join()
+
+
+class EventLog:
+    """Append-only JSON lines file written in batches by a background thread."""
+
+    def __init__(self, path, batch=EVENT_BATCH, flush_interval=FLUSH_INTERVAL, session=None):
+        self.path = path
+        self.session = session or new_session_id()
+        self.batch = batch
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self.written = 0
+        self._queue = queue.Queue(maxsize=QUEUE_SIZE * 8)
+        self._thread = threading.Thread(target=self._run, name="face-events", daemon=True)
+        self._thread.start()
+
+    def log(self, event):
+        """Queue one event (a JSON-able dict); never blocks."""
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self):
+        with open(self.path, 'a', encoding='utf-8') as file:
+            stop = False
+            while not stop:
+                events = []
+                deadline = time.monotonic() + self.flush_interval
+                while len(events) < self.batch:
+                    try:
+                        event = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                    except queue.Empty:
+                        break
+                    if event is None:
+                        stop = True
+                        break
+                    events.append(event)
+                if events:
+                    file.write(''.join(json.dumps(dict(e, session=self.session), separators=(',', ':')) + '\n'
+                                       for e in events))
+                    file.flush()
+                    self.written += len(events)
+
+    def close(self):
+        """Write whatever is queued and stop the writer."""
+        _stop_worker(self._queue, self._thread)
+
+
+class ThumbnailStore:
+    """Size-capped directory of JPEG face crops, least recently used evicted first."""
+
+    def __init__(self, directory, max_bytes=STORE_BYTES, size=THUMB_SIZE, quality=THUMB_QUALITY):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.size = size
+        self.quality = quality
+        self.dropped = 0
+        self.entries = OrderedDict()  # name -> bytes on disk, least recently used first
+        self.total = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        existing = [(entry.stat().st_mtime, entry.name, entry.stat().st_size)
+                    for entry in os.scandir(directory) if entry.name.endswith('.jpg')]
+        for _, name, size in sorted(existing):
+            self.entries[name[:-4]] = size
+            self.total += size
+        self._queue = queue.Queue(maxsize=QUEUE_SIZE)
+        self._thread = threading.Thread(target=self._run, name="face-thumbnails", daemon=True)
+        self._thread.start()
+
+    def submit(self, name, crop):
+        """Queue a BGR crop (copied by the caller) to be stored as `name`; never blocks.
+
+        Returns the name, or None if the encoder is behind and the crop was dropped.
+        """
+        try:
+            self._queue.put_nowait((name, crop))
+        except queue.Full:
+            self.dropped += 1
+            return None
+        return name
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            name, crop = item
+            h, w = crop.shape[:2]
+            scale = self.size / max(h, w)
+            if scale < 1:
+                crop = cv2.resize(crop, (max(1, int(w * scale)), max(1, int(h * scale))),
+                                  interpolation=cv2.INTER_AREA)
+            ok, jpeg = cv2.imencode('.jpg', crop, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+            if ok:
+                self._put(name, jpeg.tobytes())
+
+    def _put(self, name, data):
+        with open(self._path(name), 'wb') as file:
+            file.write(data)
+        with self._lock:
+            self.total += len(data) - self.entries.pop(name, 0)
+            self.entries[name] = len(data)
+            while self.total > self.max_bytes and len(self.entries) > 1:
+                old, size = self.entries.popitem(last=False)
+                self.total -= size
+                try:
+                    os.remove(self._path(old))
+                except OSError:
+                    pass
+
+    def _path(self, name):
+        return os.path.join(self.directory, name + '.jpg')
+
+    def get(self, name):
+        """JPEG bytes of a stored thumbnail (marking it recently used), or None if evicted."""
+        with self._lock:
+            if name not in self.entries:
+                return None
+            self.entries.move_to_end(name)
+        try:
+            with open(self._path(name), 'rb') as file:
+                return file.read()
+        except OSError:
+            return None
+
+    def close(self):
+        """Encode whatever is queued and stop the encoder."""
+        _stop_worker(self._queue, self._thread)
+
+
+def read_events(path):
+    """Events of a log file, oldest first; a line cut off by a crash is skipped."""
+    with open(path, 'r', encoding='utf-8') as file:
+        for line in file:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize a face detection event log")
+    parser.add_argument('log', nargs='?', default='face_events.jsonl')
+    args = parser.parse_args()
+
+    events = 0
+    tracks = Counter()  # (session, track) -> detections; logs from before sessions have None
+    minutes = Counter()
+    first = last = None
+    for event in read_events(args.log):
+        events += 1
+        tracks[event.get('session'), event['track']] += 1
+        minutes[time.strftime('%Y-%m-%d %H:%M', time.localtime(event['t']))] += 1
+        first = event['t'] if first is None else first
+        last = event['t']
+    if not events:
+        print("No events")
+        return
+    sessions = len({session for session, _ in tracks})
+    print(f"{events} detections of {len(tracks)} tracks in {sessions} sessions over {last - first:.0f}s")
+    for minute, count in sorted(minutes.items()):
+        print(f"{minute}  {count:6d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+"""
+gaze_targets.py
+Snap a coarse gaze point to on-screen targets for cursor eye tracker.py.
+
+A layout is a JSON file of clickable rectangles:
+
+    {"snap_radius": 150, "dwell": 0.8,
+     "targets": [{"name": "OK", "x": 100, "y": 200, "w": 120, "h": 40}, ...]}
+
+GridIndex buckets the rectangles into square cells and searches rings of
+cells outward from the gaze point, so a lookup only measures the few
+rectangles near it (vectorized with NumPy) and stays in the tens of
+microseconds with thousands of targets. GazeSnapper keeps the current
+target until another is clearly closer, so jitter doesn't flip between
+neighbours, and DwellClicker fires once the gaze has rested on one target
+for the dwell time.
+
+    python gaze_targets.py --benchmark 5000    # lookup timing on random targets
+"""
+
+import argparse
+import json
+import math
+import time
+from collections import namedtuple
+
+import numpy as np
+
+Target = namedtuple('Target', ['name', 'x', 'y', 'w', 'h'])
+
+SNAP_RADIUS = 150   # pixels; farther targets are ignored
+DWELL = 0.8         # seconds of steady gaze per click
+STICKINESS = 0.3    # another target must be this fraction of the radius closer to take over
+CELL = 64           # grid cell size in pixels
+
+
+def center(target):
+    return target.x + target.w / 2, target.y + target.h / 2
+
+
+def load_layout(path):
+    """(targets, options) from a layout file; a bare list of targets is accepted too."""
+    with open(path, 'r', encoding='utf-8') as file:
+        data = json.load(file)
+    if isinstance(data, list):
+        data = {'targets': data}
+    targets = []
+    for i, item in enumerate(data.get('targets', [])):
+        try:
+            target = Target(str(item.get('name', i)), float(item['x']), float(item['y']),
+                            float(item['w']), float(item['h']))
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"{path}: target {i} needs numeric x, y, w, h") from e
+        if target.w <= 0 or target.h <= 0:
+            raise ValueError(f"{path}: target {i} has no area")
+        targets.append(target)
+    options = {'snap_radius': float(data.get('snap_radius', SNAP_RADIUS)),
+               'dwell': float(data.get('dwell', DWELL))}
+    return targets, options
+
+
+class GridIndex:
+    """Uniform grid over target rectangles for nearest-target lookups."""
+
+    def __init__(self, targets, cell=CELL):
+        self.targets = list(targets)
+        self.cell = cell
+        boxes = np.array([(t.x, t.y, t.x + t.w, t.y + t.h) for t in self.targets], dtype=np.float64).reshape(-1, 4)
+        self.boxes = boxes
+        self.centers = np.column_stack([(boxes[:, 0] + boxes[:, 2]) / 2, (boxes[:, 1] + boxes[:, 3]) / 2])
+        cells = {}
+        for i, (x0, y0, x1, y1) in enumerate(boxes):
+            for cx in range(int(x0 // cell), int(x1 // cell) + 1):
+                for cy in range(int(y0 // cell), int(y1 // cell) + 1):
+                    cells.setdefault((cx, cy), []).append(i)
+        self.cells = {key: np.array(ids, dtype=np.intp) for key, ids in cells.items()}
+
+    def __len__(self):
+        return len(self.targets)
+
+    def ring(self, px, py, k):
+        """Index arrays of the cells k steps (Chebyshev distance) from cell (px, py)."""
+        if k == 0:
+            keys = [(px, py)]
+        else:
+            keys = [(px + dx, py + dy) for dx in range(-k, k + 1) for dy in (-k, k)]
+            keys += [(px + dx, py + dy) for dx in (-k, k) for dy in range(-k + 1, k)]
+        return [self.cells[key] for key in keys if key in self.cells]
+
+    def distances(self, ids, x, y):
+        """Distance from (x, y) to each rectangle's edge (0 inside it)."""
+        boxes = self.boxes[ids]
+        dx = np.maximum(np.maximum(boxes[:, 0] - x, x - boxes[:, 2]), 0)
+        dy = np.maximum(np.maximum(boxes[:, 1] - y, y - boxes[:, 3]), 0)
+        return np.hypot(dx, dy)
+
+    def nearest(self, x, y, radius=SNAP_RADIUS):
+        """(index, distance) of the closest target within radius, or (None, inf).
+
+        Rings of cells are taken outward from the point until one holds a
+        target; that target's distance bounds how many more rings can hold
+        a closer one, and those are added before measuring. Every cell in
+        ring k + 1 is at least k cells away, which is what makes the bound
+        safe. Among targets the point is inside, the nearest center wins.
+        """
+        px, py = int(x // self.cell), int(y // self.cell)
+        max_ring = int(radius // self.cell) + 1
+        parts, k = [], 0
+        while not parts and k <= max_ring:
+            parts = self.ring(px, py, k)
+            k += 1
+        if not parts:
+            return None, math.inf
+        ids = np.concatenate(parts) if len(parts) > 1 else parts[0]
+        dist = self.distances(ids, x, y)
+
+        # rings that can still hold something closer than the best so far
+        bound = min(float(dist.min()), radius)
+        more = []
+        while k <= max_ring and (k - 1) * self.cell < bound:
+            more += self.ring(px, py, k)
+            k += 1
+        if more:
+            extra = np.concatenate(more)
+            ids = np.concatenate([ids, extra])  # repeats are harmless for a minimum
+            dist = np.concatenate([dist, self.distances(extra, x, y)])
+
+        best = int(dist.argmin())
+        if dist[best] > radius:
+            return None, math.inf
+        if dist[best] == 0:
+            inside = ids[dist == 0]
+            if len(inside) > 1:  # nested or overlapping targets: the nearest center wins
+                centers = self.centers[inside]
+                return int(inside[np.hypot(centers[:, 0] - x, centers[:, 1] - y).argmin()]), 0.0
+        return int(ids[best]), float(dist[best])
+
+    def distance_to(self, index, x, y):
+        return float(self.distances(np.array([index]), x, y)[0])
+
+
+class GazeSnapper:
+    """Maps a gaze point to a target, holding on to the current one against jitter."""
+
+    def __init__(self, index, radius=SNAP_RADIUS, stickiness=STICKINESS):
+        self.index = index
+        self.radius = radius
+        self.margin = radius * stickiness
+        self.current = None  # index of the target snapped to
+
+    def snap(self, x, y):
+        """(target or None, point to put the cursor on): the target's center, or the gaze itself."""
+        best, dist = self.index.nearest(x, y, self.radius)
+        if self.current is not None and best != self.current:
+            held = self.index.distance_to(self.current, x, y)
+            if held <= self.radius and (best is None or held - dist < self.margin):
+                best = self.current
+        self.current = best
+        if best is None:
+            return None, (x, y)
+        target = self.index.targets[best]
+        return target, center(target)
+
+
+class DwellClicker:
+    """Fires once when the gaze stays on the same target for `dwell` seconds."""
+
+    def __init__(self, dwell=DWELL):
+        self.dwell = dwell
+        self.target = None
+        self.since = 0.0
+        self.fired = False
+
+    def update(self, target, now=None):
+        """The target to click now, or None."""
+        now = time.monotonic() if now is None else now
+        if target != self.target:
+            self.target, self.since, self.fired = target, now, False
+            return None
+        if target is None or self.fired or now - self.since < self.dwell:
+            return None
+        self.fired = True  # look away and back to click again
+        return target
+
+    def progress(self, now=None):
+        """0..1 of the dwell time completed on the current target."""
+        if self.target is None or self.fired:
+            return 0.0
+        now = time.monotonic() if now is None else now
+        return min(1.0, (now - self.since) / self.dwell)
+
+
+def random_layout(count, width=1920, height=1080, seed=0):
+    """`count` random buttons, for benchmarks."""
+    rng = np.random.default_rng(seed)
+    sizes = rng.integers(16, 120, size=(count, 2))
+    xs = rng.integers(0, width - sizes[:, 0])
+    ys = rng.integers(0, height - sizes[:, 1])
+    return [Target(f"t{i}", float(x), float(y), float(w), float(h))
+            for i, (x, y, (w, h)) in enumerate(zip(xs, ys, sizes))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gaze target index check and benchmark")
+    parser.add_argument('layout', nargs='?', help="layout JSON to load (default: random targets)")
+    parser.add_argument('--benchmark', type=int, default=5000, metavar='N', help="random targets to index")
+    parser.add_argument('--queries', type=int, default=20000)
+    args = parser.parse_args()
+
+    if args.layout:
+        targets, options = load_layout(args.layout)
+        radius = options['snap_radius']
+    else:
+        targets, radius = random_layout(args.benchmark), SNAP_RADIUS
+    t0 = time.perf_counter()
+    index = GridIndex(targets)
+    built = time.perf_counter() - t0
+
+    points = np.random.default_rng(1).uniform(0, 1, size=(args.queries, 2)) * [1920, 1080]
+    t0 = time.perf_counter()
+    for x, y in points:
+        index.nearest(x, y, radius)
+    per_query = (time.perf_counter() - t0) / args.queries
+    print(f"{len(index)} targets indexed in {built * 1000:.1f} ms, {len(index.cells)} cells")
+    print(f"nearest(): {per_query * 1e6:.1f} us per lookup ({args.queries} lookups)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+"""
+kinarow_engine.py
+N x N board, K in a row engine (tic-tac-toe at 3/3, gomoku at 15/5).
+
+The board is an int8 NumPy array (EMPTY, X, O). A move is checked for a win
+by walking only the four lines through it, at most K - 1 cells each way, so
+the cost per move doesn't depend on the board size. Every position carries
+an incrementally updated Zobrist hash.
+
+SearchAI picks moves by iterative deepening negamax with alpha-beta and a
+transposition table, stopping when its time budget runs out and playing the
+best move of the deepest completed search. Leaves are scored over all K-cell
+windows at once with NumPy; the same window scores rank candidate moves
+(cells next to existing stones) so the best ones are searched first.
+"""
+
+import time
+
+import numpy as np
+
+EMPTY, X, O = 0, 1, 2
+SYMBOLS = {X: 'X', O: 'O'}
+DIRECTIONS = [(0, 1), (1, 0), (1, 1), (1, -1)]
+WIN_SCORE = 1_000_000
+
+
+def other(player):
+    return X + O - player
+
+
+def window_indices(size, k):
+    """Flat cell indices of every K-cell line segment, shape (windows, k)."""
+    windows = []
+    for dr, dc in DIRECTIONS:
+        for r in range(size):
+            for c in range(size):
+                end_r, end_c = r + dr * (k - 1), c + dc * (k - 1)
+                if 0 <= end_r < size and 0 <= end_c < size:
+                    windows.append([(r + dr * i) * size + c + dc * i for i in range(k)])
+    return np.array(windows, dtype=np.intp).reshape(-1, k)
+
+
+class Board:
+    def __init__(self, size=3, k=3, seed=0):
+        if not 1 <= k <= size:
+            raise ValueError(f"need 1 <= k <= size, got k={k}, size={size}")
+        self.size = size
+        self.k = k
+        self.grid = np.zeros((size, size), dtype=np.int8)
+        self.history = []       # (row, col) of every move
+        self.player = X         # side to move
+        self.winner = EMPTY
+        self.win_line = None    # ((row, col), (row, col)) ends of the winning run
+        self.zobrist = np.random.default_rng(seed).integers(1, 2 ** 63, size=(3, size, size), dtype=np.int64)
+        self.hash = 0
+
+    def copy(self):
+        board = Board.__new__(Board)
+        board.__dict__.update(self.__dict__)
+        board.grid = self.grid.copy()
+        board.history = list(self.history)
+        return board
+
+    def is_full(self):
+        return len(self.history) == self.size * self.size
+
+    def over(self):
+        return self.winner != EMPTY or self.is_full()
+
+    def play(self, row, col):
+        """Place a stone for the side to move; False if the cell is taken or the game is over."""
+        if self.over() or self.grid[row, col] != EMPTY:
+            return False
+        player = self.player
+        self.grid[row, col] = player
+        self.history.append((row, col))
+        self.hash ^= int(self.zobrist[player, row, col])
+        self.player = other(player)
+        line = self._line_through(row, col, player)
+        if line:
+            self.winner = player
+            self.win_line = line
+        return True
+
+    def undo(self):
+        row, col = self.history.pop()
+        player = int(self.grid[row, col])
+        self.grid[row, col] = EMPTY
+        self.hash ^= int(self.zobrist[player, row, col])
+        self.player = player
+        self.winner = EMPTY
+        self.win_line = None
+
+    def _line_through(self, row, col, player):
+        """Ends of a run of K through (row, col), or None. Looks at most K - 1 cells each way."""
+        grid, size, k = self.grid, self.size, self.k
+        for dr, dc in DIRECTIONS:
+            ends = []
+            for sign in (1, -1):
+                r, c, steps = row, col, 0
+                while steps < k - 1:
+                    nr, nc = r + sign * dr, c + sign * dc
+                    if not (0 <= nr < size and 0 <= nc < size) or grid[nr, nc] != player:
+                        break
+                    r, c, steps = nr, nc, steps + 1
+                ends.append((r, c, steps))
+            if ends[0][2] + ends[1][2] + 1 >= k:
+                return ends[1][:2], ends[0][:2]
+        return None
+
+    def bitboards(self):
+        """(X cells, O cells) as ints with bit row * size + col set."""
+        flat = self.grid.ravel()
+        return (sum(1 << int(i) for i in np.flatnonzero(flat == X)),
+                sum(1 << int(i) for i in np.flatnonzero(flat == O)))
+
+
+class SearchAI:
+    def __init__(self, time_budget=1.0, max_depth=20, beam=12, radius=1):
+        self.time_budget = time_budget  # seconds per move
+        self.max_depth = max_depth
+        self.beam = beam                # candidate moves searched per node
+        self.radius = radius            # candidates lie within this many cells of a stone
+        self.tt = {}
+        self._windows = None
+        self.last_depth = 0             # depth of the search the last move came from
+        self.nodes = 0
+
+    # ---------- static evaluation ----------
+    def _prepare(self, board):
+        if self._windows is None or self._windows_for != (board.size, board.k):
+            self._windows = window_indices(board.size, board.k)
+            self._windows_for = (board.size, board.k)
+            # Every window holds at most k - 1 stones in a position that isn't won, so
+            # the evaluation is at most windows * 10 ** (k - 1); scale that to a tenth
+            # of WIN_SCORE at most, or a long open line would look like a forced win
+            bound = len(self._windows) * 10.0 ** (board.k - 1)
+            self._weights = 10.0 ** np.arange(board.k + 1) * min(1.0, WIN_SCORE / (10 * bound))
+            self._weights[board.k] = WIN_SCORE
+            self.tt.clear()
+
+    def _window_counts(self, board):
+        cells = board.grid.ravel()[self._windows]
+        return (cells == X).sum(axis=1), (cells == O).sum(axis=1)
+
+    def evaluate(self, board):
+        """Score for the side to move: open windows count 10 ** stones in them.
+
+        Weights are scaled down on big boards so the score stays below WIN_SCORE.
+        """
+        xs, os_ = self._window_counts(board)
+        weights = self._weights
+        score = (weights[xs] * (os_ == 0)).sum() - (weights[os_] * (xs == 0)).sum()
+        return score if board.player == X else -score
+
+    def candidates(self, board):
+        """Empty cells near stones, most promising (attack or defence) first."""
+        occupied = board.grid != EMPTY
+        if not occupied.any():
+            return [(board.size // 2, board.size // 2)]
+        near = occupied.copy()
+        for _ in range(self.radius):
+            grown = near.copy()
+            grown[1:, :] |= near[:-1, :]
+            grown[:-1, :] |= near[1:, :]
+            grown[:, 1:] |= near[:, :-1]
+            grown[:, :-1] |= near[:, 1:]
+            grown[1:, 1:] |= near[:-1, :-1]
+            grown[:-1, :-1] |= near[1:, 1:]
+            grown[1:, :-1] |= near[:-1, 1:]
+            grown[:-1, 1:] |= near[1:, :-1]
+            near = grown
+        cells = np.flatnonzero((near & ~occupied).ravel())
+
+        # Priority of a cell: the value of the open windows it belongs to, for either side
+        xs, os_ = self._window_counts(board)
+        value = self._weights[xs] * (os_ == 0) + self._weights[os_] * (xs == 0)
+        priority = np.bincount(self._windows.ravel(), weights=np.repeat(value, board.k),
+                               minlength=board.size * board.size)
+        order = cells[np.argsort(-priority[cells], kind='stable')][:self.beam]
+        return [divmod(int(i), board.size) for i in order]
+
+    # ---------- search ----------
+    def choose_move(self, board):
+        """Best move found within the time budget, as (row, col)."""
+        self._prepare(board)
+        if len(self.tt) > 1_000_000:
+            self.tt.clear()
+        board = board.copy()
+        self._deadline = time.perf_counter() + self.time_budget
+        self.nodes = 0
+        moves = self.candidates(board)
+        best = moves[0]
+        empty_cells = board.size * board.size - len(board.history)
+        for depth in range(1, min(self.max_depth, empty_cells) + 1):
+            try:
+                value, move = self._root(board, moves, depth)
+            except TimeoutError:
+                break
+            best = move
+            self.last_depth = depth
+            moves.remove(move)
+            moves.insert(0, move)  # search it first next iteration
+            if abs(value) >= WIN_SCORE:
+                break  # forced win or loss found; deeper won't change it
+        return best
+
+    def _root(self, board, moves, depth):
+        alpha, best_move = -np.inf, moves[0]
+        for move in moves:
+            board.play(*move)
+            value = -self._negamax(board, depth - 1, -np.inf, -alpha)
+            board.undo()
+            if value > alpha:
+                alpha, best_move = value, move
+        return alpha, best_move
+
+    def _negamax(self, board, depth, alpha, beta):
+        self.nodes += 1
+        if self.nodes & 255 == 0 and time.perf_counter() > self._deadline:
+            raise TimeoutError
+        if board.winner:
+            return -WIN_SCORE - depth  # the previous move won; sooner is worse
+        if board.is_full():
+            return 0
+        if depth == 0:
+            return self.evaluate(board)
+
+        entry = self.tt.get(board.hash)
+        tt_move = None
+        if entry:
+            entry_depth, value, flag, tt_move = entry
+            if entry_depth >= depth and (flag == 0 or (flag == 1 and value >= beta) or (flag == 2 and value <= alpha)):
+                return value
+
+        original_alpha = alpha
+        best, best_move = -np.inf, None
+        moves = self.candidates(board)
+        if tt_move in moves:
+            moves.remove(tt_move)
+            moves.insert(0, tt_move)
+        for move in moves:
+            board.play(*move)
+            value = -self._negamax(board, depth - 1, -beta, -alpha)
+            board.undo()
+            if value > best:
+                best, best_move = value, move
+            alpha = max(alpha, best)
+            if alpha >= beta:
+                break
+
+        flag = 2 if best <= original_alpha else 1 if best >= beta else 0  # upper / lower / exact
+        self.tt[board.hash] = (depth, best, flag, best_move)
+        return best
@@ -0,0 +1,202 @@
+"""
+plane_engine.py
+Fixed-timestep simulation core for plane_game.py.
+Holds the whole game state and advances it one tick at a time. It does not
+import pygame, so it can be stepped headless (tests, bots, batch runs) as
+fast as the CPU allows; plane_game.py only renders it.
+Obstacles come from a seeded plane_spawn schedule, so a (difficulty, seed,
+inputs) triple replays a run exactly.
+"""
+
+import base64
+import json
+import random
+from collections import namedtuple
+
+from plane_spawn import SpawnSchedule
+
+# ---------- World / timing ----------
+WIDTH, HEIGHT = 800, 600
+TICK_RATE = 60               # simulation steps per second, independent of FPS
+DT = 1.0 / TICK_RATE
+
+PLANE_WIDTH, PLANE_HEIGHT = 70, 20
+PLANE_SPEED = 5              # pixels per tick
+SCORE_PER_TICK = 0.1
+SLOW_MODE_TICKS = 5 * TICK_RATE
+DESPAWN_X = -100
+
+# Difficulty settings: (obstacle speed, starting spawn interval in ms, obstacle type weights)
+difficulty_levels = {
+    'easy': (2, 2500, {'spike': 1}),
+    'normal': (3, 2000, {'spike': 3, 'cloud': 3, 'lightning': 1}),
+    'hard': (4, 1500, {'spike': 3, 'cloud': 3, 'bird': 3, 'lightning': 1, 'missile': 1}),
+    'extreme': (6, 1000, {'spike': 2, 'cloud': 2, 'bird': 3, 'lightning': 2, 'missile': 2})
+}
+
+# How the spawn rate ramps up and which wave patterns appear (see plane_spawn)
+spawn_curves = {
+    'easy': {'ramp': 0.995, 'min_ms': 1500, 'jitter': 0.15,
+             'wave_every': 0, 'wave_size': 0, 'wave_gap_ms': 0, 'wave_step': 0},
+    'normal': {'ramp': 0.99, 'min_ms': 1000, 'jitter': 0.2,
+               'wave_every': 12, 'wave_size': 2, 'wave_gap_ms': 250, 'wave_step': 70},
+    'hard': {'ramp': 0.985, 'min_ms': 800, 'jitter': 0.2,
+             'wave_every': 8, 'wave_size': 3, 'wave_gap_ms': 150, 'wave_step': 60},
+    'extreme': {'ramp': 0.98, 'min_ms': 500, 'jitter': 0.2,
+                'wave_every': 6, 'wave_size': 3, 'wave_gap_ms': 120, 'wave_step': 50},
+}
+SPAWN_Y_RANGE = (50, HEIGHT - 60)
+
+# Hitbox (width, height) of each obstacle type
+OBSTACLE_SIZES = {
+    'spike': (20, 40),
+    'cloud': (90, 40),
+    'bird': (40, 20),
+    'lightning': (20, 40),
+    'missile': (50, 10),
+}
+
+# Player input for one tick
+Controls = namedtuple('Controls', ['up', 'down', 'left', 'right', 'slow'])
+NO_INPUT = Controls(False, False, False, False, False)
+
+
+def new_schedule(difficulty, seed):
+    _, spawn_ms, weights = difficulty_levels[difficulty]
+    return SpawnSchedule(spawn_ms, weights, spawn_curves[difficulty], seed=seed,
+                         tick_rate=TICK_RATE, y_range=SPAWN_Y_RANGE)
+
+
+class GameState:
+    def __init__(self, difficulty='normal', seed=None, schedule=None):
+        speed = difficulty_levels[difficulty][0]
+        self.difficulty = difficulty
+        self.seed = seed if seed is not None else random.randrange(2 ** 32)
+        self.tick = 0
+
+        self.plane_x, self.plane_y = WIDTH * 0.1, HEIGHT // 2
+        self.prev_plane_x, self.prev_plane_y = self.plane_x, self.plane_y
+
+        self.obstacles = []  # dicts: type, x, y, prev_x
+        self.schedule = schedule or new_schedule(difficulty, self.seed)
+        self.spawn_index = 0
+        self.next_spawn_tick = self.schedule.tick_at(0)
+
+        self.score = 0
+        self.game_speed = speed
+        self.slow_mode = False
+        self.slow_until = 0
+        self.game_over = False
+
+    def survival_time(self):
+        """Seconds of game time survived so far."""
+        return self.tick * DT
+
+
+def update(state, controls=NO_INPUT):
+    """Advance plane, timers, spawning and obstacles by one tick."""
+    state.tick += 1
+    state.prev_plane_x, state.prev_plane_y = state.plane_x, state.plane_y
+
+    if controls.up:
+        state.plane_y = max(0, state.plane_y - PLANE_SPEED)
+    if controls.down:
+        state.plane_y = min(HEIGHT - PLANE_HEIGHT, state.plane_y + PLANE_SPEED)
+    if controls.left:
+        state.plane_x = max(0, state.plane_x - PLANE_SPEED)
+    if controls.right:
+        state.plane_x = min(WIDTH - PLANE_WIDTH, state.plane_x + PLANE_SPEED)
+    if controls.slow and not state.slow_mode:
+        state.slow_mode = True
+        state.slow_until = state.tick + SLOW_MODE_TICKS
+        state.game_speed /= 2
+
+    if state.slow_mode and state.tick > state.slow_until:
+        state.game_speed *= 2
+        state.slow_mode = False
+
+    state.score += SCORE_PER_TICK
+
+    # Spawn whatever the schedule has due (a wave can bring several)
+    while state.tick >= state.next_spawn_tick:
+        schedule, i = state.schedule, state.spawn_index
+        state.obstacles.append({'type': schedule.types[i], 'x': WIDTH, 'y': schedule.ys[i], 'prev_x': WIDTH})
+        state.spawn_index = i + 1
+        state.next_spawn_tick = schedule.tick_at(i + 1)
+
+    # Move obstacles, dropping the ones that left the screen
+    kept = []
+    for obs in state.obstacles:
+        obs['prev_x'] = obs['x']
+        obs['x'] -= state.game_speed
+        if obs['x'] >= DESPAWN_X:
+            kept.append(obs)
+    state.obstacles = kept
+
+
+def check_collision(state):
+    """Mark the game over if the plane overlaps any obstacle."""
+    px, py = state.plane_x, state.plane_y
+    for obs in state.obstacles:
+        w, h = OBSTACLE_SIZES[obs['type']]
+        if (px < obs['x'] + w and obs['x'] < px + PLANE_WIDTH and
+                py < obs['y'] + h and obs['y'] < py + PLANE_HEIGHT):
+            state.game_over = True
+            break
+    return state.game_over
+
+
+def step(state, controls=NO_INPUT):
+    """Run one full simulation tick; returns True once the plane has crashed."""
+    if state.game_over:
+        return True
+    update(state, controls)
+    return check_collision(state)
+
+
+def pack_controls(controls):
+    return controls.up | controls.down << 1 | controls.left << 2 | controls.right << 3 | controls.slow << 4
+
+
+def unpack_controls(bits):
+    return Controls(*(bool(bits >> i & 1) for i in range(5)))
+
+
+class Replay:
+    """Difficulty, seed and per-tick inputs of a run: enough to reproduce it exactly."""
+
+    def __init__(self, difficulty, seed, inputs=None):
+        self.difficulty = difficulty
+        self.seed = seed
+        self.inputs = inputs if inputs is not None else []  # one packed Controls per tick
+
+    def record(self, controls):
+        self.inputs.append(pack_controls(controls))
+
+    def controls_at(self, tick):
+        """Input recorded for the step that advances the game past `tick`."""
+        if tick < len(self.inputs):
+            return unpack_controls(self.inputs[tick])
+        return NO_INPUT
+
+    def new_state(self):
+        return GameState(self.difficulty, seed=self.seed)
+
+    def play(self, max_ticks=None):
+        """Re-run the recording headless; returns the final state."""
+        state = self.new_state()
+        limit = len(self.inputs) if max_ticks is None else max_ticks
+        while state.tick < limit and not step(state, self.controls_at(state.tick)):
+            pass
+        return state
+
+    def save(self, path):
+        with open(path, 'w') as file:
+            json.dump({'difficulty': self.difficulty, 'seed': self.seed,
+                       'inputs': base64.b64encode(bytes(self.inputs)).decode('ascii')}, file)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'r') as file:
+            data = json.load(file)
+        return cls(data['difficulty'], data['seed'], list(base64.b64decode(data['inputs'])))
@@ -1,13 +1,40 @@
+import argparse
 import pygame
 import random
 import sys
 
+import plane_engine as engine
+from plane_engine import WIDTH, HEIGHT, DT, Controls, GameState, Replay
+from plane_profiler import FrameProfiler
+
 # Initialize Pygame
 pygame.init()
-WIDTH, HEIGHT = 800, 600
 screen = pygame.display.set_mode((WIDTH, HEIGHT))
 pygame.display.set_caption("Plane Obstacle Game")
 
+parser = argparse.ArgumentParser(description="Plane Obstacle Game")
+parser.add_argument('--dirty', action='store_true', help="redraw and update only the screen regions that changed")
+parser.add_argument('--seed', type=int, default=None, help="fixed spawn seed, for identical runs")
+parser.add_argument('--record', metavar='FILE', help="save each run's seed and inputs as a replay")
+parser.add_argument('--replay', metavar='FILE', help="play back a recorded run instead of reading the keyboard")
+parser.add_argument('--profile', action='store_true', help="start with the frame-time overlay on (F3 toggles it)")
+parser.add_argument('--benchmark', type=int, metavar='N', help="run the benchmark scene with N obstacles and exit")
+parser.add_argument('--bench-frames', type=int, default=1200, help="length of the benchmark scene in frames")
+parser.add_argument('--gesture', action='store_true', help="steer with your hand on the webcam; pinch for slow mode")
+parser.add_argument('--camera', type=int, default=0, help="webcam used by --gesture")
+args = parser.parse_args()
+DIRTY_RECTS = args.dirty
+playback = Replay.load(args.replay) if args.replay else None
+
+# Hand tracking runs on its own thread; the loop only picks up its latest sample
+gesture = None
+if args.gesture:
+    from plane_gesture import GestureInput, LatencyMeter, steer
+    gesture = GestureInput(args.camera)
+    gesture.start()
+    gesture_latency = LatencyMeter()
+    gesture_sample = None  # sample the current frame's controls came from
+
 # Colors
 WHITE = (255, 255, 255)
 SKY_TOP = (135, 206, 235)
@@ -18,49 +45,143 @@ BLACK = (0, 0, 0)
 
 clock = pygame.time.Clock()
 font = pygame.font.SysFont(None, 36)
+small_font = pygame.font.SysFont(None, 20)
+profiler = FrameProfiler(enabled=args.profile)
 
-# Plane setup
-plane_width, plane_height = 70, 20
-plane_x, plane_y = WIDTH * 0.1, HEIGHT // 2
-plane_speed = 5
-
-# Game state
-obstacles = []
-score = 0
-game_speed = 3
-slow_mode = False
-slow_timer = 0
-menu = True
+# Static sky, drawn once and blitted back over whatever moved
+background = pygame.Surface((WIDTH, HEIGHT)).convert()
+background.fill(SKY_BOTTOM)
+pygame.draw.rect(background, SKY_TOP, (0, 0, WIDTH, HEIGHT // 2))
 
-# Difficulty settings
-difficulty_levels = {
-    'easy': (2, 2500, ['spike']),
-    'normal': (3, 2000, ['spike', 'cloud']),
-    'hard': (4, 1500, ['spike', 'cloud', 'bird']),
-    'extreme': (6, 1000, ['spike', 'cloud', 'bird'])
-}
+# Game state (the simulation itself lives in plane_engine)
+state = None
+recording = None
+menu = True
+menu_redraw = True
 difficulty = 'normal'
-last_obstacle_time = pygame.time.get_ticks()
+accumulator = 0.0
+game_over_until = None  # pygame ticks when the game-over banner ends
+GAME_OVER_MS = 1000
+MAX_FRAME_TIME = 0.25   # cap catch-up after a hitch instead of spiralling
 
-# Obstacle types
+# Dirty-rect bookkeeping
+previous_rects = []  # regions drawn last frame, erased at the start of the next
+full_redraw = True
+
+# Obstacle types (each returns the screen area it touched)
 def draw_spike(x, y):
-    pygame.draw.polygon(screen, RED, [(x+10, y), (x, y+40), (x+20, y+40)])
+    return pygame.draw.polygon(screen, RED, [(x+10, y), (x, y+40), (x+20, y+40)])
 
 def draw_cloud(x, y):
-    pygame.draw.ellipse(screen, GRAY, (x, y, 60, 30))
-    pygame.draw.ellipse(screen, GRAY, (x+15, y-5, 60, 30))
-    pygame.draw.ellipse(screen, GRAY, (x+30, y, 60, 30))
+    rect = pygame.draw.ellipse(screen, GRAY, (x, y, 60, 30))
+    rect = rect.union(pygame.draw.ellipse(screen, GRAY, (x+15, y-5, 60, 30)))
+    return rect.union(pygame.draw.ellipse(screen, GRAY, (x+30, y, 60, 30)))
 
 def draw_bird(x, y):
-    pygame.draw.arc(screen, BLACK, (x, y, 20, 10), 0, 3.14, 2)
-    pygame.draw.arc(screen, BLACK, (x+20, y, 20, 10), 0, 3.14, 2)
+    rect = pygame.draw.arc(screen, BLACK, (x, y, 20, 10), 0, 3.14, 2)
+    return rect.union(pygame.draw.arc(screen, BLACK, (x+20, y, 20, 10), 0, 3.14, 2))
 
 def draw_lightning(x, y):
-    pygame.draw.polygon(screen, (255, 255, 0), [(x, y), (x+10, y+20), (x-5, y+20), (x+5, y+40)])
+    return pygame.draw.polygon(screen, (255, 255, 0), [(x, y), (x+10, y+20), (x-5, y+20), (x+5, y+40)])
 
 def draw_missile(x, y):
-    pygame.draw.rect(screen, (50, 50, 50), (x, y, 40, 10))  # body
-    pygame.draw.polygon(screen, RED, [(x+40, y), (x+50, y+5), (x+40, y+10)])  # tip
+    rect = pygame.draw.rect(screen, (50, 50, 50), (x, y, 40, 10))  # body
+    return rect.union(pygame.draw.polygon(screen, RED, [(x+40, y), (x+50, y+5), (x+40, y+10)]))  # tip
+
+OBSTACLE_DRAW = {
+    'spike': draw_spike,
+    'cloud': draw_cloud,
+    'bird': draw_bird,
+    'lightning': draw_lightning,
+    'missile': draw_missile,
+}
+
+def lerp(a, b, t):
+    return a + (b - a) * t
+
+def draw_game(alpha):
+    """Draw the current state, interpolated alpha of the way from the previous tick."""
+    drawn_rects = []
+
+    # Draw plane
+    plane_x = lerp(state.prev_plane_x, state.plane_x, alpha)
+    plane_y = lerp(state.prev_plane_y, state.plane_y, alpha)
+    plane_rect = pygame.draw.rect(screen, WHITE, (plane_x, plane_y, engine.PLANE_WIDTH, engine.PLANE_HEIGHT))
+    plane_rect.union_ip(pygame.draw.rect(screen, WHITE, (plane_x+20, plane_y-10, 50, 12)))  # wing
+    plane_rect.union_ip(pygame.draw.rect(screen, WHITE, (plane_x-10, plane_y-10, 20, 10)))  # tail
+    drawn_rects.append(plane_rect)
+
+    # Obstacles
+    for obs in state.obstacles:
+        x = lerp(obs['prev_x'], obs['x'], alpha)
+        drawn_rects.append(OBSTACLE_DRAW[obs['type']](x, obs['y']))
+
+    # Score
+    score_text = font.render(f"Score: {int(state.score)}", True, BLACK)
+    drawn_rects.append(screen.blit(score_text, (WIDTH - 150, 20)))
+
+    if state.slow_mode:
+        slow_text = font.render("SLOW MODE", True, RED)
+        drawn_rects.append(screen.blit(slow_text, (20, 20)))
+
+    if state.game_over:
+        over_text = font.render("Game Over", True, RED)
+        drawn_rects.append(screen.blit(over_text, over_text.get_rect(center=(WIDTH // 2, HEIGHT // 2))))
+
+    return drawn_rects
+
+def draw_frame(alpha):
+    """Draw the game plus the profiler overlay, if on; returns the touched rects."""
+    drawn_rects = draw_game(alpha)
+    if profiler.enabled:
+        drawn_rects.append(profiler.draw(screen, small_font, (10, HEIGHT - 134)))
+        if gesture:
+            drawn_rects.append(draw_gesture_hud((10, HEIGHT - 154)))
+    return drawn_rects
+
+def draw_gesture_hud(pos):
+    """One line on hand input: capture-to-screen latency, or why there is none."""
+    summary = gesture_latency.summary()
+    if gesture.error:
+        label = f"hand input: {gesture.error}"
+    elif not gesture.latest().hand:
+        label = "hand input: no hand"
+    elif summary:
+        label = "hand input latency %.0f ms  avg %.0f  max %.0f" % summary
+    else:
+        label = "hand input: waiting"
+    text = small_font.render(label, True, BLACK)
+    return screen.blit(text, pos)
+
+def read_controls():
+    global gesture_sample
+    keys = pygame.key.get_pressed()
+    controls = Controls(up=keys[pygame.K_UP], down=keys[pygame.K_DOWN],
+                        left=keys[pygame.K_LEFT], right=keys[pygame.K_RIGHT],
+                        slow=keys[pygame.K_SPACE])
+    if gesture:
+        gesture_sample = gesture.latest()  # never waits on the camera
+        hand = steer(gesture_sample, state.plane_x, state.plane_y)
+        controls = Controls(*(key or moved for key, moved in zip(controls, hand)))
+    return controls
+
+
+# Screen refresh
+def clear_screen():
+    if DIRTY_RECTS and not full_redraw:
+        for rect in previous_rects:
+            screen.blit(background, rect, rect)
+    else:
+        screen.blit(background, (0, 0))
+
+def present(drawn_rects):
+    global previous_rects, full_redraw
+    if DIRTY_RECTS and not full_redraw:
+        pygame.display.update(previous_rects + drawn_rects)
+    else:
+        pygame.display.update()
+        full_redraw = False
+    previous_rects = drawn_rects
 
 
 # Button class
@@ -77,6 +198,7 @@ class Button:
         text_surf = font.render(self.text, True, BLACK)
         text_rect = text_surf.get_rect(center=self.rect.center)
         screen.blit(text_surf, text_rect)
+        return self.rect
 
     def is_clicked(self, pos):
         return self.rect.collidepoint(pos)
@@ -92,124 +214,161 @@ diff_buttons = [
     Button(WIDTH // 2 + 90, 300, 90, 40, "Extreme", action='extreme'),
 ]
 
+def run_benchmark(count, frames, seed=0):
+    """Scripted scene: `count` obstacles and a weaving plane for `frames` uncapped frames."""
+    global state, profiler
+    rng = random.Random(seed)
+    types = list(engine.OBSTACLE_SIZES)
+    state = GameState('extreme', seed=seed)
+    state.next_spawn_tick = float('inf')  # the script places obstacles instead of the schedule
+
+    def add_obstacle(x):
+        y = rng.randint(*engine.SPAWN_Y_RANGE)
+        state.obstacles.append({'type': rng.choice(types), 'x': x, 'y': y, 'prev_x': x})
+
+    for i in range(count):
+        add_obstacle(WIDTH - (WIDTH - engine.DESPAWN_X) * i / count)
+
+    profiler = FrameProfiler(size=frames, enabled=True)
+    for frame in range(frames):
+        clock.tick()
+        profiler.begin_frame()
+        pygame.event.pump()
+        profiler.mark('events')
+        engine.update(state, Controls(up=frame % 120 < 60, down=frame % 120 >= 60,
+                                      left=False, right=False, slow=False))
+        while len(state.obstacles) < count:
+            add_obstacle(WIDTH)
+        profiler.mark('update')
+        engine.check_collision(state)
+        state.game_over = False  # keep flying; only the cost of the check matters
+        profiler.mark('collision')
+        clear_screen()
+        drawn_rects = draw_game(1.0)
+        profiler.mark('draw')
+        present(drawn_rects)
+        profiler.mark('flip')
+        profiler.end_frame()
+
+    mode = 'dirty rects' if DIRTY_RECTS else 'full redraw'
+    print(f"Benchmark: {count} obstacles, {frames} frames, seed {seed}, {mode}")
+    profiler.report()
+    frame_ms = profiler.summary()['frame'][0]
+    print(f"Average {1000 / frame_ms:.0f} FPS uncapped")
+
+if args.benchmark is not None:
+    run_benchmark(args.benchmark, args.bench_frames, args.seed or 0)
+    pygame.quit()
+    sys.exit()
+
 # Main loop
 running = True
 while running:
-    screen.fill(SKY_BOTTOM)
-    pygame.draw.rect(screen, SKY_TOP, (0, 0, WIDTH, HEIGHT // 2))
-
     if menu:
-        # Draw menu
-        title = font.render("Plane Obstacle Game", True, BLACK)
-        screen.blit(title, (WIDTH // 2 - title.get_width() // 2, 100))
-
-        start_button.draw()
-        for btn in diff_buttons:
-            btn.draw()
-
-        selected_text = font.render(f"Selected: {difficulty.capitalize()}", True, BLACK)
-        screen.blit(selected_text, (WIDTH // 2 - 100, 400))
-
-        for event in pygame.event.get():
+        if menu_redraw:
+            # Draw menu
+            full_redraw = True
+            clear_screen()
+            title = font.render("Plane Obstacle Game", True, BLACK)
+            screen.blit(title, (WIDTH // 2 - title.get_width() // 2, 100))
+
+            start_button.draw()
+            for btn in diff_buttons:
+                btn.draw()
+
+            selected_text = font.render(f"Selected: {difficulty.capitalize()}", True, BLACK)
+            screen.blit(selected_text, (WIDTH // 2 - 100, 400))
+            present([])
+            # Nothing in the menu moves, so only redraw after it changes
+            menu_redraw = not DIRTY_RECTS
+
+        if DIRTY_RECTS:
+            # Sleep until something happens instead of polling at 60 FPS
+            events = [pygame.event.wait()] + pygame.event.get()
+        else:
+            events = pygame.event.get()
+
+        for event in events:
             if event.type == pygame.QUIT:
                 running = False
 
+            elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                menu_redraw = True
+
             elif event.type == pygame.MOUSEBUTTONDOWN:
                 pos = pygame.mouse.get_pos()
                 if start_button.is_clicked(pos):
                     menu = False
-                    last_obstacle_time = pygame.time.get_ticks()
-                    plane_x, plane_y = WIDTH * 0.1, HEIGHT // 2
-                    score = 0
-                    game_speed = difficulty_levels[difficulty][0]
-                    obstacles.clear()
-                    slow_mode = False
+                    if playback:
+                        difficulty = playback.difficulty
+                        state = playback.new_state()
+                    else:
+                        state = GameState(difficulty, seed=args.seed)
+                    if args.record:
+                        recording = Replay(state.difficulty, state.seed)
+                    accumulator = 0.0
+                    game_over_until = None
+                    full_redraw = True
+                    clock.tick()  # don't count time spent in the menu
                 for btn in diff_buttons:
                     if btn.is_clicked(pos):
                         difficulty = btn.action
+                        menu_redraw = True
 
-        pygame.display.update()
-        clock.tick(60)
+        if not DIRTY_RECTS:
+            clock.tick(60)
         continue
 
     # --- Game is running ---
 
+    frame_time = min(clock.tick(60) / 1000.0, MAX_FRAME_TIME)
+    profiler.begin_frame()
+
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
             running = False
+        elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+            profiler.toggle()
+    profiler.mark('events')
+
+    if game_over_until is None:
+        # Step the simulation at a fixed rate, however long the frame took
+        controls = read_controls()
+        accumulator += frame_time
+        while accumulator >= DT:
+            accumulator -= DT
+            if playback:
+                controls = playback.controls_at(state.tick)
+            if recording:
+                recording.record(controls)
+            engine.update(state, controls)
+            profiler.mark('update')
+            crashed = engine.check_collision(state)
+            profiler.mark('collision')
+            if crashed:
+                print("Game Over")
+                if recording:
+                    recording.save(args.record)
+                    print(f"Replay saved to {args.record} (seed {state.seed})")
+                game_over_until = pygame.time.get_ticks() + GAME_OVER_MS
+                accumulator = 0.0
+                break
+    elif pygame.time.get_ticks() >= game_over_until:
+        menu = True  # Return to menu
+        menu_redraw = True
+        continue
 
-    keys = pygame.key.get_pressed()
-    if keys[pygame.K_UP]:
-        plane_y = max(0, plane_y - plane_speed)
-    if keys[pygame.K_DOWN]:
-        plane_y = min(HEIGHT - plane_height, plane_y + plane_speed)
-    if keys[pygame.K_LEFT]:
-        plane_x = max(0, plane_x - plane_speed)
-    if keys[pygame.K_RIGHT]:
-        plane_x = min(WIDTH - plane_width, plane_x + plane_speed)
-    if keys[pygame.K_SPACE] and not slow_mode:
-        slow_mode = True
-        slow_timer = pygame.time.get_ticks()
-        game_speed /= 2
-
-    if slow_mode and pygame.time.get_ticks() - slow_timer > 5000:
-        game_speed *= 2
-        slow_mode = False
-
-    # Draw plane
-    pygame.draw.rect(screen, WHITE, (plane_x, plane_y, plane_width, plane_height))
-    pygame.draw.rect(screen, WHITE, (plane_x+20, plane_y-10, 50, 12))  # wing
-    pygame.draw.rect(screen, WHITE, (plane_x-10, plane_y-10, 20, 10))  # tail
-
-    # Score
-    score += 0.1
-    score_text = font.render(f"Score: {int(score)}", True, BLACK)
-    screen.blit(score_text, (WIDTH - 150, 20))
-
-    if slow_mode:
-        slow_text = font.render("SLOW MODE", True, RED)
-        screen.blit(slow_text, (20, 20))
-
-    # Spawn obstacles
-    now = pygame.time.get_ticks()
-    if now - last_obstacle_time > difficulty_levels[difficulty][1]:
-        obstacle_type = random.choice(difficulty_levels[difficulty][2])
-        y = random.randint(50, HEIGHT - 60)
-        obstacles.append({'type': obstacle_type, 'x': WIDTH, 'y': y})
-        last_obstacle_time = now
-
-    # Move and draw obstacles
-    plane_rect = pygame.Rect(plane_x, plane_y, plane_width, plane_height)
-    for obs in list(obstacles):
-        obs['x'] -= game_speed
-        if obs['type'] == 'spike':
-            draw_spike(obs['x'], obs['y'])
-            obs_rect = pygame.Rect(obs['x'], obs['y'], 20, 40)
-        elif obs['type'] == 'cloud':
-            draw_cloud(obs['x'], obs['y'])
-            obs_rect = pygame.Rect(obs['x'], obs['y'], 90, 40)
-        elif obs['type'] == 'bird':
-            draw_bird(obs['x'], obs['y'])
-            obs_rect = pygame.Rect(obs['x'], obs['y'], 40, 20)
-        elif obs['type'] == 'lightning':
-            draw_lightning(obs['x'], obs['y'])
-            obs_rect = pygame.Rect(obs['x'], obs['y'], 20, 40)
-        elif obs['type'] == 'missile':
-            draw_missile(obs['x'], obs['y'])
-            obs_rect = pygame.Rect(obs['x'], obs['y'], 50, 10)
-    
-
-        if plane_rect.colliderect(obs_rect):
-            print("Game Over")
-            menu = True  # Return to menu
-            pygame.time.wait(1000)
-
-        if obs['x'] < -100:
-            obstacles.remove(obs)
-
-
-    pygame.display.update()
-    clock.tick(60)
-
+    clear_screen()
+    alpha = 1.0 if state.game_over else accumulator / DT
+    drawn_rects = draw_frame(alpha)
+    profiler.mark('draw')
+    present(drawn_rects)
+    profiler.mark('flip')
+    profiler.end_frame()
+    if gesture and gesture_sample:
+        gesture_latency.presented(gesture_sample)
+
+if gesture:
+    gesture.stop()
 pygame.quit()
 sys.exit()
@@ -0,0 +1,155 @@
+"""
+plane_gesture.py
+Hand-gesture input for plane_game.py.
+
+GestureInput runs HandDetector on a background thread (through the vision
+broker when it is running) and publishes one GestureSample per camera frame:
+the smoothed palm position and whether thumb and index are pinched. The
+thread only ever replaces the sample in a single slot, so the game reads the
+newest one without waiting on the camera or taking a lock.
+
+steer() turns a sample into the same Controls the keyboard produces: the
+plane flies toward the point on screen matching the palm, and a pinch
+starts slow mode.
+"""
+
+import math
+import threading
+import time
+from collections import namedtuple
+
+from HandTrackingModule import HandDetector
+from plane_engine import HEIGHT, PLANE_HEIGHT, PLANE_SPEED, PLANE_WIDTH, WIDTH, Controls
+from vision_broker import open_capture
+
+# x, y: palm position in 0..1 of the camera view (mirrored); hand: whether one was seen;
+# captured: time.time() when the frame was taken; seq counts published samples
+GestureSample = namedtuple('GestureSample', ['x', 'y', 'pinch', 'hand', 'captured', 'seq'])
+NO_HAND = GestureSample(0.5, 0.5, False, False, 0.0, 0)
+
+PALM = 9                   # middle finger knuckle: steady while pinching
+WRIST, THUMB_TIP, INDEX_TIP = 0, 4, 8
+PINCH_ON, PINCH_OFF = 0.25, 0.35  # thumb-index gap / palm length; hysteresis stops flicker
+SMOOTHING = 0.5            # weight of the new position (1 = no smoothing)
+ACTIVE_AREA = 0.15         # margin of the camera view that maps past the screen edge
+
+
+class LatestSlot:
+    """Single-slot buffer: put() replaces the value, get() returns the newest.
+
+    The value is an immutable tuple and assigning it is atomic, so neither
+    side ever waits on the other.
+    """
+
+    def __init__(self, value):
+        self._value = value
+
+    def put(self, value):
+        self._value = value
+
+    def get(self):
+        return self._value
+
+
+class GestureInput:
+    def __init__(self, camera=0, smoothing=SMOOTHING):
+        self.camera = camera
+        self.smoothing = smoothing
+        self.slot = LatestSlot(NO_HAND)
+        self.error = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="gesture-input", daemon=True)
+        self._thread.start()
+
+    def latest(self):
+        return self.slot.get()
+
+    def _run(self):
+        try:
+            cap = open_capture(['hands'], self.camera, mirror=True)
+        except Exception as e:  # surfaced to the game through .error
+            self.error = e
+            return
+        detector = HandDetector(maxHands=1, detectionCon=0.7, trackCon=0.6)
+        x = y = None
+        pinch = False
+        seq = 0
+        try:
+            while not self._stop.is_set():
+                ok, img = cap.read()
+                if not ok:
+                    self.error = RuntimeError("camera stopped")
+                    break
+                detector.find_hands(img, draw=False, results=cap.results.get('hands'))
+                hands = detector.results.multi_hand_landmarks
+                seq += 1
+                if not hands:
+                    x = y = None
+                    pinch = False
+                    self.slot.put(GestureSample(0.5, 0.5, False, False, cap.timestamp, seq))
+                    continue
+
+                lm = hands[0].landmark
+                if x is None:
+                    x, y = lm[PALM].x, lm[PALM].y  # hand just appeared: no stale smoothing
+                else:
+                    x += (lm[PALM].x - x) * self.smoothing
+                    y += (lm[PALM].y - y) * self.smoothing
+                palm = math.hypot(lm[PALM].x - lm[WRIST].x, lm[PALM].y - lm[WRIST].y) or 1e-6
+                gap = math.hypot(lm[THUMB_TIP].x - lm[INDEX_TIP].x, lm[THUMB_TIP].y - lm[INDEX_TIP].y) / palm
+                pinch = gap < (PINCH_OFF if pinch else PINCH_ON)
+                self.slot.put(GestureSample(x, y, pinch, True, cap.timestamp, seq))
+        except Exception as e:
+            self.error = e
+        finally:
+            cap.release()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=1.0)
+
+
+def target_position(sample):
+    """Screen position (plane x, y) the palm points at."""
+    span = 1 - 2 * ACTIVE_AREA
+    fx = min(max((sample.x - ACTIVE_AREA) / span, 0.0), 1.0)
+    fy = min(max((sample.y - ACTIVE_AREA) / span, 0.0), 1.0)
+    return fx * (WIDTH - PLANE_WIDTH), fy * (HEIGHT - PLANE_HEIGHT)
+
+
+def steer(sample, plane_x, plane_y):
+    """Controls moving the plane toward the palm's screen position; pinch means slow mode."""
+    if not sample.hand:
+        return Controls(False, False, False, False, False)
+    tx, ty = target_position(sample)
+    return Controls(up=ty < plane_y - PLANE_SPEED, down=ty > plane_y + PLANE_SPEED,
+                    left=tx < plane_x - PLANE_SPEED, right=tx > plane_x + PLANE_SPEED,
+                    slow=sample.pinch)
+
+
+class LatencyMeter:
+    """Camera-capture-to-screen latency of the gesture samples that reached the display."""
+
+    def __init__(self, size=60):
+        self.samples = []
+        self.size = size
+        self._seq = 0
+
+    def presented(self, sample, now=None):
+        """Call right after the frame that used `sample` was flipped to the screen."""
+        if not sample.hand or sample.seq == self._seq:
+            return  # each camera frame counts once, at its first display
+        self._seq = sample.seq
+        self.samples.append((now or time.time()) - sample.captured)
+        del self.samples[:-self.size]
+
+    def summary(self):
+        """(last, mean, max) in ms over the recent samples, or None."""
+        if not self.samples:
+            return None
+        ms = [s * 1000 for s in self.samples]
+        return ms[-1], sum(ms) / len(ms), max(ms)
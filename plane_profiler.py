@@ -0,0 +1,91 @@
+"""
+plane_profiler.py
+Per-phase frame timing for plane_game.py.
+
+A frame is split into phases by calling mark(phase) right after each one;
+durations are accumulated for the frame and stored in fixed-size ring
+buffers by end_frame(). While disabled every call returns immediately.
+"""
+
+import time
+
+import numpy as np
+import pygame
+
+PHASES = ['events', 'update', 'collision', 'draw', 'flip']
+PHASE_COLORS = [(255, 255, 255), (0, 200, 0), (255, 140, 0), (0, 90, 255), (200, 0, 200)]
+TARGET_MS = 1000 / 60
+
+
+class FrameProfiler:
+    def __init__(self, size=240, enabled=False):
+        self.enabled = enabled
+        self.size = size
+        self.samples = np.zeros((len(PHASES), size))  # seconds, ring buffer per phase
+        self.count = 0                                 # frames recorded so far
+        self._index = {name: i for i, name in enumerate(PHASES)}
+        self._current = [0.0] * len(PHASES)
+        self._last = 0.0
+
+    def toggle(self):
+        self.enabled = not self.enabled
+
+    def begin_frame(self):
+        if self.enabled:
+            self._current = [0.0] * len(PHASES)
+            self._last = time.perf_counter()
+
+    def mark(self, phase):
+        """Charge the time since the previous mark to `phase`."""
+        if self.enabled:
+            now = time.perf_counter()
+            self._current[self._index[phase]] += now - self._last
+            self._last = now
+
+    def end_frame(self):
+        if self.enabled:
+            self.samples[:, self.count % self.size] = self._current
+            self.count += 1
+
+    def recent(self):
+        """Recorded frames in ms, oldest first, shaped (phases, frames)."""
+        if self.count < self.size:
+            return self.samples[:, :self.count] * 1000
+        return np.roll(self.samples, -(self.count % self.size), axis=1) * 1000
+
+    def summary(self):
+        """{phase: (mean, p50, p95, p99, max)} in ms, including 'frame' for the total."""
+        ms = self.recent()
+        if ms.shape[1] == 0:
+            return {}
+        rows = dict(zip(PHASES, ms))
+        rows['frame'] = ms.sum(axis=0)
+        return {name: (values.mean(), *np.percentile(values, [50, 95, 99]), values.max())
+                for name, values in rows.items()}
+
+    def report(self):
+        print(f"{'phase':<10} {'mean':>7} {'p50':>7} {'p95':>7} {'p99':>7} {'max':>7}  (ms)")
+        for name, stats in self.summary().items():
+            print(f"{name:<10} " + " ".join(f"{value:>7.3f}" for value in stats))
+
+    def draw(self, surface, font, pos, width=240, height=100):
+        """Stacked frame-time graph of the recent frames; returns the rect it covered."""
+        x0, y0 = pos
+        panel = pygame.Rect(x0, y0, width, height + 24)
+        pygame.draw.rect(surface, (0, 0, 0), panel)
+
+        ms = self.recent()[:, -width:]
+        if ms.shape[1] > 1:
+            scale = height / (2 * TARGET_MS)  # graph tops out at two frames' budget
+            cumulative = np.minimum(np.cumsum(ms, axis=0) * scale, height)
+            xs = x0 + np.arange(ms.shape[1])
+            for phase in reversed(range(len(PHASES))):
+                points = np.column_stack([xs, y0 + height - cumulative[phase]])
+                pygame.draw.lines(surface, PHASE_COLORS[phase], False, points.tolist())
+            target_y = y0 + height - TARGET_MS * scale
+            pygame.draw.line(surface, (255, 0, 0), (x0, target_y), (x0 + width, target_y))
+
+            total = ms.sum(axis=0)
+            label = f"{total[-1]:.1f} ms  avg {total.mean():.1f}  p95 {np.percentile(total, 95):.1f}"
+            surface.blit(font.render(label, True, (255, 255, 255)), (x0 + 4, y0 + height + 4))
+        return panel
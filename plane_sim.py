@@ -0,0 +1,234 @@
+"""
+plane_sim.py
+Headless batch simulator / bot-evaluation harness for plane_game.py.
+
+Steps thousands of episodes of the plane_engine rules in lockstep with NumPy
+(one array row per episode), spreads the batches over a process pool and
+reports the survival-time distribution for each difficulty. No window or
+pygame surface is ever created.
+
+Usage:
+    python plane_sim.py --episodes 5000 --bot dodge
+    python plane_sim.py --difficulty hard extreme --workers 4 --max-seconds 300
+"""
+
+import argparse
+import math
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import plane_engine as engine
+import plane_spawn
+from plane_engine import (WIDTH, HEIGHT, DT, TICK_RATE, PLANE_WIDTH, PLANE_HEIGHT, PLANE_SPEED,
+                          SLOW_MODE_TICKS, DESPAWN_X, OBSTACLE_SIZES, SPAWN_Y_RANGE,
+                          difficulty_levels, spawn_curves)
+
+TYPE_NAMES = list(OBSTACLE_SIZES)
+TYPE_W = np.array([OBSTACLE_SIZES[t][0] for t in TYPE_NAMES], dtype=np.float64)
+TYPE_H = np.array([OBSTACLE_SIZES[t][1] for t in TYPE_NAMES], dtype=np.float64)
+
+
+class BatchState:
+    """State of n episodes of one difficulty, stored column-wise."""
+
+    def __init__(self, difficulty, n, seed, max_ticks):
+        speed, spawn_ms, weights = difficulty_levels[difficulty]
+        curve = spawn_curves[difficulty]
+        self.n = n
+        self.tick = 0
+
+        # Whole-run spawn schedules for every episode, generated in one go
+        ticks, types, ys, names = plane_spawn.build_batch(spawn_ms, weights, curve, n, seed,
+                                                          seconds=max_ticks * DT, tick_rate=TICK_RATE,
+                                                          y_range=SPAWN_Y_RANGE)
+        type_ids = np.array([TYPE_NAMES.index(t) for t in names])[types]
+        self.sched_ticks = ticks
+        self.sched_w = TYPE_W[type_ids]
+        self.sched_h = TYPE_H[type_ids]
+        self.sched_y = ys.astype(np.float64)
+        self.cursor = np.zeros(n, dtype=np.int64)
+        self.next_spawn_tick = ticks[:, 0].copy()
+
+        # Enough slots for every obstacle that can be on screen at half speed
+        lifetime = (WIDTH - DESPAWN_X) / (speed / 2)
+        shortest_gap = curve['min_ms'] * (1 - curve['jitter']) * TICK_RATE / 1000
+        capacity = (int(math.ceil(lifetime / shortest_gap)) + 1) * (1 + curve['wave_size']) + 1
+
+        self.plane_x = np.full(n, WIDTH * 0.1)
+        self.plane_y = np.full(n, float(HEIGHT // 2))
+        self.game_speed = np.full(n, float(speed))
+        self.slow_mode = np.zeros(n, dtype=bool)
+        self.slow_until = np.zeros(n, dtype=np.int64)
+
+        self.obs_x = np.zeros((n, capacity))
+        self.obs_y = np.zeros((n, capacity))
+        self.obs_w = np.zeros((n, capacity))
+        self.obs_h = np.zeros((n, capacity))
+        self.obs_active = np.zeros((n, capacity), dtype=bool)
+
+        self.alive = np.ones(n, dtype=bool)
+        self.death_tick = np.zeros(n, dtype=np.int64)
+
+
+# ---------- Vectorized bots: BatchState -> (up, down, left, right, slow) ----------
+def idle_bot(s):
+    none = np.zeros(s.n, dtype=bool)
+    return none, none, none, none, none
+
+
+def dodge_bot(s, lookahead=160, margin=10):
+    """Climb or dive away from the nearest obstacle heading into the plane's lane."""
+    px = s.plane_x[:, None]
+    py = s.plane_y[:, None]
+    ahead = s.obs_active & (s.obs_x + s.obs_w > px) & (s.obs_x < px + PLANE_WIDTH + lookahead)
+    in_lane = (s.obs_y < py + PLANE_HEIGHT + margin) & (s.obs_y + s.obs_h > py - margin)
+    threat = ahead & in_lane
+
+    # Nearest threat per episode (inf x where there is none)
+    threat_x = np.where(threat, s.obs_x, np.inf)
+    nearest = threat_x.argmin(axis=1)
+    rows = np.arange(s.n)
+    has_threat = threat.any(axis=1)
+    threat_mid = s.obs_y[rows, nearest] + s.obs_h[rows, nearest] / 2
+    plane_mid = s.plane_y + PLANE_HEIGHT / 2
+
+    # Against the screen edge, dodge the other way
+    top_blocked = s.plane_y <= PLANE_SPEED
+    bottom_blocked = s.plane_y >= HEIGHT - PLANE_HEIGHT - PLANE_SPEED
+    go_up = has_threat & (((threat_mid >= plane_mid) & ~top_blocked) | bottom_blocked)
+    go_down = has_threat & ~go_up
+    none = np.zeros(s.n, dtype=bool)
+    return go_up, go_down, none, none, has_threat
+
+
+BOTS = {'idle': idle_bot, 'dodge': dodge_bot}
+
+
+def batch_step(s, controls):
+    """Vectorized equivalent of plane_engine.step for every live episode."""
+    up, down, left, right, slow = (c & s.alive for c in controls)
+    s.tick += 1
+    tick = s.tick
+
+    s.plane_y = np.where(up, np.maximum(0, s.plane_y - PLANE_SPEED), s.plane_y)
+    s.plane_y = np.where(down, np.minimum(HEIGHT - PLANE_HEIGHT, s.plane_y + PLANE_SPEED), s.plane_y)
+    s.plane_x = np.where(left, np.maximum(0, s.plane_x - PLANE_SPEED), s.plane_x)
+    s.plane_x = np.where(right, np.minimum(WIDTH - PLANE_WIDTH, s.plane_x + PLANE_SPEED), s.plane_x)
+
+    start_slow = slow & ~s.slow_mode
+    s.slow_mode |= start_slow
+    s.slow_until[start_slow] = tick + SLOW_MODE_TICKS
+    s.game_speed[start_slow] /= 2
+    end_slow = s.slow_mode & (tick > s.slow_until)
+    s.game_speed[end_slow] *= 2
+    s.slow_mode &= ~end_slow
+
+    # Spawn scheduled obstacles into the first free slot (repeat for waves)
+    due = s.alive & (s.next_spawn_tick <= tick)
+    while due.any():
+        rows = np.flatnonzero(due)
+        slots = s.obs_active[rows].argmin(axis=1)
+        idx = s.cursor[rows]
+        s.obs_x[rows, slots] = WIDTH
+        s.obs_y[rows, slots] = s.sched_y[rows, idx]
+        s.obs_w[rows, slots] = s.sched_w[rows, idx]
+        s.obs_h[rows, slots] = s.sched_h[rows, idx]
+        s.obs_active[rows, slots] = True
+        s.cursor[rows] = idx + 1
+        s.next_spawn_tick[rows] = s.sched_ticks[rows, idx + 1]
+        due = s.alive & (s.next_spawn_tick <= tick)
+
+    moving = s.obs_active & s.alive[:, None]
+    s.obs_x -= np.where(moving, s.game_speed[:, None], 0.0)
+    s.obs_active &= s.obs_x >= DESPAWN_X
+
+    px = s.plane_x[:, None]
+    py = s.plane_y[:, None]
+    hit = (s.obs_active &
+           (px < s.obs_x + s.obs_w) & (s.obs_x < px + PLANE_WIDTH) &
+           (py < s.obs_y + s.obs_h) & (s.obs_y < py + PLANE_HEIGHT)).any(axis=1)
+    crashed = hit & s.alive
+    s.death_tick[crashed] = tick
+    s.alive &= ~crashed
+
+
+def simulate_batch(difficulty, n, seed, bot='dodge', max_ticks=120 * TICK_RATE):
+    """Run n episodes to the crash (or max_ticks); returns survival seconds per episode."""
+    s = BatchState(difficulty, n, seed, max_ticks)
+    policy = BOTS[bot]
+    while s.alive.any() and s.tick < max_ticks:
+        batch_step(s, policy(s))
+    s.death_tick[s.alive] = s.tick  # survivors are censored at max_ticks
+    return s.death_tick * DT
+
+
+def run_episode(difficulty, seed=None, bot=None, max_ticks=120 * TICK_RATE):
+    """Play one episode on the reference engine with a Python bot(state) -> Controls."""
+    state = engine.GameState(difficulty, seed=seed)
+    while state.tick < max_ticks:
+        controls = bot(state) if bot else engine.NO_INPUT
+        if engine.step(state, controls):
+            break
+    return state.survival_time()
+
+
+def _run_task(task):
+    difficulty, n, seed, bot, max_ticks = task
+    return difficulty, simulate_batch(difficulty, n, seed, bot, max_ticks)
+
+
+def evaluate(difficulties, episodes, bot='dodge', seed=0, batch=1000, workers=None, max_seconds=120):
+    """Simulate episodes per difficulty across a process pool; returns {difficulty: survival array}."""
+    max_ticks = int(max_seconds * TICK_RATE)
+    tasks = []
+    for difficulty in difficulties:
+        remaining = episodes
+        while remaining > 0:
+            size = min(batch, remaining)
+            tasks.append([difficulty, size, None, bot, max_ticks])
+            remaining -= size
+    # Independent, reproducible RNG stream per task
+    for task, child in zip(tasks, np.random.SeedSequence(seed).spawn(len(tasks))):
+        task[2] = child
+
+    results = {d: [] for d in difficulties}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for difficulty, survival in pool.map(_run_task, tasks):
+            results[difficulty].append(survival)
+    return {d: np.concatenate(parts) for d, parts in results.items()}
+
+
+def report(results, max_seconds):
+    print(f"{'difficulty':<10} {'episodes':>8} {'mean':>7} {'std':>7} {'p10':>7} {'p50':>7} {'p90':>7} {'max':>7} {'capped':>7}")
+    for difficulty, survival in results.items():
+        p10, p50, p90 = np.percentile(survival, [10, 50, 90])
+        capped = np.mean(survival >= max_seconds) * 100
+        print(f"{difficulty:<10} {survival.size:>8} {survival.mean():>7.1f} {survival.std():>7.1f} "
+              f"{p10:>7.1f} {p50:>7.1f} {p90:>7.1f} {survival.max():>7.1f} {capped:>6.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless survival-time analysis for plane_game.py")
+    parser.add_argument('--episodes', type=int, default=2000, help="episodes per difficulty")
+    parser.add_argument('--difficulty', nargs='+', default=list(difficulty_levels), choices=list(difficulty_levels))
+    parser.add_argument('--bot', default='dodge', choices=list(BOTS))
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--batch', type=int, default=1000, help="episodes stepped together per task")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--max-seconds', type=float, default=120, help="game seconds before an episode is cut off")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    results = evaluate(args.difficulty, args.episodes, args.bot, args.seed, args.batch, args.workers, args.max_seconds)
+    elapsed = time.perf_counter() - t0
+
+    print(f"Survival time in seconds, bot={args.bot}, seed={args.seed}")
+    report(results, args.max_seconds)
+    total = sum(r.size for r in results.values())
+    print(f"{total} episodes in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+plane_spawn.py
+Precomputed, seeded spawn schedules for plane_engine.
+
+Every obstacle of a run (tick, type, height) is generated ahead of time in
+NumPy batches from a seed, so spawning during play is just comparing the
+current tick with the next scheduled one: no per-frame randomness. The same
+seed always produces the same schedule, which is what makes replays and
+benchmark scenes exact.
+
+A curve describes how a difficulty evolves:
+    ramp        spawn interval multiplier applied per obstacle
+    min_ms      floor for the spawn interval
+    jitter      +/- fraction of random variation on each interval
+    wave_every  every Nth obstacle leads a wave (0 = no waves)
+    wave_size   followers in a wave, wave_gap_ms apart, wave_step px lower/higher
+Keep wave_size * wave_gap_ms below min_ms * (1 - jitter) so waves never
+overlap the next regular spawn.
+"""
+
+import numpy as np
+
+CHUNK_SECONDS = 120       # how far ahead a schedule is generated at a time
+NEVER = np.iinfo(np.int64).max
+
+
+def _generate(rng, n, count, first_index, start_ticks, spawn_ms, weights, curve, tick_rate, y_range):
+    """Generate `count` regular spawns (plus their waves) for n runs at once.
+
+    Returns (ticks, types, ys, last_regular): the first three shaped (n, m)
+    and sorted by tick per row, the last the tick of each row's final
+    regular spawn (where the next batch continues from).
+    """
+    k = np.arange(first_index, first_index + count)
+    interval_ms = np.maximum(curve['min_ms'], spawn_ms * curve['ramp'] ** k)
+    jitter = rng.uniform(1 - curve['jitter'], 1 + curve['jitter'], size=(n, count))
+    gaps = np.maximum(1, np.rint(interval_ms * jitter * tick_rate / 1000)).astype(np.int64)
+    ticks = np.asarray(start_ticks, dtype=np.int64).reshape(-1, 1) + np.cumsum(gaps, axis=1)
+    last_regular = ticks[:, -1].copy()
+
+    p = np.array(list(weights.values()), dtype=np.float64)
+    types = rng.choice(len(p), size=(n, count), p=p / p.sum())
+    y_min, y_max = y_range
+    ys = rng.integers(y_min, y_max, size=(n, count), endpoint=True)
+
+    if curve['wave_every'] and curve['wave_size']:
+        leaders = np.flatnonzero(k % curve['wave_every'] == curve['wave_every'] - 1)
+        if leaders.size:
+            size = curve['wave_size']
+            offsets = np.arange(1, size + 1)
+            gap_ticks = max(1, round(curve['wave_gap_ms'] * tick_rate / 1000))
+            direction = rng.choice([-1, 1], size=(n, leaders.size, 1))
+
+            wave_ticks = ticks[:, leaders, None] + offsets * gap_ticks
+            wave_types = np.repeat(types[:, leaders, None], size, axis=2)
+            wave_ys = np.clip(ys[:, leaders, None] + direction * offsets * curve['wave_step'], y_min, y_max)
+
+            ticks = np.concatenate([ticks, wave_ticks.reshape(n, -1)], axis=1)
+            types = np.concatenate([types, wave_types.reshape(n, -1)], axis=1)
+            ys = np.concatenate([ys, wave_ys.reshape(n, -1)], axis=1)
+            order = np.argsort(ticks, axis=1, kind='stable')
+            ticks = np.take_along_axis(ticks, order, axis=1)
+            types = np.take_along_axis(types, order, axis=1)
+            ys = np.take_along_axis(ys, order, axis=1)
+
+    return ticks, types, ys, last_regular
+
+
+def _count_for(seconds, curve):
+    """Upper bound on regular spawns in `seconds` of play."""
+    shortest_ms = curve['min_ms'] * (1 - curve['jitter'])
+    return int(seconds * 1000 / shortest_ms) + 1
+
+
+class SpawnSchedule:
+    """Schedule for a single run, extended lazily in CHUNK_SECONDS batches."""
+
+    def __init__(self, spawn_ms, weights, curve, seed=None, tick_rate=60, y_range=(50, 540)):
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+        self.spawn_ms = spawn_ms
+        self.weights = weights
+        self.curve = curve
+        self.tick_rate = tick_rate
+        self.y_range = y_range
+        self.type_names = list(weights)
+
+        # Plain lists: cheaper than NumPy scalars for the engine's per-tick reads
+        self.ticks = []
+        self.types = []
+        self.ys = []
+        self._regular = 0      # regular spawns generated so far
+        self._last_tick = 0    # tick of the last regular spawn
+        self.extend()
+
+    def extend(self, seconds=CHUNK_SECONDS):
+        count = _count_for(seconds, self.curve)
+        ticks, types, ys, last_regular = _generate(self.rng, 1, count, self._regular, [self._last_tick],
+                                                   self.spawn_ms, self.weights, self.curve,
+                                                   self.tick_rate, self.y_range)
+        self._last_tick = int(last_regular[0])
+        self._regular += count
+
+        self.ticks.extend(ticks[0].tolist())
+        self.types.extend(self.type_names[t] for t in types[0].tolist())
+        self.ys.extend(ys[0].tolist())
+
+    def tick_at(self, index):
+        """Tick of the index-th spawn, generating further ahead when needed."""
+        while index >= len(self.ticks):
+            self.extend()
+        return self.ticks[index]
+
+
+def build_batch(spawn_ms, weights, curve, n, seed=None, seconds=CHUNK_SECONDS, tick_rate=60, y_range=(50, 540)):
+    """Schedules for n independent runs as (n, m + 1) arrays.
+
+    Returns (ticks, types, ys, type_names); the last column of ticks is NEVER
+    so a cursor can always look one entry ahead.
+    """
+    rng = np.random.default_rng(seed)
+    count = _count_for(seconds, curve)
+    ticks, types, ys, _ = _generate(rng, n, count, 0, np.zeros(n), spawn_ms, weights, curve, tick_rate, y_range)
+    ticks = np.concatenate([ticks, np.full((n, 1), NEVER)], axis=1)
+    types = np.concatenate([types, np.zeros((n, 1), dtype=types.dtype)], axis=1)
+    ys = np.concatenate([ys, np.zeros((n, 1), dtype=ys.dtype)], axis=1)
+    return ticks, types, ys, list(weights)
@@ -1,49 +1,10 @@
-import random
+import queue
+import threading
 import tkinter as tk
 from tkinter import messagebox
 
-# ------------------ Card and Deck Classes ------------------ #
-class Card:
-    suits = ['Hearts', 'Diamonds', 'Clubs', 'Spades']
-    ranks = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'Jack', 'Queen', 'King', 'Ace']
-    values = {rank: i + 2 for i, rank in enumerate(ranks)}
-
-    def __init__(self, rank, suit):
-        self.rank = rank
-        self.suit = suit
-        self.value = Card.values[rank]
-
-    def __str__(self):
-        return f"{self.rank} of {self.suit}"
-
-class Deck:
-    def __init__(self):
-        self.cards = [Card(rank, suit) for suit in Card.suits for rank in Card.ranks]
-
-    def shuffle(self):
-        random.shuffle(self.cards)
-
-    def draw_card(self):
-        return self.cards.pop() if self.cards else None
-
-# ------------------ Player Class ------------------ #
-class Player:
-    def __init__(self, name):
-        self.name = name
-        self.hand = []
-
-    def draw_cards(self, deck, num=5):
-        self.hand = []
-        for _ in range(num):
-            card = deck.draw_card()
-            if card:
-                self.hand.append(card)
-
-    def show_hand(self):
-        return [str(card) for card in self.hand]
-
-    def highest_card(self):
-        return max(self.hand, key=lambda c: c.value) if self.hand else None
+import card_sim
+from cards import Deck, Player
 
 # ------------------ GUI Game Class ------------------ #
 class CardGameGUI:
@@ -71,13 +32,17 @@ class CardGameGUI:
         self.play_btn = tk.Button(root, text="Play Game", font=("Arial", 12), bg="green", fg="white", command=self.play_game)
         self.play_btn.pack(pady=10)
 
+        # Odds button
+        self.odds_btn = tk.Button(root, text="Win Odds", font=("Arial", 12), command=self.show_odds)
+        self.odds_btn.pack(pady=5)
+
         # Result label
         self.result_label = tk.Label(root, text="", font=("Arial", 14, "bold"), fg="blue")
         self.result_label.pack(pady=10)
 
     def play_game(self):
-        # Reset deck and shuffle
-        self.deck = Deck()
+        # Gather the cards back and shuffle
+        self.deck.reset()
         self.deck.shuffle()
 
         # Draw cards
@@ -88,19 +53,55 @@ class CardGameGUI:
         self.display_cards(self.frame1, self.player1.show_hand())
         self.display_cards(self.frame2, self.player2.show_hand())
 
-        # Compare highest cards
-        card1 = self.player1.highest_card()
-        card2 = self.player2.highest_card()
+        # Compare poker hands
+        value1 = self.player1.hand_value()
+        value2 = self.player2.hand_value()
+        self.frame1.config(text=f"{self.player1.name}'s Cards: {self.player1.hand_name()}")
+        self.frame2.config(text=f"{self.player2.name}'s Cards: {self.player2.hand_name()}")
 
-        if card1.value > card2.value:
-            winner_text = f"🏆 Winner: {self.player1.name} with {card1}"
-        elif card1.value < card2.value:
-            winner_text = f"🏆 Winner: {self.player2.name} with {card2}"
+        if value1 > value2:
+            winner_text = f"🏆 Winner: {self.player1.name} with {self.player1.hand_name()}"
+        elif value1 < value2:
+            winner_text = f"🏆 Winner: {self.player2.name} with {self.player2.hand_name()}"
         else:
-            winner_text = f"🤝 It's a tie! Both had {card1}"
+            winner_text = f"🤝 It's a tie! Both had {self.player1.hand_name()}"
 
         self.result_label.config(text=winner_text)
 
+    ODDS_POLL_MS = 50
+
+    def show_odds(self, deals=500_000):
+        # Simulated with the vectorized engine instead of playing rounds, on a
+        # worker thread: the deals (and building the hand tables on first use)
+        # take a second or two, and the window has to keep responding
+        self.odds_btn.config(state="disabled", text="Simulating...")
+        results = queue.Queue(maxsize=1)
+
+        def run():
+            try:
+                results.put(card_sim.win_odds(deals, players=2, hand_size=5, game='poker'))
+            except Exception as e:  # shown by the UI thread
+                results.put(e)
+
+        threading.Thread(target=run, name="win-odds", daemon=True).start()
+        self.root.after(self.ODDS_POLL_MS, self.odds_ready, results, deals)
+
+    def odds_ready(self, results, deals):
+        try:
+            result = results.get_nowait()
+        except queue.Empty:
+            self.root.after(self.ODDS_POLL_MS, self.odds_ready, results, deals)
+            return
+        self.odds_btn.config(state="normal", text="Win Odds")
+        if isinstance(result, Exception):
+            messagebox.showerror("Win Odds", f"Simulation failed: {result}")
+            return
+        win_p, tie_p = result
+        messagebox.showinfo("Win Odds", f"Over {deals:,} simulated deals:\n"
+                                        f"{self.player1.name} wins {win_p[0]:.2%}\n"
+                                        f"{self.player2.name} wins {win_p[1]:.2%}\n"
+                                        f"Tie {tie_p:.2%}")
+
     def display_cards(self, frame, cards):
         # Clear old widgets
         for widget in frame.winfo_children():
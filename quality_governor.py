@@ -0,0 +1,151 @@
+"""
+quality_governor.py
+Holds a vision loop at a target frame rate by trading away model quality.
+
+A QualityGovernor walks a ladder of quality levels, best first. Each level
+sets four knobs:
+    scale       the frame is shrunk by this factor before the model sees it
+    complexity  MediaPipe model_complexity (or refine_landmarks for the face mesh)
+    stride      the model runs on every stride-th frame; the others reuse its results
+    roi         the model sees only a box around what it found last frame
+
+The loop brackets each frame with start_frame() / end_frame(). Once a full
+window of frames averages over the budget (1 / target_fps) the governor
+steps one level down; once it averages well under budget it steps back up,
+unless that level was measured as too slow within RETRY_AFTER seconds.
+Every change goes to `log` (print by default) and into `history`.
+
+process() runs a model at the current level and maps ROI results back to
+full-frame coordinates, so callers see the same results either way.
+"""
+
+import time
+from collections import deque, namedtuple
+
+import cv2
+
+Level = namedtuple('Level', ['scale', 'complexity', 'stride', 'roi'])
+
+LEVELS = [
+    Level(1.0, 1, 1, False),
+    Level(1.0, 0, 1, False),
+    Level(0.75, 0, 1, True),
+    Level(0.5, 0, 1, True),
+    Level(0.5, 0, 2, True),
+    Level(0.5, 0, 3, True),
+]
+
+ROI_MARGIN = 0.3    # box grows by this fraction of its size on each side
+ROI_MIN = 96        # pixels; smaller boxes are grown to this, and never shrunk below it
+ROI_RESCAN = 30     # frames between full-frame runs, to pick up anything new
+RETRY_AFTER = 30.0  # seconds before a level measured as too slow is tried again
+
+
+class QualityGovernor:
+    def __init__(self, target_fps=30, name="vision", levels=LEVELS, min_level=0, max_level=None,
+                 window=30, cooldown=1.0, headroom=0.7, log=print):
+        self.name = name
+        self.budget = 1 / target_fps     # seconds per frame
+        self.levels = levels
+        self.min_level = min_level       # best level allowed
+        self.max_level = len(levels) - 1 if max_level is None else max_level  # cheapest allowed
+        self.level = min_level
+        self.window = window             # frames averaged per decision
+        self.cooldown = cooldown         # seconds between changes
+        self.headroom = headroom         # step up only under this fraction of the budget
+        self.log = log
+        self.latencies = deque(maxlen=window)
+        self.measured = {}               # level -> (mean latency last seen there, when)
+        self.history = []                # (time, old level, new level, mean latency)
+        self.frames = 0
+        self._start = None
+        self._changed = time.perf_counter()
+
+    @property
+    def settings(self):
+        return self.levels[self.level]
+
+    def start_frame(self):
+        self.frames += 1
+        self._start = time.perf_counter()
+
+    def end_frame(self):
+        """Record the frame's latency; returns the new Level if it changed, else None."""
+        if self._start is None:
+            return None
+        now = time.perf_counter()
+        self.latencies.append(now - self._start)
+        self._start = None
+        if len(self.latencies) < self.window or now - self._changed < self.cooldown:
+            return None
+
+        mean = sum(self.latencies) / len(self.latencies)
+        self.measured[self.level] = (mean, now)
+        if mean > self.budget and self.level < self.max_level:
+            return self._change(self.level + 1, mean, now)
+        if mean < self.budget * self.headroom and self.level > self.min_level:
+            better = self.level - 1
+            latency, when = self.measured.get(better, (0, 0))
+            if latency <= self.budget or now - when > RETRY_AFTER:
+                return self._change(better, mean, now)
+        return None
+
+    def _change(self, level, mean, now):
+        old = self.level
+        self.level = level
+        self.latencies.clear()
+        self._changed = now
+        self.history.append((time.time(), old, level, mean))
+        self.log(f"[{self.name}] quality {old} -> {level} {self.levels[level]}: "
+                 f"{mean * 1000:.1f} ms/frame against {self.budget * 1000:.1f} ms")
+        return self.levels[level]
+
+    def process(self, model, frame, previous=None, field=None):
+        """model.process() on a BGR frame at the current level.
+
+        `previous` is the last results, reused on frames skipped by the
+        stride. With `field` naming its landmark lists (e.g.
+        'multi_hand_landmarks') and roi on, only a box around those is
+        processed and the landmarks are mapped back to the full frame.
+        """
+        level = self.settings
+        if previous is not None and self.frames % level.stride:
+            return previous
+        box = None
+        if level.roi and field and previous is not None and self.frames % ROI_RESCAN:
+            box = roi_box(getattr(previous, field, None), frame.shape)
+        image = frame if box is None else frame[box[1]:box[3], box[0]:box[2]]
+        if level.scale < 1 and min(image.shape[:2]) * level.scale >= ROI_MIN:  # small crops stay as they are
+            image = cv2.resize(image, None, fx=level.scale, fy=level.scale, interpolation=cv2.INTER_AREA)
+        results = model.process(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
+        if box is not None:
+            to_full_frame(getattr(results, field, None), box, frame.shape)
+        return results
+
+
+def roi_box(landmark_lists, shape):
+    """(x0, y0, x1, y1) pixel box around all the landmarks with a margin, or None."""
+    if not landmark_lists:
+        return None
+    h, w = shape[:2]
+    xs = [lm.x for lms in landmark_lists for lm in lms.landmark]
+    ys = [lm.y for lms in landmark_lists for lm in lms.landmark]
+    x0, x1, y0, y1 = min(xs) * w, max(xs) * w, min(ys) * h, max(ys) * h
+    pad_x = max((x1 - x0) * ROI_MARGIN, (ROI_MIN - (x1 - x0)) / 2)
+    pad_y = max((y1 - y0) * ROI_MARGIN, (ROI_MIN - (y1 - y0)) / 2)
+    box = (max(0, int(x0 - pad_x)), max(0, int(y0 - pad_y)), min(w, int(x1 + pad_x)), min(h, int(y1 + pad_y)))
+    return box if box[2] - box[0] >= 2 and box[3] - box[1] >= 2 else None
+
+
+def to_full_frame(landmark_lists, box, shape):
+    """Map normalized landmarks found in the box back to the whole frame, in place."""
+    if not landmark_lists:
+        return
+    h, w = shape[:2]
+    x0, y0, x1, y1 = box
+    sx, sy = (x1 - x0) / w, (y1 - y0) / h
+    for lms in landmark_lists:
+        for lm in lms.landmark:
+            lm.x = x0 / w + lm.x * sx
+            lm.y = y0 / h + lm.y * sy
+            lm.z *= sx  # z shares the x scale
@@ -0,0 +1,162 @@
+"""
+tictactoe_engine.py
+Bitboard engine and perfect solver for Tic tac toe.py.
+
+A position is two 9-bit integers, the cells taken by X and by O (bit
+row * 3 + col); X moves first, so whose turn it is follows from the counts.
+Win detection is a lookup in WINNING, a 512-entry table marking every cell
+set that contains a line.
+
+The solver is negamax with alpha-beta pruning and a transposition table.
+It is run once over every position reachable from the empty board, and the
+exact score and best move of each are stored in flat tables indexed by
+x | o << 9, cached on disk. After that the computer's move is a single
+table lookup.
+"""
+
+import os
+from array import array
+
+SIZE = 3
+CELLS = SIZE * SIZE
+FULL = (1 << CELLS) - 1
+LINES = [0b000000111, 0b000111000, 0b111000000,   # rows
+         0b001001001, 0b010010010, 0b100100100,   # columns
+         0b100010001, 0b001010100]                # diagonals
+WINNING = bytes(any(bits & line == line for line in LINES) for bits in range(1 << CELLS))
+
+TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tictactoe_table.bin')
+TABLE_MAGIC = b'TTT1'
+NO_MOVE = -1
+
+EXACT, LOWER, UPPER = range(3)
+
+
+def popcount(bits):
+    return bin(bits).count('1')
+
+
+def key(x, o):
+    return x | o << CELLS
+
+
+def x_to_move(x, o):
+    return popcount(x) == popcount(o)
+
+
+def winner(x, o):
+    if WINNING[x]:
+        return 'X'
+    if WINNING[o]:
+        return 'O'
+    return None
+
+
+def is_over(x, o):
+    return WINNING[x] or WINNING[o] or (x | o) == FULL
+
+
+def moves(x, o):
+    free = ~(x | o) & FULL
+    return [cell for cell in range(CELLS) if free >> cell & 1]
+
+
+def _negamax(me, opp, alpha, beta, tt):
+    """Score for the side to move (bits `me`): +/-(10 - plies) for a win/loss, 0 for a draw."""
+    taken = me | opp
+    if WINNING[opp]:
+        return popcount(taken) - 10  # the opponent's last move won
+    if taken == FULL:
+        return 0
+
+    tt_key = me | opp << CELLS
+    entry = tt.get(tt_key)
+    if entry:
+        value, flag = entry
+        if flag == EXACT or (flag == LOWER and value >= beta) or (flag == UPPER and value <= alpha):
+            return value
+
+    original_alpha = alpha
+    best = -100
+    for cell in range(CELLS):
+        bit = 1 << cell
+        if taken & bit:
+            continue
+        value = -_negamax(opp, me | bit, -beta, -alpha, tt)
+        if value > best:
+            best = value
+        if best > alpha:
+            alpha = best
+            if alpha >= beta:
+                break
+
+    flag = UPPER if best <= original_alpha else LOWER if best >= beta else EXACT
+    tt[tt_key] = (best, flag)
+    return best
+
+
+def _solve(x, o, tt):
+    """(exact score for the side to move, best cell) of a position that isn't over."""
+    me, opp = (x, o) if x_to_move(x, o) else (o, x)
+    best, best_cell = -100, NO_MOVE
+    for cell in moves(x, o):
+        value = -_negamax(opp, me | 1 << cell, -100, -best, tt)
+        if value > best:
+            best, best_cell = value, cell
+    return best, best_cell
+
+
+def build_table():
+    """(scores, best moves) for every reachable position, indexed by key(x, o)."""
+    scores = array('b', bytes(1 << (2 * CELLS)))
+    best_moves = array('b', [NO_MOVE]) * (1 << (2 * CELLS))
+    tt = {}
+    seen = set()
+    stack = [(0, 0)]
+    while stack:
+        x, o = stack.pop()
+        if key(x, o) in seen or is_over(x, o):
+            continue
+        seen.add(key(x, o))
+        scores[key(x, o)], best_moves[key(x, o)] = _solve(x, o, tt)
+        x_turn = x_to_move(x, o)
+        for cell in moves(x, o):
+            stack.append((x | 1 << cell, o) if x_turn else (x, o | 1 << cell))
+    return scores, best_moves
+
+
+class Solver:
+    """Perfect play from the precomputed table (built on first use, then cached)."""
+
+    def __init__(self, path=TABLE_PATH):
+        self.path = path
+        self.scores, self.best_moves = self._load() or self._build()
+
+    def _load(self):
+        size = 1 << (2 * CELLS)
+        try:
+            with open(self.path, 'rb') as file:
+                data = file.read()
+        except OSError:
+            return None
+        if data[:4] != TABLE_MAGIC or len(data) != 4 + 2 * size:
+            return None
+        return array('b', data[4:4 + size]), array('b', data[4 + size:])
+
+    def _build(self):
+        scores, best_moves = build_table()
+        try:
+            with open(self.path + '.tmp', 'wb') as file:
+                file.write(TABLE_MAGIC + scores.tobytes() + best_moves.tobytes())
+            os.replace(self.path + '.tmp', self.path)
+        except OSError:
+            pass  # read-only install; rebuild next time
+        return scores, best_moves
+
+    def best_move(self, x, o):
+        """Cell to play, or NO_MOVE if the game is over."""
+        return self.best_moves[key(x, o)]
+
+    def score(self, x, o):
+        """> 0: the side to move wins with perfect play, < 0: it loses, 0: draw."""
+        return self.scores[key(x, o)]
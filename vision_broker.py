@@ -0,0 +1,407 @@
+"""
+vision_broker.py
+One camera and one inference pass shared by every vision script.
+
+Run the broker once:
+
+    python vision_broker.py --camera 0
+
+It owns the camera and writes each frame into a shared-memory ring buffer
+(FrameRing). Scripts subscribe over a local socket, naming the models they
+need; each frame the broker runs every model at least one subscriber wants,
+exactly once, and publishes the results (MediaPipe protobufs, serialized) to
+all of them. A subscriber costs one small pickled message per frame; it
+never copies a frame through the socket and never runs a model itself.
+
+Every subscriber has a send thread holding only the newest message, so a
+slow script skips frames instead of holding up the camera or the others.
+
+Scripts use open_capture(), which returns a BrokerClient when the broker is
+running and a LocalCapture on the camera otherwise. Both have the
+cv2.VideoCapture read() / release() interface plus `results`, the model
+outputs for the frame just read (always empty for LocalCapture, so scripts
+fall back to their own models).
+
+The broker listens on port 6150 of localhost. To use another port, set
+VISION_BROKER_PORT for the broker and for every script alike; the
+setting is read by both sides, so they always agree.
+"""
+
+import argparse
+import os
+import pickle
+import struct
+import threading
+import time
+from multiprocessing import shared_memory
+from multiprocessing.connection import Client, Listener
+from types import SimpleNamespace
+
+import cv2
+import mediapipe as mp
+import numpy as np
+from mediapipe.framework.formats import classification_pb2, detection_pb2, landmark_pb2
+
+PORT_VARIABLE = 'VISION_BROKER_PORT'
+ADDRESS = ('127.0.0.1', int(os.environ.get(PORT_VARIABLE, 6150)))
+AUTHKEY = b'vision-broker'
+SHM_NAME = 'vision_broker_frames'
+SLOTS = 8
+WIDTH, HEIGHT = 640, 480
+
+# model name -> (factory, {result field: protobuf message class})
+MODELS = {
+    'hands': (lambda: mp.solutions.hands.Hands(max_num_hands=2, min_detection_confidence=0.7,
+                                               min_tracking_confidence=0.7),
+              {'multi_hand_landmarks': landmark_pb2.NormalizedLandmarkList,
+               'multi_handedness': classification_pb2.ClassificationList}),
+    'face_detection': (lambda: mp.solutions.face_detection.FaceDetection(min_detection_confidence=0.5),
+                       {'detections': detection_pb2.Detection}),
+    'face_mesh': (lambda: mp.solutions.face_mesh.FaceMesh(max_num_faces=1, refine_landmarks=True,
+                                                          min_detection_confidence=0.5,
+                                                          min_tracking_confidence=0.5),
+                  {'multi_face_landmarks': landmark_pb2.NormalizedLandmarkList}),
+}
+
+
+class FrameRing:
+    """Fixed slots of frame bytes in shared memory, with a sequence number per slot.
+
+    The writer marks a slot -1 while filling it; a reader copies a frame out
+    and checks the slot's number before and after, so a frame overwritten
+    mid-copy is reported as gone rather than returned torn.
+    """
+
+    HEADER = struct.Struct('qq')  # slots, bytes per slot
+
+    def __init__(self, name=SHM_NAME, slots=SLOTS, slot_bytes=WIDTH * HEIGHT * 3, create=False):
+        if create:
+            size = self.HEADER.size + slots * 8 + slots * slot_bytes
+            try:
+                shared_memory.SharedMemory(name=name).unlink()  # left behind by a crashed broker
+            except FileNotFoundError:
+                pass
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+            self.HEADER.pack_into(self.shm.buf, 0, slots, slot_bytes)
+        else:
+            self.shm = _attach(name)
+            slots, slot_bytes = self.HEADER.unpack_from(self.shm.buf, 0)
+        self.slots = slots
+        self.slot_bytes = slot_bytes
+        self.owner = create
+        offset = self.HEADER.size
+        self.seqs = np.ndarray((slots,), dtype=np.int64, buffer=self.shm.buf, offset=offset)
+        self.data = np.ndarray((slots, slot_bytes), dtype=np.uint8, buffer=self.shm.buf, offset=offset + slots * 8)
+        if create:
+            self.seqs[:] = -1
+
+    def write(self, seq, frame):
+        slot = seq % self.slots
+        flat = frame.reshape(-1)
+        if flat.nbytes > self.slot_bytes:
+            raise ValueError(f"frame of {flat.nbytes} bytes doesn't fit a {self.slot_bytes} byte slot")
+        self.seqs[slot] = -1
+        self.data[slot, :flat.nbytes] = flat
+        self.seqs[slot] = seq
+
+    def read(self, seq, shape):
+        """Copy of frame `seq`, or None if it has already been overwritten."""
+        slot = seq % self.slots
+        if self.seqs[slot] != seq:
+            return None
+        frame = self.data[slot, :int(np.prod(shape))].reshape(shape).copy()
+        return frame if self.seqs[slot] == seq else None
+
+    def close(self):
+        del self.seqs, self.data  # release the buffer exports before closing
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def _attach(name):
+    """Attach to shared memory without the resource tracker unlinking it when we exit."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # Python 3.13+
+    except TypeError:
+        shm = shared_memory.SharedMemory(name=name)
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(shm._name, 'shared_memory')
+        return shm
+
+
+def encode(model, result):
+    """{field: [serialized protobufs] or None} for one model's output."""
+    return {field: [message.SerializeToString() for message in value] if value else None
+            for field, value in ((f, getattr(result, f)) for f in MODELS[model][1])}
+
+
+def decode(model, fields, mirror=False):
+    """Namespace shaped like the MediaPipe solution output, optionally mirrored left-right."""
+    classes = MODELS[model][1]
+    result = SimpleNamespace()
+    for field, blobs in fields.items():
+        messages = [classes[field].FromString(blob) for blob in blobs] if blobs else None
+        if messages and mirror:
+            for message in messages:
+                _mirror(message)
+        setattr(result, field, messages)
+    return result
+
+
+def _mirror(message):
+    """Flip a result in place to match cv2.flip(frame, 1)."""
+    if isinstance(message, landmark_pb2.NormalizedLandmarkList):
+        for landmark in message.landmark:
+            landmark.x = 1.0 - landmark.x
+    elif isinstance(message, detection_pb2.Detection):
+        data = message.location_data
+        box = data.relative_bounding_box
+        box.xmin = 1.0 - box.xmin - box.width
+        for keypoint in data.relative_keypoints:
+            keypoint.x = 1.0 - keypoint.x
+    elif isinstance(message, classification_pb2.ClassificationList):
+        for item in message.classification:
+            item.label = {'Left': 'Right', 'Right': 'Left'}.get(item.label, item.label)
+
+
+class _Subscriber:
+    """One connected script: its models and a send thread that keeps only the newest message."""
+
+    def __init__(self, conn, models, on_close):
+        self.conn = conn
+        self.models = frozenset(models)
+        self._on_close = on_close
+        self._pending = None
+        self._ready = threading.Condition()
+        self._closed = False
+        threading.Thread(target=self._send_loop, daemon=True).start()
+
+    def offer(self, payload):
+        with self._ready:
+            self._pending = payload  # replaces a message the script hasn't taken yet
+            self._ready.notify()
+
+    def _send_loop(self):
+        while True:
+            with self._ready:
+                while self._pending is None and not self._closed:
+                    self._ready.wait()
+                if self._closed:
+                    return
+                payload, self._pending = self._pending, None
+            try:
+                self.conn.send_bytes(payload)
+            except OSError:
+                self.close()
+                return
+
+    def close(self):
+        with self._ready:
+            if self._closed:
+                return
+            self._closed = True
+            self._ready.notify()
+        self.conn.close()
+        self._on_close(self)
+
+
+class Broker:
+    def __init__(self, camera=0, width=WIDTH, height=HEIGHT, slots=SLOTS, address=ADDRESS, authkey=AUTHKEY):
+        self.cap = cv2.VideoCapture(camera)
+        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        self.size = (width, height)
+        self.ring = FrameRing(slots=slots, slot_bytes=width * height * 3, create=True)
+        self.listener = Listener(address, authkey=authkey)
+        self.models = {}            # name -> MediaPipe graph, built when first requested
+        self.subscribers = []
+        self._lock = threading.Lock()
+        self.seq = 0
+        self.running = True
+
+    def _accept_loop(self):
+        while self.running:
+            try:
+                conn = self.listener.accept()
+                request = conn.recv()
+                unknown = set(request['models']) - set(MODELS)
+                if unknown:
+                    conn.send({'error': f"unknown models: {', '.join(sorted(unknown))}"})
+                    conn.close()
+                    continue
+                conn.send({'shm': SHM_NAME})
+            except (OSError, EOFError, KeyError, TypeError):
+                continue  # a client that went away or spoke nonsense
+            with self._lock:
+                self.subscribers.append(_Subscriber(conn, request['models'], self._remove))
+            print(f"Subscriber joined for {', '.join(request['models']) or 'frames only'}")
+
+    def _remove(self, subscriber):
+        with self._lock:
+            if subscriber in self.subscribers:
+                self.subscribers.remove(subscriber)
+                print("Subscriber left")
+
+    def step(self):
+        ok, frame = self.cap.read()
+        if not ok:
+            return False
+        with self._lock:
+            subscribers = list(self.subscribers)
+        if not subscribers:
+            return True
+        if frame.nbytes > self.ring.slot_bytes:
+            frame = cv2.resize(frame, self.size)  # the camera ignored the requested size
+
+        seq = self.seq
+        self.seq += 1
+        self.ring.write(seq, frame)
+        header = {'seq': seq, 'time': time.time(), 'shape': frame.shape}
+
+        # Each wanted model runs once, however many scripts asked for it
+        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        encoded = {}
+        for name in set().union(*(s.models for s in subscribers)):
+            if name not in self.models:
+                self.models[name] = MODELS[name][0]()
+            encoded[name] = encode(name, self.models[name].process(rgb))
+
+        # Scripts asking for the same models share one pickled message
+        payloads = {}
+        for subscriber in subscribers:
+            payload = payloads.get(subscriber.models)
+            if payload is None:
+                message = dict(header, results={name: encoded[name] for name in subscriber.models})
+                payload = payloads[subscriber.models] = pickle.dumps(message, pickle.HIGHEST_PROTOCOL)
+            subscriber.offer(payload)
+        return True
+
+    def run(self):
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+        print(f"Vision broker on {self.listener.address}, press Ctrl+C to stop")
+        try:
+            while self.running and self.step():
+                pass
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.close()
+
+    def close(self):
+        self.running = False
+        with self._lock:
+            subscribers = list(self.subscribers)
+        for subscriber in subscribers:
+            subscriber.close()
+        self.listener.close()
+        self.cap.release()
+        self.ring.close()
+
+
+class BrokerClient:
+    """Frames and model results from a running broker, read like a cv2.VideoCapture."""
+
+    brokered = True
+
+    def __init__(self, models=(), mirror=False, address=ADDRESS, authkey=AUTHKEY):
+        self.models = tuple(models)
+        self.mirror = mirror
+        self.conn = Client(address, authkey=authkey)
+        self.conn.send({'models': list(self.models)})
+        reply = self.conn.recv()
+        if 'error' in reply:
+            self.conn.close()
+            raise ValueError(reply['error'])
+        self.ring = FrameRing(reply['shm'])
+        self.results = {}   # model name -> result namespace for the last frame read
+        self.seq = -1
+        self.timestamp = 0.0  # capture time of the last frame read (time.time())
+        self.skipped = 0      # frames this script was too slow to take
+
+    def read(self):
+        """(True, frame) for the newest published frame; (False, None) once the broker stops."""
+        while True:
+            try:
+                payload = self.conn.recv_bytes()
+                while self.conn.poll():  # messages queued while this script was busy: keep the newest
+                    payload = self.conn.recv_bytes()
+                    self.skipped += 1
+            except (EOFError, OSError):
+                return False, None
+            message = pickle.loads(payload)
+            frame = self.ring.read(message['seq'], message['shape'])
+            if frame is None:
+                self.skipped += 1
+                continue
+            if self.mirror:
+                frame = cv2.flip(frame, 1)
+            self.seq = message['seq']
+            self.timestamp = message['time']
+            self.results = {name: decode(name, fields, self.mirror) for name, fields in message['results'].items()}
+            return True, frame
+
+    def isOpened(self):
+        return not self.conn.closed
+
+    def set(self, prop, value):
+        return False  # the broker owns the camera settings
+
+    def release(self):
+        self.conn.close()
+        self.ring.close()
+
+
+class LocalCapture:
+    """The camera opened directly, for when no broker is running."""
+
+    brokered = False
+
+    def __init__(self, camera=0, width=None, height=None, mirror=False):
+        self.cap = cv2.VideoCapture(camera)
+        if width and height:
+            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        self.mirror = mirror
+        self.results = {}
+        self.timestamp = 0.0
+
+    def read(self):
+        ok, frame = self.cap.read()
+        self.timestamp = time.time()
+        if ok and self.mirror:
+            frame = cv2.flip(frame, 1)
+        return ok, frame
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def set(self, prop, value):
+        return self.cap.set(prop, value)
+
+    def release(self):
+        self.cap.release()
+
+
+def open_capture(models=(), camera=0, width=None, height=None, mirror=False):
+    """BrokerClient if the broker is running, else the camera itself."""
+    try:
+        return BrokerClient(models, mirror)
+    except (ConnectionRefusedError, FileNotFoundError):
+        return LocalCapture(camera, width, height, mirror)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Share one camera and one model run between vision scripts",
+                                     epilog=f"Listens on port {ADDRESS[1]}; set {PORT_VARIABLE} "
+                                            "for the broker and the scripts to change it.")
+    parser.add_argument('--camera', type=int, default=0)
+    parser.add_argument('--width', type=int, default=WIDTH)
+    parser.add_argument('--height', type=int, default=HEIGHT)
+    parser.add_argument('--slots', type=int, default=SLOTS, help="frames kept in shared memory")
+    args = parser.parse_args()
+    Broker(args.camera, args.width, args.height, args.slots).run()
+
+
+if __name__ == "__main__":
+    main()